@@ -45,6 +45,10 @@ class CopyKey(str, Enum):
     RULES_BROWSER_TITLE = "rules_browser_title"
     SEARCH_RULES = "search_rules"
     YEAR_FILTER = "year_filter"
+    CATEGORY_FILTER = "category_filter"
+    RULES_RESULTS = "rules_results"
+    PREVIOUS_PAGE = "previous_page"
+    NEXT_PAGE = "next_page"
     # Checklist Items
     CHECKLIST_COMMUTING = "checklist_commuting"
     CHECKLIST_HOME_OFFICE = "checklist_home_office"
@@ -80,6 +84,10 @@ MC: dict[str, dict[CopyKey, str]] = {
         CopyKey.RULES_BROWSER_TITLE: "Rule Browser",
         CopyKey.SEARCH_RULES: "Search rules...",
         CopyKey.YEAR_FILTER: "Filter by year",
+        CopyKey.CATEGORY_FILTER: "Filter by category",
+        CopyKey.RULES_RESULTS: "{total} rules · page {page} of {pages}",
+        CopyKey.PREVIOUS_PAGE: "Previous",
+        CopyKey.NEXT_PAGE: "Next",
         CopyKey.CHECKLIST_COMMUTING: ("Commuting documents (tickets, logbook)"),
         CopyKey.CHECKLIST_HOME_OFFICE: "Home office days log",
         CopyKey.CHECKLIST_EQUIPMENT: "Equipment invoices/receipts",
@@ -113,6 +121,10 @@ MC: dict[str, dict[CopyKey, str]] = {
         CopyKey.RULES_BROWSER_TITLE: "Regel-Browser",
         CopyKey.SEARCH_RULES: "Regeln durchsuchen...",
         CopyKey.YEAR_FILTER: "Nach Jahr filtern",
+        CopyKey.CATEGORY_FILTER: "Nach Kategorie filtern",
+        CopyKey.RULES_RESULTS: "{total} Regeln · Seite {page} von {pages}",
+        CopyKey.PREVIOUS_PAGE: "Zurück",
+        CopyKey.NEXT_PAGE: "Weiter",
         CopyKey.CHECKLIST_COMMUTING: ("Pauschale für Fahrtkosten (Fahrkarten, Fahrtenbuch)"),
         CopyKey.CHECKLIST_HOME_OFFICE: "Nachweis der Home-Office-Tage",
         CopyKey.CHECKLIST_EQUIPMENT: "Rechnungen/Belege für Arbeitsmittel",
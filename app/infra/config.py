@@ -13,7 +13,31 @@ class AppSettings(BaseSettings):
     groq_api_key: str | None = None
     extractor_model: str = "llama-3.1-8b-instant"
     reasoner_model: str = "llama-3.1-70b-versatile"
+    # Shared keep-alive HTTP pool of all Groq clients: concurrent connection cap and
+    # how long idle connections stay open
+    llm_max_connections: int = 10
+    llm_keepalive_expiry_s: float = 30.0
+    # Retries (jittered exponential backoff) of idempotent LLM calls, optional hedged
+    # duplicates after the observed p95 latency, and the circuit breaker that sends
+    # turns down the offline path after llm_breaker_failures failed calls in a row
+    llm_max_retries: int = 2
+    llm_retry_base_delay_s: float = 0.2
+    llm_hedge_requests: bool = False
+    llm_breaker_failures: int = 5
+    llm_breaker_reset_s: float = 30.0
     sqlite_path: str = ".data/profile.db"
+    # >1 spreads users across N SQLite files under profile_shards_dir
+    profile_shards: int = 1
+    profile_shards_dir: str = ".data/shards"
+    profile_cache_size: int = 256
+    profile_cache_verify_version: bool = False
+    # "delete" drops aged evidence; "archive" moves it to the cold archive files
+    retention_mode: str = "delete"
+    # Rule ranking in InMemoryRetriever: "overlap", "bm25" or "hybrid" (BM25 plus
+    # the dense vectors that ingestion keeps under chroma_path)
+    retrieval_scorer: str = "overlap"
+    # LRU entries of (normalized query, year, k) -> hits; 0 disables the cache
+    retrieval_cache_size: int = 1024
     chroma_path: str = ".data/chroma"
     log_level: str = "INFO"
     enable_json_logs: bool = True
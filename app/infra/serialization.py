@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import json
+from decimal import Decimal
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None  # type: ignore[assignment]
+
+# Central JSON helpers. orjson is used when installed (several times faster for both
+# directions); the stdlib is the fallback and produces equivalent, parseable output.
+# Decimals are written as strings so amounts keep their exact value.
+
+_ORJSON_OPTS = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_bytes(obj: Any, indent: bool = False) -> bytes:
+    """Serializes to UTF-8 JSON bytes; `indent` gives 2-space pretty output."""
+    if orjson is not None:
+        try:
+            opts = _ORJSON_OPTS | (orjson.OPT_INDENT_2 if indent else 0)
+            return orjson.dumps(obj, default=_default, option=opts)
+        except TypeError:
+            pass  # e.g. integers beyond 64 bit; the stdlib handles them
+    return json.dumps(
+        obj, default=_default, ensure_ascii=False, indent=2 if indent else None
+    ).encode("utf-8")
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """Like dumps_bytes, but returns str (for TEXT columns)."""
+    return dumps_bytes(obj, indent).decode("utf-8")
+
+
+def loads(data: str | bytes | bytearray | memoryview) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def canonical_dumps(obj: Any) -> str:
+    """
+    Sorted-keys JSON used as input to content hashes. Always produced by the stdlib
+    so hashes stay byte-identical to the ones already stored.
+    """
+    return json.dumps(obj, sort_keys=True, default=_default)
+
+
+def clone(obj: Any) -> Any:
+    """Deep copy of JSON-shaped data via a serialization round trip."""
+    return loads(dumps_bytes(obj))
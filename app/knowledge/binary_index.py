@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+from collections import Counter
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from app.infra.serialization import dumps_bytes, loads
+
+from .loader import atomic_write_bytes
+from .sanitize import sanitize_snippet
+from .synonym_matcher import DEFAULT_MATCHER
+
+# Binary rules index, version 3. Little-endian throughout.
+#
+#   header   MAGIC | u16 version | u16 n_sections | u32 n_rules | u32 n_terms | u32 n_years
+#   table    n_sections x (u64 offset, u64 length), in _SECTIONS order
+#   sections each 8-byte aligned
+#
+# Terms are the synonym-expanded search terms of all rules, sorted; a term id is
+# its position. Postings are stored per year as CSR (indptr per term into rule
+# ids). Rule bodies (with pre-sanitized snippets) are JSON blobs decoded only when
+# a rule is returned as a hit or listed. The listing section holds just what the
+# Rules browser searches and facets on, so it can scan every rule without decoding
+# bodies. Version 2 added the summary to the body, version 3 the listing section.
+MAGIC = b"RIDX"
+VERSION = 3
+_HEADER = struct.Struct("<4sHHIII")
+_SECTION = struct.Struct("<QQ")
+_SECTIONS: list[tuple[str, str | None]] = [
+    ("term_offsets", "<u4"),  # n_terms + 1, into term_blob
+    ("term_blob", None),  # UTF-8 terms, back to back
+    ("years", "<i4"),  # n_years, ascending
+    ("rule_years", "<u2"),  # n_rules
+    ("post_indptr", "<u4"),  # n_years * (n_terms + 1), into post_rules
+    ("post_rules", "<u4"),  # rule ids, ascending per (year, term)
+    ("text_offsets", "<u8"),  # n_rules + 1, into text_blob
+    ("text_blob", None),  # fuzzy-match text per rule (sorted terms, space-joined)
+    ("body_offsets", "<u8"),  # n_rules + 1, into body_blob
+    ("body_blob", None),  # JSON rule body per rule
+    ("doc_indptr", "<u4"),  # n_rules + 1, into doc_terms / doc_tfs
+    ("doc_terms", "<u4"),  # term ids per rule
+    ("doc_tfs", "<u2"),  # term frequency (BM25) per (rule, term)
+    ("listing_offsets", "<u8"),  # n_rules + 1, into listing_blob
+    ("listing_blob", None),  # JSON [category, title, summary] per rule
+]
+_BODY_FIELDS = ("rule_id", "year", "title", "category", "summary", "required_data_points")
+
+
+def is_binary_index(path: str | Path) -> bool:
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def _offsets(blobs: Sequence[bytes], dtype: str) -> np.ndarray:
+    out = np.zeros(len(blobs) + 1, dtype=dtype)
+    np.cumsum([len(b) for b in blobs], out=out[1:])
+    return out
+
+
+def build_binary_index(raw_rules: Sequence[dict[str, Any]]) -> bytes:
+    """Serializes rules (as in rules_index.json) into the binary index format."""
+    rule_terms: list[set[str]] = []
+    rule_counts: list[Counter[str]] = []
+    for r in raw_rules:
+        text = f'{r["title"]} {r["summary"]}'
+        terms = DEFAULT_MATCHER.expand(text)
+        # Term frequencies from the text itself; synonyms count once each
+        tokens = text.lower().split()
+        rule_terms.append(terms)
+        rule_counts.append(Counter(tokens + sorted(terms - set(tokens))))
+
+    vocab = sorted(set().union(*rule_terms)) if rule_terms else []
+    term_id = {t: i for i, t in enumerate(vocab)}
+    term_bytes = [t.encode("utf-8") for t in vocab]
+    years = sorted({int(r["year"]) for r in raw_rules})
+    rule_years = np.array([int(r["year"]) for r in raw_rules], dtype="<u2")
+
+    # One indptr row of n_terms + 1 entries per year, all into the shared post_rules
+    n_terms = len(vocab)
+    post_indptr = np.zeros(len(years) * (n_terms + 1), dtype="<u4")
+    post_rules: list[int] = []
+    for y, year in enumerate(years):
+        by_term: list[list[int]] = [[] for _ in vocab]
+        for idx in np.flatnonzero(rule_years == year):
+            for t in rule_terms[idx]:
+                by_term[term_id[t]].append(int(idx))
+        base = y * (n_terms + 1)
+        post_indptr[base] = len(post_rules)
+        for tid, ids in enumerate(by_term):
+            post_rules.extend(ids)
+            post_indptr[base + tid + 1] = len(post_rules)
+
+    texts = [" ".join(sorted(terms)).encode("utf-8") for terms in rule_terms]
+    bodies = [
+        dumps_bytes(
+            {
+                **{f: r[f] for f in _BODY_FIELDS},
+                "snippet": sanitize_snippet(r["snippet"]),
+                "calculator_binding": r["calculator_binding"],
+            }
+        )
+        for r in raw_rules
+    ]
+    listings = [dumps_bytes([r["category"], r["title"], r["summary"]]) for r in raw_rules]
+    doc_indptr = [0]
+    doc_terms: list[int] = []
+    doc_tfs: list[int] = []
+    for counts in rule_counts:
+        for t, n in sorted(counts.items()):
+            doc_terms.append(term_id[t])
+            doc_tfs.append(min(n, 0xFFFF))
+        doc_indptr.append(len(doc_terms))
+
+    sections: dict[str, bytes] = {
+        "term_offsets": _offsets(term_bytes, "<u4").tobytes(),
+        "term_blob": b"".join(term_bytes),
+        "years": np.array(years, dtype="<i4").tobytes(),
+        "rule_years": rule_years.tobytes(),
+        "post_indptr": post_indptr.tobytes(),
+        "post_rules": np.array(post_rules, dtype="<u4").tobytes(),
+        "text_offsets": _offsets(texts, "<u8").tobytes(),
+        "text_blob": b"".join(texts),
+        "body_offsets": _offsets(bodies, "<u8").tobytes(),
+        "body_blob": b"".join(bodies),
+        "doc_indptr": np.array(doc_indptr, dtype="<u4").tobytes(),
+        "doc_terms": np.array(doc_terms, dtype="<u4").tobytes(),
+        "doc_tfs": np.array(doc_tfs, dtype="<u2").tobytes(),
+        "listing_offsets": _offsets(listings, "<u8").tobytes(),
+        "listing_blob": b"".join(listings),
+    }
+
+    header = _HEADER.pack(MAGIC, VERSION, len(_SECTIONS), len(raw_rules), n_terms, len(years))
+    offset = len(header) + _SECTION.size * len(_SECTIONS)
+    table, payload = [], []
+    for name, _ in _SECTIONS:
+        pad = -offset % 8
+        payload.append(b"\0" * pad)
+        offset += pad
+        data = sections[name]
+        table.append(_SECTION.pack(offset, len(data)))
+        payload.append(data)
+        offset += len(data)
+    return header + b"".join(table) + b"".join(payload)
+
+
+@dataclass(frozen=True)
+class RuleBody:
+    rule_id: str
+    year: int
+    title: str
+    category: str
+    summary: str
+    snippet: str
+    required_data_points: list[str]
+    calculator_binding: str
+
+
+class BinaryRulesIndex:
+    """
+    Read-only view of a binary rules index. Files are memory-mapped and all arrays
+    are zero-copy numpy views; only the term dictionary is decoded up front, and
+    rule bodies are decoded on first access.
+    """
+
+    def __init__(self, buffer: bytes | mmap.mmap) -> None:
+        self._buf = buffer
+        magic, version, n_sections, self.n_rules, self.n_terms, n_years = _HEADER.unpack_from(
+            buffer, 0
+        )
+        if magic != MAGIC:
+            raise ValueError("Not a binary rules index")
+        if version != VERSION or n_sections != len(_SECTIONS):
+            raise ValueError(f"Unsupported binary rules index version {version}")
+        self._views: dict[str, Any] = {}
+        for i, (name, dtype) in enumerate(_SECTIONS):
+            off, length = _SECTION.unpack_from(buffer, _HEADER.size + i * _SECTION.size)
+            if dtype is None:
+                self._views[name] = memoryview(buffer)[off : off + length]
+            else:
+                count = length // np.dtype(dtype).itemsize
+                self._views[name] = np.frombuffer(buffer, dtype=dtype, count=count, offset=off)
+
+        self.years: list[int] = [int(y) for y in self._views["years"]]
+        self.rule_years: np.ndarray = self._views["rule_years"]
+        offsets, blob = self._views["term_offsets"].tolist(), bytes(self._views["term_blob"])
+        self.term_ids: dict[str, int] = {
+            blob[offsets[i] : offsets[i + 1]].decode("utf-8"): i for i in range(self.n_terms)
+        }
+        self._bodies: dict[int, RuleBody] = {}
+
+    @classmethod
+    def open(cls, path: str | Path) -> BinaryRulesIndex:
+        with open(path, "rb") as f:
+            if os.name == "nt":
+                # Windows cannot replace a mapped file, which would block re-ingestion
+                return cls(f.read())
+            # The mapping stays valid after the file is closed or atomically replaced
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    @classmethod
+    def from_rules(cls, raw_rules: Sequence[dict[str, Any]]) -> BinaryRulesIndex:
+        return cls(build_binary_index(raw_rules))
+
+    def postings(self, year: int, term: int) -> np.ndarray:
+        """Ids of the rules of `year` that contain term id `term`, ascending."""
+        y = self.years.index(year)
+        base = y * (self.n_terms + 1)
+        indptr = self._views["post_indptr"]
+        return self._views["post_rules"][indptr[base + term] : indptr[base + term + 1]]
+
+    def match_text(self, rule: int) -> str:
+        offsets = self._views["text_offsets"]
+        return bytes(self._views["text_blob"][offsets[rule] : offsets[rule + 1]]).decode("utf-8")
+
+    def rule(self, idx: int) -> RuleBody:
+        body = self._bodies.get(idx)
+        if body is None:
+            offsets = self._views["body_offsets"]
+            raw = loads(self._views["body_blob"][offsets[idx] : offsets[idx + 1]])
+            body = self._bodies[idx] = RuleBody(**raw)
+        return body
+
+    def listing(self, idx: int) -> tuple[str, str, str]:
+        """(category, title, summary) of a rule, without decoding or caching its body."""
+        offsets = self._views["listing_offsets"]
+        category, title, summary = loads(
+            self._views["listing_blob"][offsets[idx] : offsets[idx + 1]]
+        )
+        return category, title, summary
+
+    def doc_terms(self, idx: int) -> np.ndarray:
+        indptr = self._views["doc_indptr"]
+        return self._views["doc_terms"][indptr[idx] : indptr[idx + 1]]
+
+    def year_docs(self, year: int) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """(rule ids, doc indptr, term ids, term frequencies) of one year's rules."""
+        rows = np.flatnonzero(self.rule_years == year)
+        indptr = self._views["doc_indptr"].astype(np.int64)
+        starts, lengths = indptr[rows], np.diff(indptr)[rows]
+        sub_indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=sub_indptr[1:])
+        sel = np.repeat(starts - sub_indptr[:-1], lengths) + np.arange(sub_indptr[-1])
+        return rows, sub_indptr, self._views["doc_terms"][sel], self._views["doc_tfs"][sel]
+
+
+def write_binary_index(raw_rules: Sequence[dict[str, Any]], path: str | Path) -> None:
+    atomic_write_bytes(path, build_binary_index(raw_rules))
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Iterable, Sequence
+
+import numpy as np
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a fixed document collection, stored as a term-major sparse
+    matrix (CSR layout: `indptr` per term into `doc_ids`/`weights`). The full BM25
+    contribution of each (term, doc) pair is precomputed when the index is built, so
+    scoring a query is a gather plus one `np.bincount` over the query terms' postings.
+    """
+
+    def __init__(self, docs: Sequence[Iterable[str]], k1: float = 1.2, b: float = 0.75) -> None:
+        self.vocab: dict[str, int] = {}
+        indptr = [0]
+        doc_terms: list[int] = []
+        doc_tfs: list[int] = []
+        for doc in docs:
+            for term, n in Counter(doc).items():
+                doc_terms.append(self.vocab.setdefault(term, len(self.vocab)))
+                doc_tfs.append(n)
+            indptr.append(len(doc_terms))
+        self._build(
+            np.array(indptr, dtype=np.int64),
+            np.array(doc_terms, dtype=np.int64),
+            np.array(doc_tfs, dtype=np.float64),
+            len(self.vocab),
+            k1,
+            b,
+        )
+
+    @classmethod
+    def from_csr(
+        cls,
+        doc_indptr: np.ndarray,
+        doc_terms: np.ndarray,
+        doc_tfs: np.ndarray,
+        n_terms: int,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ) -> BM25Index:
+        """
+        Builds the index from doc-major term counts (row d of the CSR matrix holds the
+        term ids and frequencies of document d). Terms are then addressed by id only.
+        """
+        index = cls.__new__(cls)
+        index.vocab = {}
+        index._build(
+            np.asarray(doc_indptr, dtype=np.int64),
+            np.asarray(doc_terms, dtype=np.int64),
+            np.asarray(doc_tfs, dtype=np.float64),
+            n_terms,
+            k1,
+            b,
+        )
+        return index
+
+    def _build(
+        self,
+        doc_indptr: np.ndarray,
+        doc_terms: np.ndarray,
+        tf: np.ndarray,
+        n_terms: int,
+        k1: float,
+        b: float,
+    ) -> None:
+        self.k1 = k1
+        self.b = b
+        self.n_docs = len(doc_indptr) - 1
+        doc_of_posting = np.repeat(np.arange(self.n_docs), np.diff(doc_indptr))
+        doc_len = np.bincount(doc_of_posting, weights=tf, minlength=self.n_docs)
+        avgdl = float(doc_len.mean()) if self.n_docs and doc_len.sum() else 1.0
+
+        # Transpose to term-major; a stable sort keeps doc ids ascending per term
+        order = np.argsort(doc_terms, kind="stable")
+        term_of_posting = doc_terms[order]
+        self.doc_ids = doc_of_posting[order].astype(np.int32)
+        self.indptr = np.zeros(n_terms + 1, dtype=np.int64)
+        np.cumsum(np.bincount(doc_terms, minlength=n_terms), out=self.indptr[1:])
+
+        df = np.diff(self.indptr).astype(np.float64)
+        # Lucene-style idf; never negative, even for terms in most documents
+        self.idf = np.log1p((self.n_docs - df + 0.5) / (df + 0.5))
+        tf = tf[order]
+        norm = k1 * (1.0 - b + b * doc_len[self.doc_ids] / avgdl)
+        self.weights = (self.idf[term_of_posting] * tf * (k1 + 1.0) / (tf + norm)).astype(
+            np.float32
+        )
+
+    def scores(self, terms: Iterable[str]) -> np.ndarray:
+        """BM25 score of every document for a bag of query terms (each counted once)."""
+        return self.scores_for_ids(self.vocab[t] for t in terms if t in self.vocab)
+
+    def scores_for_ids(self, term_ids: Iterable[int]) -> np.ndarray:
+        ids = np.array(sorted(set(term_ids)), dtype=np.int64)
+        if ids.size == 0:
+            return np.zeros(self.n_docs, dtype=np.float64)
+        starts, lengths = self.indptr[ids], np.diff(self.indptr)[ids]
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        sel = np.repeat(starts - offsets, lengths) + np.arange(lengths.sum())
+        return np.bincount(self.doc_ids[sel], weights=self.weights[sel], minlength=self.n_docs)
+
+    def top_k(self, terms: Iterable[str], k: int) -> list[tuple[int, float]]:
+        """(doc_id, score) of the best `k` documents with a positive score, best first."""
+        return top_k_scores(self.scores(terms), k)
+
+    def top_k_ids(self, term_ids: Iterable[int], k: int) -> list[tuple[int, float]]:
+        return top_k_scores(self.scores_for_ids(term_ids), k)
+
+
+def top_k_scores(scores: np.ndarray, k: int) -> list[tuple[int, float]]:
+    """(position, score) of the best `k` positive scores, best first."""
+    matched = np.flatnonzero(scores > 0)
+    if k <= 0 or matched.size == 0:
+        return []
+    if matched.size > k:
+        part = np.argpartition(-scores[matched], k - 1)[:k]
+        matched = matched[part]
+    # Stable ordering: score descending, then document order
+    order = np.lexsort((matched, -scores[matched]))
+    return [(int(d), float(scores[d])) for d in matched[order]]
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import io
+import os
+import re
+import zlib
+from collections import Counter
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from app.infra.serialization import dumps_bytes, loads
+
+from .loader import atomic_write_bytes
+
+# Dense rule vectors without a model: character n-grams of each word are hashed into
+# `dim` buckets (the hashing trick is the projection), weighted by sublinear TF-IDF
+# and L2-normalized, so a dot product is the cosine similarity. N-grams make
+# "Entfernungspauschale" close to "Entfernung" and "Pauschale". Everything is
+# deterministic (crc32), so vectors built at ingest match queries encoded later.
+DENSE_VERSION = 1
+DEFAULT_DIM = 2048
+NGRAM_RANGE = (3, 5)
+_WORD = re.compile(r"\w+")
+
+
+def char_ngrams(text: str, n_min: int = NGRAM_RANGE[0], n_max: int = NGRAM_RANGE[1]) -> list[str]:
+    """N-grams of each lowercased word, padded with spaces so word edges count."""
+    grams: list[str] = []
+    for word in _WORD.findall(text.lower()):
+        padded = f" {word} "
+        for n in range(n_min, n_max + 1):
+            grams.extend(padded[i : i + n] for i in range(len(padded) - n + 1))
+    return grams
+
+
+def _bucket_counts(text: str, dim: int) -> Counter[int]:
+    return Counter(zlib.crc32(g.encode("utf-8")) % dim for g in char_ngrams(text))
+
+
+def _normalize(m: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(m, axis=-1, keepdims=True)
+    return np.divide(m, norms, out=np.zeros_like(m), where=norms > 0)
+
+
+def dense_dir_for(chroma_path: str | Path) -> Path:
+    return Path(chroma_path) / "rules_dense"
+
+
+@dataclass
+class DenseIndex:
+    """
+    Rule vectors grouped by year: rows `year_offsets[y]:year_offsets[y + 1]` belong to
+    `years[y]`, so a year is searched with one matrix-vector product over a
+    contiguous (memory-mappable) slice. `rule_idx` maps rows back to positions in
+    the rules index; `sources` are the hashes of the index files the vectors match.
+    """
+
+    vectors: np.ndarray
+    rule_idx: np.ndarray
+    idf: np.ndarray
+    years: list[int]
+    year_offsets: list[int]
+    sources: list[str]
+
+    @property
+    def dim(self) -> int:
+        return int(self.idf.shape[0])
+
+    @classmethod
+    def build(
+        cls,
+        raw_rules: Sequence[dict[str, Any]],
+        sources: Sequence[str] = (),
+        dim: int = DEFAULT_DIM,
+    ) -> DenseIndex:
+        counts = np.zeros((len(raw_rules), dim), dtype=np.float32)
+        for i, r in enumerate(raw_rules):
+            for bucket, n in _bucket_counts(f'{r["title"]} {r["summary"]}', dim).items():
+                counts[i, bucket] = n
+        df = np.count_nonzero(counts, axis=0)
+        idf = (np.log((1 + len(raw_rules)) / (1 + df)) + 1.0).astype(np.float32)
+        tf = np.log1p(counts, out=counts)  # sublinear tf
+        vectors = _normalize(tf * idf)
+
+        rule_years = np.array([int(r["year"]) for r in raw_rules], dtype=np.int64)
+        order = np.argsort(rule_years, kind="stable")
+        years, starts = np.unique(rule_years[order], return_index=True)
+        return cls(
+            vectors=np.ascontiguousarray(vectors[order]),
+            rule_idx=order.astype(np.int32),
+            idf=idf,
+            years=[int(y) for y in years],
+            year_offsets=[int(s) for s in starts] + [len(raw_rules)],
+            sources=list(sources),
+        )
+
+    def encode(self, text: str) -> np.ndarray:
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for bucket, n in _bucket_counts(text, self.dim).items():
+            vec[bucket] = np.log1p(n)
+        return _normalize(vec * self.idf)
+
+    def scores(self, text: str, year: int) -> tuple[np.ndarray, np.ndarray]:
+        """(rule index positions, cosine similarities) of every rule of `year`."""
+        if year not in self.years:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+        y = self.years.index(year)
+        rows = slice(self.year_offsets[y], self.year_offsets[y + 1])
+        return self.rule_idx[rows], self.vectors[rows] @ self.encode(text)
+
+    def save(self, directory: str | Path) -> None:
+        """Writes the arrays first and meta.json last; a load checks them against it."""
+        directory = Path(directory)
+        for name in ("vectors", "rule_idx", "idf"):
+            buf = io.BytesIO()
+            np.save(buf, getattr(self, name))
+            atomic_write_bytes(directory / f"{name}.npy", buf.getvalue())
+        meta = {
+            "version": DENSE_VERSION,
+            "dim": self.dim,
+            "ngram_range": list(NGRAM_RANGE),
+            "rules": len(self.rule_idx),
+            "years": self.years,
+            "year_offsets": self.year_offsets,
+            "sources": self.sources,
+        }
+        atomic_write_bytes(directory / "meta.json", dumps_bytes(meta, indent=True))
+
+    @classmethod
+    def load(cls, directory: str | Path) -> DenseIndex | None:
+        """The saved index (vectors memory-mapped), or None if missing or inconsistent."""
+        directory = Path(directory)
+        try:
+            meta = loads((directory / "meta.json").read_bytes())
+            # Windows cannot replace a mapped file, which would block re-ingestion
+            vectors = np.load(directory / "vectors.npy", mmap_mode=None if os.name == "nt" else "r")
+            rule_idx = np.load(directory / "rule_idx.npy")
+            idf = np.load(directory / "idf.npy")
+        except (OSError, ValueError):
+            return None
+        if (
+            meta.get("version") != DENSE_VERSION
+            or meta.get("ngram_range") != list(NGRAM_RANGE)
+            or vectors.shape != (meta["rules"], meta["dim"])
+            or rule_idx.shape != (meta["rules"],)
+            or idf.shape != (meta["dim"],)
+        ):
+            return None
+        return cls(
+            vectors=vectors,
+            rule_idx=rule_idx,
+            idf=idf,
+            years=meta["years"],
+            year_offsets=meta["year_offsets"],
+            sources=meta["sources"],
+        )
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+import structlog
+
+from app.infra.serialization import loads
+
+from .binary_index import BinaryRulesIndex, is_binary_index
+
+log = structlog.get_logger(__name__)
+
+
+def _file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _stat_key(path: Path) -> tuple[int, int]:
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def load_rules_index(path: str | Path) -> BinaryRulesIndex:
+    """
+    Opens a binary index (memory-mapped) or converts a JSON index in memory. A binary
+    index written by an older format version falls back to the JSON index next to it
+    until ingestion is re-run.
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Rules index not found at {path}. Run ingestion first.")
+    if is_binary_index(path):
+        try:
+            return BinaryRulesIndex.open(path)
+        except ValueError:
+            json_path = path.with_suffix(".json")
+            if not json_path.exists():
+                raise
+            log.warning("rules_index_outdated", path=str(path), fallback=str(json_path))
+            path = json_path
+    return BinaryRulesIndex.from_rules(loads(path.read_bytes()))
+
+
+@dataclass(frozen=True)
+class IndexSnapshot:
+    """One loaded version of the index file. Never mutated; replaced on reload."""
+
+    index: BinaryRulesIndex
+    version: int
+    content_hash: str
+    stat: tuple[int, int]
+
+
+class IndexHolder:
+    """
+    Thread-safe holder of the current rules index loaded from `path`.
+
+    `snapshot()` stat()s the file and returns the current snapshot. Only when size
+    or mtime changed is the content hashed, and only when the hash changed is a new
+    index built and swapped in. The swap is a single reference assignment, so
+    searches holding the previous snapshot finish on it undisturbed. One thread
+    rebuilds at a time; others keep getting the old snapshot meanwhile. If the new
+    file cannot be loaded, the old index stays in service.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._reload_lock = threading.Lock()
+        self.reloads = 0
+        stat = _stat_key(self.path)
+        self._current = IndexSnapshot(
+            index=load_rules_index(self.path),
+            version=1,
+            content_hash=_file_sha256(self.path),
+            stat=stat,
+        )
+
+    @property
+    def current(self) -> IndexSnapshot:
+        """The snapshot in service, without looking at the file."""
+        return self._current
+
+    def snapshot(self) -> IndexSnapshot:
+        current = self._current
+        try:
+            stat = _stat_key(self.path)
+        except FileNotFoundError:
+            return current  # removed (or mid-replace): keep serving what we have
+        if stat == current.stat:
+            return current
+        if not self._reload_lock.acquire(blocking=False):
+            return current  # another thread is already rebuilding
+        try:
+            if stat != self._current.stat:
+                self._current = self._reload(self._current, stat)
+            return self._current
+        finally:
+            self._reload_lock.release()
+
+    def _reload(self, current: IndexSnapshot, stat: tuple[int, int]) -> IndexSnapshot:
+        try:
+            content_hash = _file_sha256(self.path)
+            if content_hash == current.content_hash:
+                return dataclasses.replace(current, stat=stat)  # touched but identical
+            index = load_rules_index(self.path)
+        except (OSError, ValueError) as e:
+            log.warning("rules_index_reload_failed", path=str(self.path), error=str(e))
+            return dataclasses.replace(current, stat=stat)
+        self.reloads += 1
+        return IndexSnapshot(
+            index=index, version=current.version + 1, content_hash=content_hash, stat=stat
+        )
+
+
+_holders: dict[str, IndexHolder] = {}
+_holders_lock = threading.Lock()
+
+
+def get_index_holder(path: str | Path = ".data/rules_index.bin") -> IndexHolder:
+    """Process-wide IndexHolder per index file, loaded on first use."""
+    key = str(Path(path).resolve())
+    with _holders_lock:
+        if key not in _holders:
+            _holders[key] = IndexHolder(path)
+        return _holders[key]
@@ -1,26 +1,231 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
 
-from .loader import load_rules_from_dir, write_rules_index_json
+from app.infra.config import AppSettings
+from app.infra.serialization import dumps_bytes, loads
+
+from .binary_index import VERSION as BINARY_VERSION
+from .binary_index import write_binary_index
+from .dense import DenseIndex, dense_dir_for
+from .loader import (
+    RuleLoadError,
+    atomic_write_bytes,
+    check_unique_ids,
+    load_rules_from_files,
+    rule_files,
+    write_rules_index_json,
+)
+from .models import Rule
+
+MANIFEST_VERSION = 2
+
+
+@dataclass
+class IngestReport:
+    out_path: str
+    rules: int = 0
+    parsed: list[str] = field(default_factory=list)
+    reused: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    written: bool = False
+    dense_written: bool = False
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.parsed or self.removed)
+
+    def summary(self) -> str:
+        return (
+            f"{self.out_path}: {self.rules} rules, {len(self.parsed)} file(s) new or changed, "
+            f"{len(self.reused)} unchanged, {len(self.removed)} removed"
+        )
+
+
+def manifest_path(out_path: str | Path) -> Path:
+    """The manifest lives next to the index: rules_index.json -> rules_index.manifest.json."""
+    out = Path(out_path)
+    return out.with_name(f"{out.stem}.manifest.json")
+
+
+def binary_index_path(out_path: str | Path) -> Path:
+    """The binary index lives next to the JSON one: rules_index.json -> rules_index.bin."""
+    return Path(out_path).with_suffix(".bin")
+
+
+def _ensure_dense(out_path: Path, chroma_path: str | Path) -> bool:
+    """(Re)builds the dense vectors under `chroma_path` unless they match both index
+    files already. Returns whether they were written."""
+    sources = [_sha256(out_path.read_bytes()), _sha256(binary_index_path(out_path).read_bytes())]
+    directory = dense_dir_for(chroma_path)
+    current = DenseIndex.load(directory)
+    if current is not None and sorted(current.sources) == sorted(sources):
+        return False
+    DenseIndex.build(loads(out_path.read_bytes()), sources=sources).save(directory)
+    return True
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _read_previous(out_path: Path, root: Path) -> tuple[dict[str, Any], dict[str, dict]]:
+    """
+    Returns (files section of the manifest, rule_id -> indexed rule) from the last
+    run, or empty dicts when any index file is missing or they do not belong together.
+    """
+    mpath = manifest_path(out_path)
+    bpath = binary_index_path(out_path)
+    if not out_path.exists() or not mpath.exists() or not bpath.exists():
+        return {}, {}
+    try:
+        manifest = loads(mpath.read_bytes())
+        index_bytes = out_path.read_bytes()
+        binary_sha256 = _sha256(bpath.read_bytes())
+    except (OSError, ValueError):
+        return {}, {}
+    valid = (
+        manifest.get("version") == MANIFEST_VERSION
+        and manifest.get("rules_dir") == root.as_posix()
+        and manifest.get("index_sha256") == _sha256(index_bytes)
+        and manifest.get("binary_version") == BINARY_VERSION
+        and manifest.get("binary_sha256") == binary_sha256
+    )
+    if not valid:
+        return {}, {}
+    return manifest.get("files", {}), {r["rule_id"]: r for r in loads(index_bytes)}
+
+
+def ingest_rules(
+    rules_dir: str | Path = "knowledge/rules/de",
+    out_path: str | Path = ".data/rules_index.json",
+    force: bool = False,
+    check: bool = False,
+    jobs: int = 1,
+    chroma_path: str | Path | None = None,
+) -> IngestReport:
+    """
+    Brings the rules index up to date. Files whose content hash matches the manifest
+    reuse their already-validated rules from the current index; only new or changed
+    files are parsed. The JSON index, the binary index next to it and the manifest
+    are rewritten atomically, and only when something changed. With `check=True`
+    nothing is written.
+    """
+    out = Path(out_path)
+    root = Path(rules_dir)
+    report = IngestReport(out_path=str(out))
+    prev_files, prev_rules = ({}, {}) if force else _read_previous(out, root)
+
+    files: dict[str, dict[str, Any]] = {}
+    # Unchanged files reuse their rules; changed ones are parsed together below
+    slots: list[tuple[Path, list[Rule | dict] | None]] = []
+    for path in rule_files(root):
+        rel = path.relative_to(root).as_posix()
+        digest = _sha256(path.read_bytes())
+        prev = prev_files.get(rel, {})
+        if prev.get("sha256") == digest and all(rid in prev_rules for rid in prev["rule_ids"]):
+            slots.append((path, [prev_rules[rid] for rid in prev["rule_ids"]]))
+            files[rel] = prev
+            report.reused.append(rel)
+        else:
+            slots.append((path, None))
+            files[rel] = {"sha256": digest}
+            report.parsed.append(rel)
+
+    parsed = load_rules_from_files([p for p, reused in slots if reused is None], jobs=jobs)
+    rules: list[Rule | dict] = []
+    for path, reused in slots:
+        if reused is None:
+            files[path.relative_to(root).as_posix()]["rule_ids"] = [r.rule_id for r in parsed[path]]
+            rules.extend(parsed[path])
+        else:
+            rules.extend(reused)
+    report.removed = sorted(set(prev_files) - set(files))
+    report.rules = len(rules)
+
+    check_unique_ids(r.rule_id if isinstance(r, Rule) else r["rule_id"] for r in rules)
+    if check or not (report.changed or force):
+        if chroma_path is not None and not check:
+            report.dense_written = _ensure_dense(out, chroma_path)
+        return report
+
+    write_rules_index_json(rules, out)
+    # Binary index from the normalized JSON, so both carry identical rule data
+    write_binary_index(loads(out.read_bytes()), binary_index_path(out))
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "rules_dir": root.as_posix(),
+        "index_sha256": _sha256(out.read_bytes()),
+        "binary_version": BINARY_VERSION,
+        "binary_sha256": _sha256(binary_index_path(out).read_bytes()),
+        "files": files,
+    }
+    atomic_write_bytes(manifest_path(out), dumps_bytes(manifest, indent=True))
+    report.written = True
+    if chroma_path is not None:
+        report.dense_written = _ensure_dense(out, chroma_path)
+    return report
 
 
 def build_index(
-    rules_dir: str = "knowledge/rules/de", out_path: str = ".data/rules_index.json"
+    rules_dir: str = "knowledge/rules/de",
+    out_path: str = ".data/rules_index.json",
+    jobs: int = 1,
+    chroma_path: str | None = None,
 ) -> str:
-    """Validate all rules and write normalized JSON index. Returns the output path."""
-    rules = load_rules_from_dir(rules_dir)
-    write_rules_index_json(rules, out_path)
+    """Validate changed rules and (re)write the JSON and binary indexes. Returns the JSON path."""
+    ingest_rules(rules_dir, out_path, jobs=jobs, chroma_path=chroma_path)
     return out_path
 
 
 def main() -> None:
-    parser = argparse.ArgumentParser(description="Ingest DE rules into a normalized JSON index.")
+    parser = argparse.ArgumentParser(
+        description="Ingest DE rules into normalized JSON and binary indexes."
+    )
     parser.add_argument("--rules-dir", default="knowledge/rules/de", help="Root of rules directory")
     parser.add_argument("--out", default=".data/rules_index.json", help="Output JSON path")
+    parser.add_argument("--force", action="store_true", help="Re-parse every file")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes for parsing changed files (0: one per CPU)",
+    )
+    parser.add_argument(
+        "--chroma-path",
+        default=AppSettings().chroma_path,
+        help="Where to keep the dense vectors for hybrid retrieval",
+    )
+    parser.add_argument("--no-dense", action="store_true", help="Skip the dense vectors")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Only report whether the index is stale; exit code 1 if it is",
+    )
     args = parser.parse_args()
-    out = build_index(args.rules_dir, args.out)
-    print(f"✅ Wrote index with {len(load_rules_from_dir(args.rules_dir))} rules to: {out}")
+    try:
+        report = ingest_rules(
+            args.rules_dir,
+            args.out,
+            force=args.force,
+            check=args.check,
+            jobs=args.jobs,
+            chroma_path=None if args.no_dense else args.chroma_path,
+        )
+    except RuleLoadError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(2)
+    if args.check:
+        print(f"{'❌ Stale' if report.changed else '✅ Up to date'}: {report.summary()}")
+        sys.exit(1 if report.changed else 0)
+    print(f"✅ {'Wrote' if report.written else 'Unchanged'} {report.summary()}")
+    if report.dense_written:
+        print(f"✅ Wrote dense vectors under {args.chroma_path}")
 
 
 if __name__ == "__main__":
@@ -1,40 +1,108 @@
 from __future__ import annotations
 
-import json
-from collections.abc import Iterable
+import os
+import tempfile
+from collections import Counter
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import yaml
+from pydantic import TypeAdapter, ValidationError
+
+from app.infra.serialization import dumps_bytes
 
 from .models import Rule
 
+# libyaml's C parser when PyYAML was built with it; same safe semantics, much faster
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_RULES = TypeAdapter(list[Rule])
+
+
+class RuleLoadError(ValueError):
+    """One or more rule files could not be loaded; `errors` lists every problem found."""
+
+    def __init__(self, errors: list[str]) -> None:
+        self.errors = errors
+        super().__init__(f"{len(errors)} rule error(s):\n" + "\n".join(errors))
+
+
+def _format_validation_error(path: Path, e: ValidationError, single: bool) -> list[str]:
+    out = []
+    for err in e.errors():
+        loc = [str(p) for p in err["loc"]]
+        where = f"{path}" if single else f"{path}[{loc[0]}]"
+        field_path = ".".join(loc[1:]) or "<rule>"
+        out.append(f"Invalid rule at {where}: {field_path}: {err['msg']}")
+    return out
+
 
-def load_rules_from_dir(root: str | Path) -> list[Rule]:
+def _load_file(path: Path) -> tuple[list[Rule], list[str]]:
     """
-    Load and validate all YAML rule files under a directory tree.
-    Expects structure: knowledge/rules/de/{2024,2025}/*.yml
+    Parses and validates one file holding a single rule or a list of rules. Returns
+    (rules, errors) instead of raising, so a pool run can report every bad file.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            raw = yaml.load(f, Loader=_YAML_LOADER)
+    except (OSError, yaml.YAMLError) as e:
+        return [], [f"Invalid rule at {path}: {e}"]
+    single = isinstance(raw, dict)
+    if not single and not isinstance(raw, list):
+        return [], [f"Invalid rule at {path}: expected a mapping or a list of mappings"]
+    try:
+        return _RULES.validate_python([raw] if single else raw), []
+    except ValidationError as e:
+        return [], _format_validation_error(path, e, single)
+
+
+def load_rules_from_files(paths: Sequence[Path], jobs: int = 1) -> dict[Path, list[Rule]]:
+    """
+    Loads and validates `paths`, in a process pool of `jobs` workers when there is
+    more than one (0 means one per CPU). Raises RuleLoadError listing the problems
+    of all files, not just the first bad one.
     """
+    jobs = jobs or os.cpu_count() or 1
+    if jobs > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as pool:
+            chunksize = max(1, len(paths) // (jobs * 4))
+            results = list(pool.map(_load_file, paths, chunksize=chunksize))
+    else:
+        results = [_load_file(p) for p in paths]
+    errors = [err for _, errs in results for err in errs]
+    if errors:
+        raise RuleLoadError(errors)
+    return {path: rules for path, (rules, _) in zip(paths, results, strict=True)}
+
+
+def load_rules_from_file(path: str | Path) -> list[Rule]:
+    """Load and validate the rule(s) defined in one YAML file."""
+    return load_rules_from_files([Path(path)])[Path(path)]
+
+
+def check_unique_ids(rule_ids: Iterable[str]) -> None:
+    counts = Counter(rule_ids)
+    duplicates = sorted(rule_id for rule_id, n in counts.items() if n > 1)
+    if duplicates:
+        raise ValueError(f"Duplicate rule_id detected: {', '.join(duplicates)}")
+
+
+def rule_files(root: str | Path) -> list[Path]:
+    """All rule YAML files under `root`, in a stable order."""
     root = Path(root)
     if not root.is_dir():
         raise FileNotFoundError(f"Rules directory not found: {root}")
+    return sorted(root.rglob("*.yml"))
 
-    rules: list[Rule] = []
-    for path in root.rglob("*.yml"):
-        with open(path, encoding="utf-8") as f:
-            raw = yaml.safe_load(f)
-        try:
-            rule = Rule(**raw)
-        except Exception as e:
-            raise ValueError(f"Invalid rule at {path}: {e}") from e
-        rules.append(rule)
-
-    # Validate uniqueness of rule_id
-    seen_ids = set()
-    for r in rules:
-        if r.rule_id in seen_ids:
-            raise ValueError(f"Duplicate rule_id detected: {r.rule_id}")
-        seen_ids.add(r.rule_id)
 
+def load_rules_from_dir(root: str | Path, jobs: int = 1) -> list[Rule]:
+    """
+    Load and validate all YAML rule files under a directory tree.
+    Expects structure: knowledge/rules/de/{2024,2025}/*.yml
+    """
+    by_file = load_rules_from_files(rule_files(root), jobs=jobs)
+    rules = [rule for file_rules in by_file.values() for rule in file_rules]
+    check_unique_ids(r.rule_id for r in rules)
     return rules
 
 
@@ -43,9 +111,24 @@ def ensure_data_dir(path: str | Path = ".data") -> None:
     Path(path).mkdir(parents=True, exist_ok=True)
 
 
-def write_rules_index_json(rules: Iterable[Rule], out_path: str | Path) -> None:
+def atomic_write_bytes(path: str | Path, data: bytes) -> None:
+    """Writes via a temp file in the same directory and os.replace, so readers never
+    see a partial file."""
+    path = Path(path)
+    ensure_data_dir(path.parent)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def write_rules_index_json(rules: Iterable[Rule | dict], out_path: str | Path) -> None:
     """Write a normalized JSON index that the retriever can load quickly."""
-    ensure_data_dir(Path(out_path).parent)
-    payload = [r.model_dump() for r in rules]
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2)
+    payload = [r.model_dump() if isinstance(r, Rule) else r for r in rules]
+    atomic_write_bytes(out_path, dumps_bytes(payload, indent=True))
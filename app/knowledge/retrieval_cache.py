@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from .models import RuleHit
+from .retriever import InMemoryRetriever
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query, used as the cache key."""
+    return " ".join(query.lower().split())
+
+
+class CachedRetriever:
+    """
+    LRU cache of search results in front of an InMemoryRetriever, keyed by
+    (normalized query, year, k).
+
+    The index comes from the shared IndexHolder, which reloads it when the file
+    content changes; the cache is cleared whenever a new index version appears, and
+    results computed on an older version are never stored. Callers get copies of
+    the cached hits.
+    """
+
+    def __init__(
+        self,
+        index_path: str | Path = ".data/rules_index.bin",
+        scorer: str = "overlap",
+        max_entries: int = 1024,
+        dense_dir: str | Path | None = None,
+    ) -> None:
+        self.index_path = Path(index_path)
+        self.scorer = scorer
+        self.max_entries = max_entries
+        self._retriever = InMemoryRetriever(self.index_path, scorer=scorer, dense_dir=dense_dir)
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[str, int, int], list[RuleHit]] = OrderedDict()
+        self._version = self._retriever.holder.current.version
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def search(self, query: str, year: int, k: int = 3) -> list[RuleHit]:
+        key = (normalize_query(query), year, k)
+        snap = self._retriever.holder.snapshot()
+        with self._lock:
+            if snap.version > self._version:
+                self._entries.clear()
+                self._version = snap.version
+                self.reloads += 1
+            cached = self._entries.get(key)
+            if cached is not None and snap.version == self._version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return [h.model_copy() for h in cached]
+            self.misses += 1
+        hits = self._retriever.search(key[0], year, k, snapshot=snap)
+        with self._lock:
+            if snap.version == self._version and self.max_entries > 0:
+                self._entries[key] = hits
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return [h.model_copy() for h in hits]
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "reloads": self.reloads,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+_shared: dict[tuple[str, str, int, str | None], CachedRetriever] = {}
+_shared_lock = threading.Lock()
+
+
+def get_cached_retriever(
+    index_path: str | Path = ".data/rules_index.bin",
+    scorer: str = "overlap",
+    max_entries: int = 1024,
+    dense_dir: str | Path | None = None,
+) -> CachedRetriever:
+    """Process-wide CachedRetriever per distinct set of arguments, built on first use."""
+    key = (
+        str(Path(index_path).resolve()),
+        scorer,
+        max_entries,
+        str(Path(dense_dir).resolve()) if dense_dir is not None else None,
+    )
+    with _shared_lock:
+        if key not in _shared:
+            _shared[key] = CachedRetriever(
+                index_path, scorer=scorer, max_entries=max_entries, dense_dir=dense_dir
+            )
+        return _shared[key]
@@ -1,86 +1,262 @@
 from __future__ import annotations
 
-import json
-from dataclasses import dataclass
+import heapq
+from collections.abc import Sequence
 from pathlib import Path
 
-from rapidfuzz import fuzz
+import numpy as np
+import structlog
+from rapidfuzz import fuzz, process
 
+from .binary_index import BinaryRulesIndex
+from .bm25 import BM25Index, top_k_scores
+from .dense import DenseIndex
+from .index_holder import IndexHolder, IndexSnapshot, get_index_holder
 from .models import RuleHit
-from .sanitize import sanitize_snippet
-from .synonyms import SYNONYMS
+from .synonym_matcher import DEFAULT_MATCHER
 
+log = structlog.get_logger(__name__)
 
-@dataclass(frozen=True)
-class IndexedRule:
-    rule_id: str
-    year: int
-    title: str
-    category: str  # Storing as generic str here
-    snippet: str
-    required_data_points: list[str]
-    calculator_binding: str
-    search_terms: frozenset[str]
+SCORERS = ("overlap", "bm25", "hybrid")
+# Hybrid score = weight * BM25 (scaled to the best hit) + (1 - weight) * cosine
+HYBRID_LEXICAL_WEIGHT = 0.5
+# Rules without a shared term need at least this cosine to be returned
+MIN_DENSE_SIMILARITY = 0.1
+# Queries per cdist call in search_many; bounds the score matrix size
+_BATCH_QUERIES = 256
 
 
 class InMemoryRetriever:
-    def __init__(self, index_path: str | Path = ".data/rules_index.json") -> None:
-        path = Path(index_path)
-        if not path.exists():
-            raise FileNotFoundError(f"Rules index not found at {path}. Run ingestion first.")
-        with open(path, encoding="utf-8") as f:
-            raw_rules = json.load(f)
-        self._rules: list[IndexedRule] = []
-        for r in raw_rules:
-            terms = self._expand_terms(f'{r["title"]} {r["summary"]}')
-            self._rules.append(
-                IndexedRule(
-                    rule_id=r["rule_id"],
-                    year=int(r["year"]),
-                    title=r["title"],
-                    category=r["category"],
-                    snippet=sanitize_snippet(r["snippet"]),
-                    required_data_points=r["required_data_points"],
-                    calculator_binding=r["calculator_binding"],
-                    search_terms=frozenset(terms),
-                )
-            )
+    """
+    Searches the rules index. `scorer` selects the ranking: "overlap" (shared
+    expanded terms plus a fuzzy boost), "bm25" (Okapi BM25 over title and summary)
+    or "hybrid" (BM25 blended with the dense character n-gram vectors saved under
+    `dense_dir` at ingest; plain BM25 while those are missing or stale).
+
+    `index_path` is either the binary index (memory-mapped; rule bodies are decoded
+    only when returned) or the JSON interchange index, which is converted in memory.
+    The index comes from the process-wide IndexHolder for that file, so retrievers
+    are cheap to create and pick up a rewritten index on their next search.
+    """
+
+    def __init__(
+        self,
+        index_path: str | Path = ".data/rules_index.bin",
+        scorer: str = "overlap",
+        holder: IndexHolder | None = None,
+        dense_dir: str | Path | None = None,
+    ) -> None:
+        if scorer not in SCORERS:
+            raise ValueError(f"Unknown scorer {scorer!r}; expected one of {SCORERS}")
+        self.scorer = scorer
+        self.holder = holder or get_index_holder(index_path)
+        # Per year of one snapshot, built on first BM25 search: index plus its
+        # doc id -> rule id map
+        self._bm25: tuple[IndexSnapshot, dict[int, tuple[BM25Index, np.ndarray]]] = (
+            self.holder.current,
+            {},
+        )
+        self.dense_dir = Path(dense_dir) if dense_dir else None
+        self._dense: tuple[IndexSnapshot | None, DenseIndex | None] = (None, None)
+
+    @property
+    def index(self) -> BinaryRulesIndex:
+        return self.holder.current.index
 
     def _expand_terms(self, text: str) -> set[str]:
-        tokens = set(text.lower().split())
-        expanded = set(tokens)
-        for key, syns in SYNONYMS.items():
-            if key in tokens or any(s in text.lower() for s in syns):
-                expanded.update(syns)
-        return expanded
-
-    def search(self, query: str, year: int, k: int = 3) -> list[RuleHit]:
-        q_tokens = self._expand_terms(query)
-        candidates: list[tuple[float, IndexedRule]] = []
-        for rule in self._rules:
-            if rule.year != year:
-                continue
-            overlap = len(q_tokens.intersection(rule.search_terms))
-            fuzz_boost = fuzz.partial_ratio(query.lower(), " ".join(rule.search_terms)) / 100.0
-            score = (overlap * 1.0) + (fuzz_boost * 0.5)
-            if score >= 1.0:
-                candidates.append((score, rule))
-            # if score > 0:
-            #     candidates.append((score, rule))
-
-        candidates.sort(key=lambda x: x[0], reverse=True)
-
-        return [
-            RuleHit(
-                rule_id=rule.rule_id,
-                year=rule.year,
-                title=rule.title,
-                # Ignore this line as we know the str is a valid Category
-                category=rule.category,  # type: ignore
-                snippet=rule.snippet,
-                required_data_points=rule.required_data_points,
-                calculator_binding=rule.calculator_binding,
-                score=round(score, 4),
-            )
-            for score, rule in candidates[:k]
+        return DEFAULT_MATCHER.expand(text)
+
+    def _term_ids(self, index: BinaryRulesIndex, text: str) -> list[int]:
+        term_ids = index.term_ids
+        return sorted(term_ids[t] for t in self._expand_terms(text) if t in term_ids)
+
+    def search(
+        self, query: str, year: int, k: int = 3, snapshot: IndexSnapshot | None = None
+    ) -> list[RuleHit]:
+        """Top `k` rules of `year`. Pass `snapshot` to search a specific index version."""
+        snap = snapshot or self.holder.snapshot()
+        if year not in snap.index.years:
+            return []
+        if self.scorer == "bm25":
+            return self._to_hits(snap.index, self._search_bm25(snap, query, year, k))
+        if self.scorer == "hybrid":
+            return self._to_hits(snap.index, self._search_hybrid(snap, query, year, k))
+        return self._to_hits(snap.index, self._search_overlap(snap.index, query, year, k))
+
+    def _year_bm25(self, snap: IndexSnapshot, year: int) -> tuple[BM25Index, np.ndarray]:
+        owner, per_year = self._bm25
+        if owner is not snap:
+            per_year = {}
+            self._bm25 = (snap, per_year)
+        if year not in per_year:
+            rows, indptr, terms, tfs = snap.index.year_docs(year)
+            bm25 = BM25Index.from_csr(indptr, terms, tfs, snap.index.n_terms)
+            per_year[year] = (bm25, rows)
+        return per_year[year]
+
+    def _search_bm25(
+        self, snap: IndexSnapshot, query: str, year: int, k: int
+    ) -> list[tuple[float, int]]:
+        bm25, rule_ids = self._year_bm25(snap, year)
+        top = bm25.top_k_ids(self._term_ids(snap.index, query), k)
+        return [(score, int(rule_ids[doc])) for doc, score in top]
+
+    def _dense_for(self, snap: IndexSnapshot) -> DenseIndex | None:
+        """The dense vectors matching `snap`, loaded once per snapshot."""
+        owner, dense = self._dense
+        if owner is not snap:
+            dense = DenseIndex.load(self.dense_dir) if self.dense_dir else None
+            if dense is not None and snap.content_hash not in dense.sources:
+                log.warning("dense_index_stale", dense_dir=str(self.dense_dir))
+                dense = None
+            self._dense = (snap, dense)
+        return dense
+
+    def _search_hybrid(
+        self, snap: IndexSnapshot, query: str, year: int, k: int
+    ) -> list[tuple[float, int]]:
+        dense = self._dense_for(snap)
+        if dense is None:
+            return self._search_bm25(snap, query, year, k)
+        bm25, rule_ids = self._year_bm25(snap, year)
+        lexical = bm25.scores_for_ids(self._term_ids(snap.index, query))
+        # Both hold the year's rules in index order, so positions line up
+        # Synonyms are the lexical side's job; the dense side sees the raw query
+        _, cosine = dense.scores(query, year)
+        best = lexical.max(initial=0.0)
+        scores = (1 - HYBRID_LEXICAL_WEIGHT) * np.clip(cosine, 0.0, None)
+        if best > 0:
+            scores += HYBRID_LEXICAL_WEIGHT * lexical / best
+        scores[(lexical <= 0) & (cosine < MIN_DENSE_SIMILARITY)] = 0.0
+        return [(score, int(rule_ids[doc])) for doc, score in top_k_scores(scores, k)]
+
+    def _overlap_candidates(
+        self, index: BinaryRulesIndex, query: str, year: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Rule ids sharing a term with `query` (ascending) and how many terms each shares."""
+        postings = [index.postings(year, t) for t in self._term_ids(index, query)]
+        if not postings:
+            return np.empty(0, dtype=np.uint32), np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(postings), return_counts=True)
+
+    def _search_overlap(
+        self, index: BinaryRulesIndex, query: str, year: int, k: int
+    ) -> list[tuple[float, int]]:
+        if k <= 0:
+            return []
+        candidates, overlap = self._overlap_candidates(index, query, year)
+
+        # The fuzzy boost is at most 0.5, so only rules sharing a term can reach the
+        # 1.0 cut-off; everything else is never looked at.
+        q_lower = query.lower()
+        scored = [
+            (n + 0.5 * fuzz.partial_ratio(q_lower, index.match_text(idx)) / 100.0, idx)
+            for idx, n in zip(candidates.tolist(), overlap.tolist(), strict=True)
         ]
+        return heapq.nlargest(k, scored, key=lambda c: c[0])
+
+    def search_many(
+        self,
+        queries: Sequence[str],
+        year: int,
+        k: int = 3,
+        workers: int = -1,
+        fuzzy_cutoff: float = 0.0,
+    ) -> list[list[RuleHit]]:
+        """
+        Top `k` rules of `year` for each query, all against one index snapshot. With
+        the overlap scorer the fuzzy boosts of a whole batch are computed by one
+        rapidfuzz `cdist` call on `workers` threads (-1: all cores); fuzzy scores
+        below `fuzzy_cutoff` count as 0, which skips work at the price of exact
+        parity with `search` (the default 0 keeps it). BM25 and hybrid scoring are
+        already vectorized per query and simply run query by query.
+        """
+        snap = self.holder.snapshot()
+        if year not in snap.index.years:
+            return [[] for _ in queries]
+        if self.scorer != "overlap":
+            return [self.search(q, year, k, snapshot=snap) for q in queries]
+        results: list[list[RuleHit]] = []
+        for start in range(0, len(queries), _BATCH_QUERIES):
+            batch = queries[start : start + _BATCH_QUERIES]
+            for top in self._search_overlap_batch(
+                snap.index, batch, year, k, workers, fuzzy_cutoff
+            ):
+                results.append(self._to_hits(snap.index, top))
+        return results
+
+    def _search_overlap_batch(
+        self,
+        index: BinaryRulesIndex,
+        queries: Sequence[str],
+        year: int,
+        k: int,
+        workers: int,
+        fuzzy_cutoff: float,
+    ) -> list[list[tuple[float, int]]]:
+        # Results depend on the lowercased query only, so repeats are scored once
+        unique = list(dict.fromkeys(q.lower() for q in queries))
+        per_query = [self._overlap_candidates(index, q, year) for q in unique]
+        union = np.unique(np.concatenate([c for c, _ in per_query]))
+        if k <= 0 or union.size == 0:
+            return [[] for _ in queries]
+        n_pairs = sum(len(c) for c, _ in per_query)
+        if n_pairs * 2 >= len(unique) * union.size:
+            # Dense batch: one matrix of queries x all candidates; the pairs sharing no
+            # term are computed too but never read
+            matrix = self._fuzzy(index, unique, union, workers, fuzzy_cutoff)
+            rows = [
+                row[np.searchsorted(union, c)]
+                for row, (c, _) in zip(matrix, per_query, strict=True)
+            ]
+        else:
+            # Sparse batch: candidate sets barely overlap, so score each query only
+            # against its own candidates
+            rows = [
+                self._fuzzy(index, [q], c, workers, fuzzy_cutoff)[0]
+                for q, (c, _) in zip(unique, per_query, strict=True)
+            ]
+
+        tops: dict[str, list[tuple[float, int]]] = {}
+        for q, row, (candidates, overlap) in zip(unique, rows, per_query, strict=True):
+            scores = overlap + 0.5 * row / 100.0
+            scored = list(zip(scores.tolist(), candidates.tolist(), strict=True))
+            tops[q] = heapq.nlargest(k, scored, key=lambda c: c[0])
+        return [tops[q.lower()] for q in queries]
+
+    @staticmethod
+    def _fuzzy(
+        index: BinaryRulesIndex,
+        queries: list[str],
+        rule_ids: np.ndarray,
+        workers: int,
+        fuzzy_cutoff: float,
+    ) -> np.ndarray:
+        """partial_ratio of every (lowercased) query against every rule's match text."""
+        return process.cdist(
+            queries,
+            [index.match_text(idx) for idx in rule_ids.tolist()],
+            scorer=fuzz.partial_ratio,
+            score_cutoff=fuzzy_cutoff,
+            workers=workers,
+            dtype=np.float64,
+        )
+
+    def _to_hits(self, index: BinaryRulesIndex, top: list[tuple[float, int]]) -> list[RuleHit]:
+        hits: list[RuleHit] = []
+        for score, idx in top:
+            rule = index.rule(idx)
+            hits.append(
+                RuleHit(
+                    rule_id=rule.rule_id,
+                    year=rule.year,
+                    title=rule.title,
+                    # Ignore this line as we know the str is a valid Category
+                    category=rule.category,  # type: ignore
+                    snippet=rule.snippet,
+                    required_data_points=rule.required_data_points,
+                    calculator_binding=rule.calculator_binding,
+                    score=round(score, 4),
+                )
+            )
+        return hits
@@ -1,33 +1,157 @@
 from __future__ import annotations
 
-import json
+import dataclasses
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
+from .binary_index import BinaryRulesIndex
+from .index_holder import get_index_holder
+
+_SEARCH_FIELDS = ("title", "summary")
+
+
+def trigrams(text: str) -> set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+class _TrigramIndex:
+    """
+    Trigram postings over the lowercased title and summary of every rule, built from
+    the index's listing section, so no rule body is decoded. A query of three or more
+    characters is looked up by intersecting the postings of its trigrams (rarest
+    first) and then verified as a substring, so results are the same as a full scan;
+    shorter queries check every rule.
+    """
+
+    def __init__(self, index: BinaryRulesIndex) -> None:
+        self.index = index
+        self.years = index.rule_years.tolist()
+        self.categories: list[str] = []
+        self.lowered: list[dict[str, str]] = []
+        self.postings: dict[str, set[int]] = {}
+        for idx in range(index.n_rules):
+            category, title, summary = index.listing(idx)
+            fields = {"title": title.lower(), "summary": summary.lower()}
+            self.categories.append(category)
+            self.lowered.append(fields)
+            for gram in trigrams("\n".join(fields.values())):
+                self.postings.setdefault(gram, set()).add(idx)
+
+    def candidates(self, q: str) -> set[int] | range:
+        if len(q) < 3:
+            return range(len(self.lowered))
+        sets = sorted((self.postings.get(g, set()) for g in trigrams(q)), key=len)
+        return set.intersection(*sets) if sets else set()
+
+    def rank(self, idx: int, q: str) -> tuple[int, int, int, int] | None:
+        """
+        Sort key of a rule matching `q`: title matches first, then earlier matches, then
+        shorter fields, then index order. None if the rule does not contain `q`.
+        """
+        if not q:
+            return (0, 0, 0, idx)
+        for i, f in enumerate(_SEARCH_FIELDS):
+            pos = self.lowered[idx][f].find(q)
+            if pos >= 0:
+                return (i, pos, len(self.lowered[idx][f]), idx)
+        return None
+
+    def rule(self, idx: int) -> dict[str, Any]:
+        return dataclasses.asdict(self.index.rule(idx))
+
+
+def highlight_spans(text: str, query: str) -> list[tuple[int, int]]:
+    """(start, end) of every case-insensitive occurrence of `query` in `text`."""
+    if not query:
+        return []
+    return [m.span() for m in re.finditer(re.escape(query), text, flags=re.IGNORECASE)]
 
-class RulesService:
-    """A simple, cached service to search the rules index."""
 
-    _rules: list[dict[str, Any]]
+def _page_count(total: int, page_size: int) -> int:
+    return max(1, -(-total // page_size))
 
-    def __init__(self, index_path: str = ".data/rules_index.json"):
+
+@dataclass
+class RuleSearchPage:
+    items: list[dict[str, Any]]
+    total: int
+    page: int
+    page_size: int
+    # Matches per year / category for the query, before the facet filters apply
+    facets: dict[str, dict[Any, int]] = field(default_factory=dict)
+
+    @property
+    def pages(self) -> int:
+        return _page_count(self.total, self.page_size)
+
+
+class RulesService:
+    """Searches the rules index for the Rules browser, via the shared IndexHolder."""
+
+    def __init__(self, index_path: str = ".data/rules_index.bin"):
         if not Path(index_path).exists():
             from app.knowledge.ingest import build_index
 
             build_index()
-        with open(index_path, encoding="utf-8") as f:
-            self._rules = json.load(f)
+        self.holder = get_index_holder(index_path)
+        self._lock = threading.Lock()
+        self._trigrams: tuple[BinaryRulesIndex, _TrigramIndex] | None = None
 
-    def search(self, query: str = "", year: int | None = None) -> list[dict[str, Any]]:
-        query_lower = query.lower().strip()
-        results = self._rules
+    def _index(self) -> _TrigramIndex:
+        """The trigram index of the current rules index, built once per index version."""
+        rules_index = self.holder.snapshot().index
+        with self._lock:
+            if self._trigrams is None or self._trigrams[0] is not rules_index:
+                self._trigrams = (rules_index, _TrigramIndex(rules_index))
+            return self._trigrams[1]
+
+    def search_page(
+        self,
+        query: str = "",
+        year: int | None = None,
+        category: str | None = None,
+        page: int = 1,
+        page_size: int = 20,
+    ) -> RuleSearchPage:
+        """
+        One page of the rules whose title or summary contains `query` (case-insensitive),
+        ranked, with facet counts and the match spans of each item under `highlights`.
+        `page` is clamped to the available pages; the returned page number says which
+        page was served.
+        """
+        q = query.lower().strip()
+        index = self._index()
+        ranked = sorted(
+            key for key in (index.rank(i, q) for i in index.candidates(q)) if key is not None
+        )
+        matches = [key[-1] for key in ranked]
+        facets = {
+            "year": dict(sorted(Counter(index.years[i] for i in matches).items())),
+            "category": dict(sorted(Counter(index.categories[i] for i in matches).items())),
+        }
         if year:
-            results = [r for r in results if r.get("year") == year]
-        if query_lower:
-            results = [
-                r
-                for r in results
-                if query_lower in r.get("title", "").lower()
-                or query_lower in r.get("summary", "").lower()
-            ]
-        return results
+            matches = [i for i in matches if index.years[i] == year]
+        if category:
+            matches = [i for i in matches if index.categories[i] == category]
+
+        # Out-of-range pages are clamped, so the page returned says which one it is
+        page = min(max(1, page), _page_count(len(matches), page_size))
+        items = []
+        # Only the rules on this page have their bodies decoded
+        for idx in matches[(page - 1) * page_size : page * page_size]:
+            rule = index.rule(idx)
+            highlights = {f: highlight_spans(rule[f], query.strip()) for f in _SEARCH_FIELDS}
+            items.append({**rule, "highlights": highlights})
+        return RuleSearchPage(
+            items=items, total=len(matches), page=page, page_size=page_size, facets=facets
+        )
+
+    def search(self, query: str = "", year: int | None = None) -> list[dict[str, Any]]:
+        """All matching rules, ranked (no pagination)."""
+        index = self._index()
+        result = self.search_page(query, year=year, page_size=max(1, len(index.lowered)))
+        return [{k: v for k, v in r.items() if k != "highlights"} for r in result.items]
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+from .synonyms import SYNONYMS
+
+
+def _build_trie(phrases: Iterable[str]) -> dict[str, Any]:
+    root: dict[str, Any] = {}
+    for phrase in phrases:
+        node = root
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node[""] = True  # end of phrase
+    return root
+
+
+def _trie_regex(node: dict[str, Any]) -> str:
+    """
+    Regex equivalent to the alternation of all phrases in the trie. Optional groups
+    are greedy, so the longest phrase starting at a position is the one captured.
+    """
+    alts = [re.escape(ch) + _trie_regex(child) for ch, child in sorted(node.items()) if ch]
+    if not alts:
+        return ""
+    body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+    return f"(?:{body})?" if "" in node else body
+
+
+class SynonymMatcher:
+    """
+    Finds every synonym group mentioned in a text in a single regex pass.
+
+    The synonym table is compiled into one trie-shaped regex. A lookahead
+    captures the longest phrase at each position without consuming it, so
+    overlapping phrases are still seen; each phrase maps to the groups of all
+    phrases that are prefixes of it, which covers the shorter matches at the same
+    position. Like a plain substring test, phrases match anywhere: inside German
+    compounds ("Wochenendpendler", "Bürodrucker"), glued to numbers ("25km") and
+    in inflected forms ("laptops").
+    """
+
+    def __init__(self, table: Mapping[str, Iterable[str]]) -> None:
+        self.groups: dict[str, tuple[str, ...]] = {k: tuple(v) for k, v in table.items()}
+        keys_by_phrase: dict[str, set[str]] = {}
+        for key, syns in self.groups.items():
+            for phrase in syns:
+                keys_by_phrase.setdefault(phrase.lower(), set()).add(key)
+        self._keys_for_match: dict[str, frozenset[str]] = {
+            phrase: frozenset(
+                k for end in range(1, len(phrase) + 1) for k in keys_by_phrase.get(phrase[:end], ())
+            )
+            for phrase in keys_by_phrase
+        }
+        trie = _trie_regex(_build_trie(keys_by_phrase)) if keys_by_phrase else "(?!)"
+        self._pattern = re.compile(f"(?=({trie}))")
+
+    def match_groups(self, lowered: str) -> set[str]:
+        """Keys of all synonym groups with a phrase occurring in `lowered`."""
+        found: set[str] = set()
+        for match in self._pattern.finditer(lowered):
+            found |= self._keys_for_match[match.group(1)]
+        return found
+
+    def expand(self, text: str) -> set[str]:
+        """Lowercased tokens of `text` plus all synonyms of every group it mentions."""
+        lowered = text.lower()
+        tokens = set(lowered.split())
+        expanded = set(tokens)
+        for key in self.match_groups(lowered) | (tokens & self.groups.keys()):
+            expanded.update(self.groups[key])
+        return expanded
+
+
+# Matcher for the shipped bilingual table, shared by indexing and search
+DEFAULT_MATCHER = SynonymMatcher(SYNONYMS)
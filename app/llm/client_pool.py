@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import threading
+from typing import Any
+
+import httpx
+from groq import DefaultHttpxClient, Groq
+
+from app.infra.config import AppSettings
+
+
+class _TracingTransport(httpx.HTTPTransport):
+    """HTTPTransport that tells its pool about every request and new connection."""
+
+    def __init__(self, pool: ClientPool, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self._owner = pool
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.extensions = {**request.extensions, "trace": self._owner._trace}
+        return super().handle_request(request)
+
+
+class ClientPool:
+    """
+    One keep-alive HTTP connection pool for every Groq client in the process, so a
+    turn reuses warm TLS connections instead of opening new ones. At most
+    `max_connections` requests run at once; idle connections are closed after
+    `keepalive_expiry` seconds. Connection reuse is counted from httpcore's trace
+    events; see `stats`.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 10,
+        max_keepalive_connections: int | None = None,
+        keepalive_expiry: float = 30.0,
+    ) -> None:
+        self.max_connections = max_connections
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections or max_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http_client = DefaultHttpxClient(transport=_TracingTransport(self, limits=limits))
+        self._groq: dict[tuple[str, float], Groq] = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+
+    def _trace(self, event: str, info: dict[str, Any]) -> None:
+        if event in ("http11.send_request_headers.started", "http2.send_request_headers.started"):
+            with self._lock:
+                self.requests += 1
+        elif event == "connection.connect_tcp.complete":
+            with self._lock:
+                self.connections_opened += 1
+
+    def groq(self, api_key: str, timeout_s: float = 8.0) -> Groq:
+        """The Groq client for `api_key`, created once and sharing this pool."""
+        with self._lock:
+            key = (api_key, timeout_s)
+            if key not in self._groq:
+                # Retries are GroqAdapter's job (see app.llm.resilience), not the SDK's
+                self._groq[key] = Groq(
+                    api_key=api_key, timeout=timeout_s, max_retries=0, http_client=self.http_client
+                )
+            return self._groq[key]
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            reused = max(0, self.requests - self.connections_opened)
+            return {
+                "max_connections": self.max_connections,
+                "requests": self.requests,
+                "connections_opened": self.connections_opened,
+                "connections_reused": reused,
+                "reuse_ratio": round(reused / self.requests, 4) if self.requests else 0.0,
+            }
+
+    def close(self) -> None:
+        self.http_client.close()
+
+
+_pool: ClientPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_client_pool(cfg: AppSettings | None = None) -> ClientPool:
+    """Process-wide ClientPool, sized from the settings on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            cfg = cfg or AppSettings()
+            _pool = ClientPool(
+                max_connections=cfg.llm_max_connections,
+                keepalive_expiry=cfg.llm_keepalive_expiry_s,
+            )
+        return _pool
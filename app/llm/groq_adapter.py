@@ -2,69 +2,125 @@ from __future__ import annotations
 
 import hashlib
 import json
+import re
 from collections.abc import Callable
 from typing import Any
 
-from groq import Groq
+import groq
+import structlog
+
+from .client_pool import ClientPool, get_client_pool
+from .resilience import CircuitOpenError, Resilience, get_resilience
+
+log = structlog.get_logger(__name__)
+
+# Failures that say the provider is degraded, worth a retry and counted by the breaker
+RETRYABLE_ERRORS = (groq.APIConnectionError, groq.RateLimitError, groq.InternalServerError)
+
+
+# The router prompt (app.orchestrator.prompts) ends with `User message: "..."`
+_USER_MESSAGE = re.compile(r'user message: "(.*)"', re.DOTALL)
+
+
+def is_retryable(exc: BaseException) -> bool:
+    return isinstance(exc, RETRYABLE_ERRORS)
 
 
 class GroqAdapter:
     """
     Groq client wrapper with an offline deterministic stub for CI/dev
-    and live API calls when an API key is provided.
+    and live API calls when an API key is provided. Live clients come from the
+    process-wide ClientPool (or `pool`), so adapters are cheap to create and share
+    keep-alive connections.
+
+    Live calls go through the process-wide Resilience policy (or `resilience`):
+    `chat` and `json` are retried and optionally hedged, `stream` is retried until
+    its first token. While the provider is degraded (retries used up, or the
+    circuit breaker open) all three answer from the offline stub instead.
     """
 
-    def __init__(self, api_key: str | None, timeout_s: float = 8.0) -> None:
+    def __init__(
+        self,
+        api_key: str | None,
+        timeout_s: float = 8.0,
+        pool: ClientPool | None = None,
+        resilience: Resilience | None = None,
+    ) -> None:
         self.api_key = api_key
         # self.offline = True
         self.offline = not api_key
-        if not self.offline:
-            self.client = Groq(api_key=self.api_key, timeout=timeout_s)
+        if api_key:
+            self.pool = pool or get_client_pool()
+            self.client = self.pool.groq(api_key, timeout_s)
+            self.resilience = resilience or get_resilience("groq", is_retryable)
+
+    def _fallback(self, call: str, model: str, exc: Exception) -> None:
+        log.warning(
+            "llm_offline_fallback",
+            call=call,
+            model=model,
+            breaker=self.resilience.breaker.state,
+            error=repr(exc),
+        )
 
     def _hash(self, text: str) -> str:
         return hashlib.sha256(text.encode("utf-8")).hexdigest()[:8]
 
+    def _offline_chat(self, messages: list[dict]) -> str:
+        last_user = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+        # FIX: The 'h' variable was created but never used, so it has been removed.
+        return f"[STUBBED RESPONSE for: '{last_user[:50]}...']"
+
     def chat(self, model: str, messages: list[dict], temperature: float = 0.2) -> str:
         if self.offline:
-            last_user = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
-            # FIX: The 'h' variable was created but never used, so it has been removed.
-            return f"[STUBBED RESPONSE for: '{last_user[:50]}...']"
+            return self._offline_chat(messages)
 
-        chat_completion = self.client.chat.completions.create(
-            messages=messages, model=model, temperature=temperature
-        )
+        try:
+            chat_completion = self.resilience.call(
+                lambda: self.client.chat.completions.create(
+                    messages=messages, model=model, temperature=temperature
+                ),
+                key=f"chat:{model}",
+            )
+        except (CircuitOpenError, *RETRYABLE_ERRORS) as exc:
+            self._fallback("chat", model, exc)
+            return self._offline_chat(messages)
         return chat_completion.choices[0].message.content or ""
 
+    def _offline_json(self, messages: list[dict]) -> dict[str, Any]:
+        last_user = next(
+            (m["content"] for m in reversed(messages) if m["role"] == "user"), ""
+        ).lower()
+        # Route on the user's words, not on the category names listed in the prompt
+        match = _USER_MESSAGE.search(last_user)
+        text = match.group(1) if match else last_user
+        if any(w in text for w in ["commute", "pendler"]):
+            hint = "commuting"
+        elif any(w in text for w in ["home office", "homeoffice"]):
+            hint = "home_office"
+        elif any(w in text for w in ["equipment", "laptop", "arbeitsmittel", "gekauft"]):
+            hint = "equipment"
+        else:
+            hint = None
+        return {"intent": "deduction", "category_hint": hint, "retrieval_query": text}
+
     def json(self, model: str, messages: list[dict], temperature: float = 0.0) -> dict[str, Any]:
         if self.offline:
-            last_user = next(
-                (m["content"] for m in reversed(messages) if m["role"] == "user"), ""
-            ).lower()
-            print("OFFLINE ROUTER INPUT:", repr(last_user))  # DEBUG
-            # TEMP TEST: Force all router outputs to be equipment
-            hint = "equipment"
-            print(
-                "OFFLINE ROUTER RETURNING:",
-                {"intent": "deduction", "category_hint": hint, "retrieval_query": last_user},
-            )  # DEBUG
-            return {"intent": "deduction", "category_hint": hint, "retrieval_query": last_user}
-            if any(w in last_user for w in ["commute", "pendler"]):
-                hint = "commuting"
-            elif any(w in last_user for w in ["home office", "homeoffice"]):
-                hint = "home_office"
-            elif any(w in last_user for w in ["equipment", "laptop", "arbeitsmittel", "gekauft"]):
-                hint = "equipment"
-                print("Offline router keywords test:", last_user, "| Hint?", hint)
-            else:
-                hint = None
-            return {"intent": "deduction", "category_hint": hint, "retrieval_query": last_user}
-
-        chat_completion = self.client.chat.completions.create(
-            messages=messages,
-            model=model,
-            temperature=temperature,
-            response_format={"type": "json_object"},
-        )
+            return self._offline_json(messages)
+
+        try:
+            chat_completion = self.resilience.call(
+                lambda: self.client.chat.completions.create(
+                    messages=messages,
+                    model=model,
+                    temperature=temperature,
+                    response_format={"type": "json_object"},
+                ),
+                key=f"json:{model}",
+            )
+        except (CircuitOpenError, *RETRYABLE_ERRORS) as exc:
+            self._fallback("json", model, exc)
+            return self._offline_json(messages)
         try:
             response_text = chat_completion.choices[0].message.content or "{}"
             return json.loads(response_text)
@@ -79,17 +135,35 @@ class GroqAdapter:
         temperature: float = 0.2,
     ) -> None:
         if self.offline:
-            text = self.chat(model, messages, temperature)
-            for i in range(0, len(text), 5):
-                on_token(text[i : i + 5])
+            self._offline_stream(messages, on_token)
             return
 
-        stream = self.client.chat.completions.create(
-            messages=messages,
-            model=model,
-            temperature=temperature,
-            stream=True,
-        )
-        for chunk in stream:
-            if token := chunk.choices[0].delta.content:
-                on_token(token)
+        try:
+            # Nothing has been emitted before the stream opens, so this part may be retried
+            stream = self.resilience.call(
+                lambda: self.client.chat.completions.create(
+                    messages=messages,
+                    model=model,
+                    temperature=temperature,
+                    stream=True,
+                ),
+                key=f"stream:{model}",
+                hedge=False,
+            )
+        except (CircuitOpenError, *RETRYABLE_ERRORS) as exc:
+            self._fallback("stream", model, exc)
+            self._offline_stream(messages, on_token)
+            return
+        try:
+            for chunk in stream:
+                if token := chunk.choices[0].delta.content:
+                    on_token(token)
+        except RETRYABLE_ERRORS:
+            # Tokens may already be out: no retry, but the breaker hears about it
+            self.resilience.breaker.record_failure()
+            raise
+
+    def _offline_stream(self, messages: list[dict], on_token: Callable[[str], None]) -> None:
+        text = self._offline_chat(messages)
+        for i in range(0, len(text), 5):
+            on_token(text[i : i + 5])
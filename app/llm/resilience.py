@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, TypeVar
+
+import structlog
+
+from app.infra.config import AppSettings
+
+log = structlog.get_logger(__name__)
+
+T = TypeVar("T")
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+# Successful latencies kept per key, and how many are needed before hedging starts
+_LATENCY_WINDOW = 200
+_MIN_HEDGE_SAMPLES = 20
+
+
+class CircuitOpenError(RuntimeError):
+    """The provider is marked degraded; the call was not attempted."""
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failed calls, rejects calls for
+    `reset_timeout_s`, then lets a single trial call through (half-open): its
+    success closes the breaker, its failure opens it again. Every state change is
+    logged as an `llm_breaker_state` event.
+    """
+
+    def __init__(
+        self,
+        name: str = "groq",
+        failure_threshold: int = 5,
+        reset_timeout_s: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self.rejected = 0
+
+    def _set(self, state: str) -> None:
+        if state != self._state:
+            log.warning(
+                "llm_breaker_state",
+                breaker=self.name,
+                state=state,
+                previous=self._state,
+                failures=self._failures,
+            )
+            self._state = state
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout_s:
+                self._set(HALF_OPEN)
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go out now; in half-open only one trial call does."""
+        state = self.state
+        with self._lock:
+            if state == CLOSED or (state == HALF_OPEN and not self._trial_running):
+                self._trial_running = state == HALF_OPEN
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._trial_running = False
+            self._set(CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+                self._set(OPEN)
+
+
+class Resilience:
+    """
+    Retry, hedging and circuit-breaker policy shared by all adapters of a provider.
+
+    `call` retries failures for which `retryable` is true up to `max_retries` times,
+    sleeping a random delay of up to base_delay_s * 2**attempt (capped at
+    max_delay_s) in between. With `hedge`, an attempt still running after the p95
+    latency of recent successful calls with the same key gets a duplicate request;
+    the first success wins. The outcome of each call, after its retries, counts
+    once towards the breaker.
+    """
+
+    def __init__(
+        self,
+        retryable: Callable[[BaseException], bool],
+        max_retries: int = 2,
+        base_delay_s: float = 0.2,
+        max_delay_s: float = 2.0,
+        hedge: bool = False,
+        breaker: CircuitBreaker | None = None,
+        sleep: Callable[[float], None] = time.sleep,
+        rng: Callable[[], float] = random.random,
+    ) -> None:
+        self.retryable = retryable
+        self.max_retries = max_retries
+        self.base_delay_s = base_delay_s
+        self.max_delay_s = max_delay_s
+        self.hedge = hedge
+        self.breaker = breaker or CircuitBreaker()
+        self._sleep = sleep
+        self._rng = rng
+        self._latencies: dict[str, deque[float]] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(thread_name_prefix="llm-hedge")
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def hedge_delay(self, key: str) -> float | None:
+        """p95 of the recent successful latencies for `key`, in seconds; None if too few."""
+        with self._lock:
+            samples = sorted(self._latencies.get(key, ()))
+        if len(samples) < _MIN_HEDGE_SAMPLES:
+            return None
+        return samples[int(len(samples) * 0.95)]
+
+    def _record_latency(self, key: str, seconds: float) -> None:
+        with self._lock:
+            self._latencies.setdefault(key, deque(maxlen=_LATENCY_WINDOW)).append(seconds)
+
+    def call(self, fn: Callable[[], T], key: str = "", hedge: bool | None = None) -> T:
+        """
+        Runs `fn` under the policy. Raises CircuitOpenError when the breaker rejects
+        the call, and the last error once retries are used up or it is not retryable.
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.breaker.name} circuit is open")
+        hedge = self.hedge if hedge is None else hedge
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                result = self._hedged(fn, key) if hedge else fn()
+            except Exception as exc:
+                if not self.retryable(exc):
+                    # The provider answered, so it is not degraded
+                    self.breaker.record_success()
+                    raise
+                if attempt == self.max_retries:
+                    self.breaker.record_failure()
+                    raise
+                delay = self._rng() * min(self.max_delay_s, self.base_delay_s * 2**attempt)
+                with self._lock:
+                    self.retries += 1
+                log.warning(
+                    "llm_retry",
+                    key=key,
+                    attempt=attempt + 1,
+                    delay_s=round(delay, 3),
+                    error=repr(exc),
+                )
+                self._sleep(delay)
+                continue
+            self._record_latency(key, time.perf_counter() - start)
+            self.breaker.record_success()
+            return result
+        raise AssertionError("unreachable")
+
+    def _hedged(self, fn: Callable[[], T], key: str) -> T:
+        delay = self.hedge_delay(key)
+        if delay is None:
+            return fn()
+        first = self._executor.submit(fn)
+        done, _ = wait([first], timeout=delay)
+        if done:
+            return first.result()
+        with self._lock:
+            self.hedges += 1
+        log.info("llm_hedge", key=key, after_ms=round(delay * 1000, 1))
+        second = self._executor.submit(fn)
+        pending: set[Future[T]] = {first, second}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is second:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return future.result()
+        # Both failed: raise the first request's error
+        return first.result()
+
+    def stats(self) -> dict[str, Any]:
+        breaker = self.breaker.state
+        with self._lock:
+            return {
+                "breaker": breaker,
+                "breaker_rejected": self.breaker.rejected,
+                "retries": self.retries,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+            }
+
+
+_resilience: dict[str, Resilience] = {}
+_resilience_lock = threading.Lock()
+
+
+def get_resilience(
+    name: str, retryable: Callable[[BaseException], bool], cfg: AppSettings | None = None
+) -> Resilience:
+    """Process-wide Resilience per provider, configured from the settings on first use."""
+    with _resilience_lock:
+        if name not in _resilience:
+            cfg = cfg or AppSettings()
+            _resilience[name] = Resilience(
+                retryable,
+                max_retries=cfg.llm_max_retries,
+                base_delay_s=cfg.llm_retry_base_delay_s,
+                hedge=cfg.llm_hedge_requests,
+                breaker=CircuitBreaker(
+                    name,
+                    failure_threshold=cfg.llm_breaker_failures,
+                    reset_timeout_s=cfg.llm_breaker_reset_s,
+                ),
+            )
+        return _resilience[name]
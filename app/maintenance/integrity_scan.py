@@ -1,17 +1,20 @@
 from __future__ import annotations
 
 from hashlib import sha256
+from typing import Any
 
-from app.memory.store import ProfileStore
+from app.memory.storage import ProfileStorage
 
 
-def run_integrity_scan(store: ProfileStore, user_id: str) -> dict:
+def run_integrity_scan(store: ProfileStorage, user_id: str) -> dict:
     """
     Performs an integrity scan for a user's data.
     1. Verifies all evidence payload hashes.
-    2. Verifies all attachment file hashes.
+    2. Verifies archived records of every kind: archive member checksums, and the
+       payload hashes of archived evidence.
+    3. Verifies all attachment file hashes.
     """
-    report = {"user_id": user_id, "issues": []}
+    report: dict[str, Any] = {"user_id": user_id, "issues": []}
 
     # 1. Verify evidence hashes
     all_evidence = store.get_all_evidence_for_scan(user_id)
@@ -25,7 +28,20 @@ def run_integrity_scan(store: ProfileStore, user_id: str) -> dict:
                 {"type": "evidence_hash_mismatch", "id": ev["id"], "kind": ev["kind"]}
             )
 
-    # 2. Verify attachment file hashes
+    # 2. Verify archived records
+    for rec in store.iter_archived_records(user_id):
+        if not rec["member_ok"]:
+            report["issues"].append(
+                {"type": "archive_member_corrupt", "id": rec["id"], "kind": rec["archive_kind"]}
+            )
+            continue
+        if rec["archive_kind"] == "evidence" and rec.get("payload") and rec.get("payload_hash"):
+            if rec["payload_hash"] != sha256(rec["payload"].encode()).hexdigest():
+                report["issues"].append(
+                    {"type": "evidence_hash_mismatch", "id": rec["id"], "kind": rec["kind"]}
+                )
+
+    # 3. Verify attachment file hashes
     all_attachments = store.list_attachments(user_id)
     for attachment in all_attachments:
         try:
@@ -51,3 +67,13 @@ def run_integrity_scan(store: ProfileStore, user_id: str) -> dict:
             )
 
     return report
+
+
+def run_integrity_scan_all(store: ProfileStorage) -> dict[str, dict]:
+    """Scans every user, fanning out across shards in parallel on sharded stores."""
+    reports: dict[str, dict] = {}
+    for shard_reports in store.map_shards(
+        lambda shard: {uid: run_integrity_scan(shard, uid) for uid in shard.get_all_user_ids()}
+    ):
+        reports.update(shard_reports)
+    return reports
@@ -3,12 +3,33 @@ from __future__ import annotations
 import time
 from typing import Any
 
+from app.memory.storage import ProfileStorage
 from app.memory.store import ProfileStore
 
 
-def run_retention_cleanup(store: ProfileStore, apply: bool = False) -> dict:
-    summary: dict[str, Any] = {"applied": apply, "users": {}}
+def run_retention_cleanup(store: ProfileStorage, apply: bool = False, mode: str = "delete") -> dict:
+    """
+    Applies each user's retention preferences. Aged evidence and entity memory
+    (which follows evidence_days) are deleted, or with mode="archive" moved
+    (together with aged receipt parses) to the cold archive.
+    """
+    if mode not in ("delete", "archive"):
+        raise ValueError(f"Unknown retention mode: {mode}")
+    summary: dict[str, Any] = {"applied": apply, "mode": mode, "users": {}}
     now_ms = int(time.time() * 1000)
+
+    # Each shard is cleaned independently and in parallel on sharded stores
+    for shard_users in store.map_shards(lambda shard: _cleanup_shard(shard, apply, now_ms, mode)):
+        summary["users"].update(shard_users)
+
+    if apply and summary["users"]:
+        store.log_evidence("system", None, "retention_cleanup", {}, summary)
+
+    return summary
+
+
+def _cleanup_shard(store: ProfileStore, apply: bool, now_ms: int, mode: str) -> dict[str, Any]:
+    users: dict[str, Any] = {}
     day_ms = 86400 * 1000
 
     for user_id in store.get_all_user_ids():
@@ -31,19 +52,34 @@ def run_retention_cleanup(store: ProfileStore, apply: bool = False) -> dict:
         if days := retention_days.get("evidence_days"):
             if int(days) > 0:
                 cutoff = now_ms - (int(days) * day_ms)
-                if apply:
-                    count = store.delete_evidence_older_than(user_id, cutoff)
-                    if count > 0:
-                        user_summary["deleted_evidence"] = count
+                if mode == "archive":
+                    user_summary.update(_archive_user(store, user_id, cutoff, apply))
+                elif apply:
+                    counts = {
+                        "deleted_evidence": store.delete_evidence_older_than(user_id, cutoff),
+                        "deleted_entities": store.delete_entities_older_than(user_id, cutoff),
+                    }
+                    user_summary.update({key: n for key, n in counts.items() if n > 0})
                 else:
-                    count = len(store.list_evidence_older_than(user_id, cutoff))
-                    if count > 0:
-                        user_summary["evidence_to_delete"] = count
+                    counts = {
+                        "evidence_to_delete": len(store.list_evidence_older_than(user_id, cutoff)),
+                        "entities_to_delete": len(store.list_entities_older_than(user_id, cutoff)),
+                    }
+                    user_summary.update({key: n for key, n in counts.items() if n > 0})
 
         if user_summary:
-            summary["users"][user_id] = user_summary
+            users[user_id] = user_summary
 
-    if apply and summary["users"]:
-        store.log_evidence("system", None, "retention_cleanup", {}, summary)
+    return users
 
-    return summary
+
+def _archive_user(store: ProfileStore, user_id: str, cutoff: int, apply: bool) -> dict[str, int]:
+    if apply:
+        counts = store.archive_older_than(user_id, cutoff)
+        return {f"archived_{kind}": n for kind, n in counts.items() if n > 0}
+    pending = {
+        "evidence_to_archive": len(store.list_evidence_older_than(user_id, cutoff)),
+        "receipt_parses_to_archive": len(store.list_receipt_parses_older_than(user_id, cutoff)),
+        "entities_to_archive": len(store.list_entities_older_than(user_id, cutoff)),
+    }
+    return {key: n for key, n in pending.items() if n > 0}
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import os
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any
+
+from app.infra.serialization import dumps_bytes, loads
+
+# Cold storage for aged rows. Records are grouped by the month they were created in
+# and appended to `<archive_dir>/<YYYY-MM>.ndjson.gz`, one gzip member per archival
+# run and month (concatenated members are still a valid gzip file). Files are never
+# rewritten; the archive_index table in the hot database maps each record to its
+# member's offset, length and sha256, so a lookup decompresses a single member.
+
+
+def month_of(created_at_ms: int) -> str:
+    return time.strftime("%Y-%m", time.gmtime(created_at_ms / 1000))
+
+
+class ArchiveWriter:
+    """Appends gzip members to monthly archive files and reads them back by offset."""
+
+    def __init__(self, archive_dir: str | Path) -> None:
+        self.archive_dir = Path(archive_dir)
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def append(self, kind: str, records: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """
+        Writes `records` (each needing `id`, `user_id` and `created_at`) and returns
+        one index entry per record. Data is fsynced before returning, so callers may
+        delete the hot rows afterwards.
+        """
+        by_month: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        for rec in records:
+            by_month[month_of(rec["created_at"])].append(rec)
+
+        entries: list[dict[str, Any]] = []
+        with self._lock:
+            for month, recs in sorted(by_month.items()):
+                lines = b"".join(dumps_bytes({"archive_kind": kind, **r}) + b"\n" for r in recs)
+                member = gzip.compress(lines, mtime=0)
+                path = self.archive_dir / f"{month}.ndjson.gz"
+                with open(path, "ab") as f:
+                    offset = f.seek(0, os.SEEK_END)
+                    f.write(member)
+                    f.flush()
+                    os.fsync(f.fileno())
+                digest = hashlib.sha256(member).hexdigest()
+                entries.extend(
+                    {
+                        "kind": kind,
+                        "record_id": r["id"],
+                        "user_id": r["user_id"],
+                        "file": path.name,
+                        "offset": offset,
+                        "length": len(member),
+                        "sha256": digest,
+                    }
+                    for r in recs
+                )
+        return entries
+
+    def read_member(self, entry: dict[str, Any]) -> tuple[bytes, bool]:
+        """Returns (raw member bytes, whether they still match the indexed sha256)."""
+        with open(self.archive_dir / entry["file"], "rb") as f:
+            f.seek(entry["offset"])
+            member = f.read(entry["length"])
+        return member, hashlib.sha256(member).hexdigest() == entry["sha256"]
+
+    @staticmethod
+    def parse_member(member: bytes) -> list[dict[str, Any]]:
+        return [loads(line) for line in gzip.decompress(member).splitlines() if line]
+
+    def read_records(self, entry: dict[str, Any]) -> list[dict[str, Any]]:
+        return self.parse_member(self.read_member(entry)[0])
+
+    def read_record(self, entry: dict[str, Any]) -> dict[str, Any] | None:
+        for rec in self.read_records(entry):
+            if rec["archive_kind"] == entry["kind"] and rec["id"] == entry["record_id"]:
+                return rec
+        return None
@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import tempfile
+import uuid
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, TypeVar
+
+from app.memory.store import ProfileSnapshot, ProfileStore
+
+T = TypeVar("T")
+
+
+class InMemoryProfileStore(ProfileStore):
+    """
+    ProfileStore backed by a private in-memory SQLite database, for tests and
+    benchmarks. The database lives as long as this object does.
+    """
+
+    def __init__(self, upload_dir: str | None = None, write_behind: bool = False) -> None:
+        self._uri = f"file:profiles_{uuid.uuid4().hex}?mode=memory&cache=shared"
+        # Shared-cache memory databases vanish with their last connection; keep one open
+        self._anchor = self._open()
+        super().__init__(
+            sqlite_path=":memory:",
+            upload_dir=upload_dir or tempfile.mkdtemp(prefix="profiles_uploads_"),
+            write_behind=write_behind,
+            archive_dir=tempfile.mkdtemp(prefix="profiles_archive_"),
+        )
+
+    def _open(self) -> sqlite3.Connection:
+        con = sqlite3.connect(
+            self._uri, uri=True, isolation_level="DEFERRED", check_same_thread=False
+        )
+        con.execute("PRAGMA foreign_keys=ON;")
+        return con
+
+
+def _shard_index(user_id: str, num_shards: int) -> int:
+    # Stable across processes, unlike hash()
+    digest = hashlib.blake2b(user_id.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % num_shards
+
+
+class ShardedProfileStore:
+    """
+    Routes each user to one of N SQLite files by a stable hash of user_id, so writers
+    for different users no longer contend on a single WAL lock.
+
+    Integer row ids (attachments, receipt parses, evidence) are only unique per shard,
+    so they are exposed as `local_id * num_shards + shard_index`; id-based lookups
+    route on that. Cross-shard operations run on all shards in parallel.
+    """
+
+    def __init__(
+        self,
+        root_dir: str = ".data/shards",
+        num_shards: int = 4,
+        upload_dir: str = ".data/uploads",
+        write_behind: bool = False,
+        max_workers: int | None = None,
+        profile_cache_size: int = 256,
+        verify_cached_version: bool = False,
+    ) -> None:
+        if num_shards < 1:
+            raise ValueError("num_shards must be >= 1")
+        Path(root_dir).mkdir(parents=True, exist_ok=True)
+        self.num_shards = num_shards
+        self.shards = [
+            ProfileStore(
+                sqlite_path=str(Path(root_dir) / f"profile_{i:02d}.db"),
+                upload_dir=upload_dir,
+                write_behind=write_behind,
+                profile_cache_size=profile_cache_size,
+                verify_cached_version=verify_cached_version,
+            )
+            for i in range(num_shards)
+        ]
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers or num_shards, thread_name_prefix="profile-shard"
+        )
+
+    # --- Routing helpers ---
+    def shard_for(self, user_id: str) -> ProfileStore:
+        return self.shards[_shard_index(user_id, self.num_shards)]
+
+    def _global_id(self, shard: ProfileStore, local_id: int) -> int:
+        return local_id * self.num_shards + self.shards.index(shard)
+
+    def _locate(self, global_id: int) -> tuple[ProfileStore, int]:
+        return self.shards[global_id % self.num_shards], global_id // self.num_shards
+
+    def _globalize(self, shard: ProfileStore, row: dict, *keys: str) -> dict:
+        for key in keys:
+            if row.get(key) is not None:
+                row[key] = self._global_id(shard, row[key])
+        return row
+
+    def _globalize_all(self, shard: ProfileStore, rows: list[dict], *keys: str) -> list[dict]:
+        return [self._globalize(shard, row, *keys) for row in rows]
+
+    def map_shards(self, fn: Callable[[ProfileStore], T]) -> list[T]:
+        return list(self._pool.map(fn, self.shards))
+
+    def cache_stats(self) -> dict[str, Any]:
+        per_shard = [shard.cache_stats() for shard in self.shards]
+        totals = {k: sum(st[k] for st in per_shard) for k in ("size", "hits", "misses")}
+        lookups = totals["hits"] + totals["misses"]
+        totals["hit_ratio"] = round(totals["hits"] / lookups, 4) if lookups else 0.0
+        return totals
+
+    def flush(self, timeout: float | None = None) -> None:
+        self.map_shards(lambda shard: shard.flush(timeout))
+
+    def close(self) -> None:
+        self.map_shards(lambda shard: shard.close())
+        self._pool.shutdown(wait=True)
+
+    # --- Profiles & actions ---
+    def get_profile(self, user_id: str) -> ProfileSnapshot:
+        return self.shard_for(user_id).get_profile(user_id)
+
+    def apply_patch(self, user_id: str, patch: dict) -> tuple[ProfileSnapshot, list[dict]]:
+        return self.shard_for(user_id).apply_patch(user_id, patch)
+
+    def get_profile_at(self, user_id: str, version: int) -> ProfileSnapshot:
+        return self.shard_for(user_id).get_profile_at(user_id, version)
+
+    def list_profile_versions(self, user_id: str, limit: int = 100) -> list[dict]:
+        return self.shard_for(user_id).list_profile_versions(user_id, limit)
+
+    def commit_action(
+        self,
+        user_id: str,
+        action_id: str,
+        kind: str,
+        payload: dict,
+        payload_hash: str,
+        diff: list,
+        committed: bool,
+        undo_of: str | None = None,
+    ) -> None:
+        self.shard_for(user_id).commit_action(
+            user_id, action_id, kind, payload, payload_hash, diff, committed, undo_of
+        )
+
+    def undo_action(self, user_id: str, new_action_id: str, steps: int = 1) -> ProfileSnapshot:
+        return self.shard_for(user_id).undo_action(user_id, new_action_id, steps)
+
+    def redo_action(self, user_id: str, new_action_id: str, steps: int = 1) -> ProfileSnapshot:
+        return self.shard_for(user_id).redo_action(user_id, new_action_id, steps)
+
+    def revert_to_version(self, user_id: str, version: int, new_action_id: str) -> ProfileSnapshot:
+        return self.shard_for(user_id).revert_to_version(user_id, version, new_action_id)
+
+    def list_actions(self, user_id: str, limit: int = 100) -> list[dict]:
+        return self.shard_for(user_id).list_actions(user_id, limit)
+
+    # --- Attachments & receipts ---
+    def add_attachment(
+        self,
+        user_id: str,
+        filename: str,
+        content_type: str | None,
+        data: bytes,
+        category: str | None,
+        turn_id: str,
+    ) -> dict:
+        shard = self.shard_for(user_id)
+        meta = shard.add_attachment(user_id, filename, content_type, data, category, turn_id)
+        return self._globalize(shard, meta, "id")
+
+    def get_attachment(self, attachment_id: int) -> dict | None:
+        shard, local_id = self._locate(attachment_id)
+        row = shard.get_attachment(local_id)
+        return self._globalize(shard, row, "id") if row else None
+
+    def list_attachments(self, user_id: str, limit: int = 100) -> list[dict]:
+        shard = self.shard_for(user_id)
+        return self._globalize_all(shard, shard.list_attachments(user_id, limit), "id")
+
+    def save_receipt_parse(
+        self, user_id: str, attachment_id: int, text: str, parsed_data: Any, engine: str
+    ) -> int:
+        shard, local_attachment_id = self._locate(attachment_id)
+        parse_id = shard.save_receipt_parse(user_id, local_attachment_id, text, parsed_data, engine)
+        return self._global_id(shard, parse_id)
+
+    def get_receipt_parse_by_attachment(self, attachment_id: int) -> dict | None:
+        shard, local_id = self._locate(attachment_id)
+        row = shard.get_receipt_parse_by_attachment(local_id)
+        return self._globalize(shard, row, "id", "attachment_id") if row else None
+
+    # --- Evidence ---
+    def log_evidence(
+        self, user_id: str, turn_id: str | None, kind: str, payload: dict, result: dict
+    ) -> int:
+        return self.log_evidence_deferred(user_id, turn_id, kind, payload, result).result()
+
+    def log_evidence_deferred(
+        self, user_id: str, turn_id: str | None, kind: str, payload: dict, result: dict
+    ) -> Future[int]:
+        shard = self.shard_for(user_id)
+        local: Future[int] = shard.log_evidence_deferred(user_id, turn_id, kind, payload, result)
+        out: Future[int] = Future()
+
+        def _done(f: Future[int]) -> None:
+            exc = f.exception()
+            if exc is not None:
+                out.set_exception(exc)
+            else:
+                out.set_result(self._global_id(shard, f.result()))
+
+        local.add_done_callback(_done)
+        return out
+
+    def get_all_evidence_for_scan(self, user_id: str) -> list[dict]:
+        shard = self.shard_for(user_id)
+        return self._globalize_all(shard, shard.get_all_evidence_for_scan(user_id), "id")
+
+    def list_evidence(self, user_id: str, limit: int = 100) -> list[dict]:
+        shard = self.shard_for(user_id)
+        return self._globalize_all(shard, shard.list_evidence(user_id, limit), "id")
+
+    # --- Entity memory ---
+    def remember_entity(
+        self,
+        user_id: str,
+        kind: str,
+        data: Any,
+        keep: int = 20,
+        created_at: int | None = None,
+    ) -> None:
+        self.shard_for(user_id).remember_entity(user_id, kind, data, keep, created_at)
+
+    def list_entities(self, user_id: str, per_kind: int = 20) -> list[dict]:
+        return self.shard_for(user_id).list_entities(user_id, per_kind)
+
+    def list_entities_older_than(self, user_id: str, cutoff_ms: int) -> list[dict]:
+        shard = self.shard_for(user_id)
+        rows = shard.list_entities_older_than(user_id, cutoff_ms)
+        return self._globalize_all(shard, rows, "id")
+
+    def delete_entities_older_than(self, user_id: str, cutoff_ms: int) -> int:
+        return self.shard_for(user_id).delete_entities_older_than(user_id, cutoff_ms)
+
+    # --- Retention ---
+    def get_all_user_ids(self) -> list[str]:
+        return [uid for ids in self.map_shards(lambda s: s.get_all_user_ids()) for uid in ids]
+
+    def list_attachments_older_than(self, user_id: str, cutoff_ms: int) -> list[dict]:
+        shard = self.shard_for(user_id)
+        rows = shard.list_attachments_older_than(user_id, cutoff_ms)
+        return self._globalize_all(shard, rows, "id")
+
+    def delete_attachments_older_than(self, user_id: str, cutoff_ms: int) -> int:
+        return self.shard_for(user_id).delete_attachments_older_than(user_id, cutoff_ms)
+
+    def list_evidence_older_than(self, user_id: str, cutoff_ms: int) -> list[dict]:
+        shard = self.shard_for(user_id)
+        rows = shard.list_evidence_older_than(user_id, cutoff_ms)
+        return self._globalize_all(shard, rows, "id")
+
+    def delete_evidence_older_than(self, user_id: str, cutoff_ms: int) -> int:
+        return self.shard_for(user_id).delete_evidence_older_than(user_id, cutoff_ms)
+
+    # --- Archive ---
+    def list_receipt_parses_older_than(self, user_id: str, cutoff_ms: int) -> list[dict]:
+        shard = self.shard_for(user_id)
+        rows = shard.list_receipt_parses_older_than(user_id, cutoff_ms)
+        return self._globalize_all(shard, rows, "id", "attachment_id")
+
+    def archive_older_than(
+        self, user_id: str, cutoff_ms: int, batch_size: int = 1000
+    ) -> dict[str, int]:
+        return self.shard_for(user_id).archive_older_than(user_id, cutoff_ms, batch_size)
+
+    def get_archived_record(self, kind: str, record_id: int) -> dict | None:
+        shard, local_id = self._locate(record_id)
+        rec = shard.get_archived_record(kind, local_id)
+        return self._globalize(shard, rec, "id", "attachment_id") if rec else None
+
+    def list_archived(self, user_id: str, kind: str | None = None, limit: int = 100) -> list[dict]:
+        shard = self.shard_for(user_id)
+        return self._globalize_all(shard, shard.list_archived(user_id, kind, limit), "record_id")
+
+    def iter_archived_records(self, user_id: str, kind: str | None = None) -> Iterator[dict]:
+        shard = self.shard_for(user_id)
+        for rec in shard.iter_archived_records(user_id, kind):
+            yield self._globalize(shard, rec, "id", "attachment_id")
+
+    # --- Compression ---
+    def compression_stats(self) -> dict[str, dict[str, Any]]:
+        totals: dict[str, dict[str, Any]] = {}
+        for stats in self.map_shards(lambda shard: shard.compression_stats()):
+            for column, st in stats.items():
+                acc = totals.setdefault(column, dict.fromkeys(st, 0))
+                for key in ("rows", "compressed_rows", "stored_bytes", "raw_bytes"):
+                    acc[key] += st[key]
+        for acc in totals.values():
+            acc["ratio"] = (
+                round(acc["stored_bytes"] / acc["raw_bytes"], 4) if acc["raw_bytes"] else 1.0
+            )
+        return totals
+
+    def recompress_all(self, batch_size: int = 500, vacuum: bool = True) -> dict[str, int]:
+        totals: dict[str, int] = {}
+        for counts in self.map_shards(lambda shard: shard.recompress_all(batch_size, vacuum)):
+            for column, n in counts.items():
+                totals[column] = totals.get(column, 0) + n
+        return totals
+
+    # --- Export ---
+    def export_user_data(self, user_id: str, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        # Row ids inside the archive are shard-local; they only cross-reference each other
+        return self.shard_for(user_id).export_user_data(user_id, chunk_size)
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import zlib
+from typing import Any
+
+try:
+    import zstandard  # optional: better ratio and speed than zlib
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+# Compressed values are stored as BLOBs starting with a marker byte. Plain TEXT
+# values (rows written before compression existed, or too small to be worth it)
+# are returned unchanged, so old databases stay readable without a migration.
+MARK_ZLIB = 0x01
+MARK_ZSTD = 0x02
+MIN_COMPRESS_BYTES = 128
+
+# (table, column) pairs the store compresses
+COMPRESSED_COLUMNS: list[tuple[str, str]] = [
+    ("receipt_parses", "text"),
+    ("evidence", "payload"),
+    ("evidence", "result"),
+    ("actions", "diff"),
+]
+
+
+def encode_text(value: str | None, min_bytes: int = MIN_COMPRESS_BYTES) -> str | bytes | None:
+    """Compresses `value` into a marked BLOB, or returns it as-is when that would not help."""
+    if value is None:
+        return None
+    raw = value.encode("utf-8")
+    if len(raw) < min_bytes:
+        return value
+    if zstandard is not None:
+        body = bytes([MARK_ZSTD]) + zstandard.ZstdCompressor(level=6).compress(raw)
+    else:
+        body = bytes([MARK_ZLIB]) + zlib.compress(raw, 6)
+    return body if len(body) < len(raw) else value
+
+
+def decode_text(value: Any) -> Any:
+    """Inverse of encode_text; TEXT values and NULL pass through."""
+    if not isinstance(value, bytes | bytearray | memoryview):
+        return value
+    data = bytes(value)
+    if not data:
+        return ""
+    marker, body = data[0], data[1:]
+    if marker == MARK_ZLIB:
+        return zlib.decompress(body).decode("utf-8")
+    if marker == MARK_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("Value is zstd-compressed but 'zstandard' is not installed.")
+        return zstandard.ZstdDecompressor().decompress(body).decode("utf-8")
+    raise ValueError(f"Unknown compression marker: {marker:#04x}")
+
+
+def decode_column(table: str, column: str, value: Any) -> Any:
+    """decode_text limited to the compressed columns; other BLOBs are left alone."""
+    if (table, column) in COMPRESSED_COLUMNS:
+        return decode_text(value)
+    return value
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import queue
+import sqlite3
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+
+# (user_id, turn_id, kind, payload, payload_hash, result, created_at)
+# payload and result may be compressed BLOBs (see app.memory.codec)
+EvidenceRow = tuple[str, str | None, str, str | bytes | None, str, str | bytes | None, int]
+
+_INSERT_SQL = (
+    "INSERT INTO evidence (user_id, turn_id, kind, payload, "
+    "payload_hash, result, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+class _Barrier:
+    """Queue marker: commit everything enqueued before it, then signal."""
+
+    def __init__(self, stop: bool = False) -> None:
+        self.stop = stop
+        self.done = threading.Event()
+        self.error: BaseException | None = None
+
+
+class EvidenceWriter:
+    """
+    Write-behind logger for the evidence table.
+
+    Rows are pushed onto a bounded queue and inserted by a single background thread,
+    which groups everything available into one transaction (one fsync) per flush.
+    Each submitted row gets a Future that resolves to its row id once committed.
+    If the writer thread fails (say the database cannot be opened), every pending
+    Future and flush gets the error and later submits raise instead of blocking.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], sqlite3.Connection],
+        max_queue: int = 1024,
+        max_batch: int = 256,
+        linger_s: float = 0.005,
+    ) -> None:
+        self._queue: queue.Queue[tuple[EvidenceRow, Future[int]] | _Barrier] = queue.Queue(
+            maxsize=max_queue
+        )
+        self._max_batch = max_batch
+        self._linger_s = linger_s
+        self._closed = False
+        self._error: BaseException | None = None
+        self._lock = threading.Lock()
+        # Dropped by the thread once connected, so the writer does not keep its owner alive
+        self._connect: Callable[[], sqlite3.Connection] | None = connect
+        self._thread = threading.Thread(target=self._run, name="evidence-writer", daemon=True)
+        self._thread.start()
+
+    def _put(self, item: tuple[EvidenceRow, Future[int]] | _Barrier) -> None:
+        # Only put while holding the lock and not closed, so nothing is enqueued after
+        # a failed writer has drained the queue; a full queue is retried without it.
+        while True:
+            with self._lock:
+                if self._closed:
+                    raise RuntimeError("EvidenceWriter has been shut down.") from self._error
+                try:
+                    self._queue.put_nowait(item)
+                    return
+                except queue.Full:
+                    pass
+            time.sleep(self._linger_s)
+
+    def submit(self, row: EvidenceRow) -> Future[int]:
+        """Enqueues a row; blocks only when the queue is full (backpressure)."""
+        fut: Future[int] = Future()
+        self._put((row, fut))
+        return fut
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        Blocks until every row submitted before this call is committed; False if
+        `timeout` expired first. Raises RuntimeError if the writer thread failed.
+        """
+        with self._lock:
+            if self._closed and self._error is None:
+                return True
+        barrier = _Barrier()
+        self._put(barrier)
+        done = barrier.done.wait(timeout)
+        if barrier.error is not None:
+            raise RuntimeError("EvidenceWriter failed.") from barrier.error
+        return done
+
+    def shutdown(self, timeout: float | None = None) -> None:
+        """Drains the queue, commits the remainder and stops the writer thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        # Not under the lock: a writer that fails meanwhile needs it to fail the queue
+        while self._thread.is_alive():
+            try:
+                self._queue.put(_Barrier(stop=True), timeout=self._linger_s)
+                break
+            except queue.Full:
+                continue
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        batch: list[tuple[EvidenceRow, Future[int]]] = []
+        barriers: list[_Barrier] = []
+        connect, self._connect = self._connect, None
+        try:
+            assert connect is not None
+            con = connect()
+            del connect
+            try:
+                stop = False
+                while not stop:
+                    batch, barriers = [], []
+                    item = self._queue.get()
+                    while True:
+                        if isinstance(item, _Barrier):
+                            barriers.append(item)
+                            stop = stop or item.stop
+                            break
+                        batch.append(item)
+                        if len(batch) >= self._max_batch:
+                            break
+                        try:
+                            item = self._queue.get(timeout=self._linger_s)
+                        except queue.Empty:
+                            break
+                    self._commit(con, batch)
+                    batch = []
+                    for barrier in barriers:
+                        barrier.done.set()
+            finally:
+                con.close()
+        except BaseException as e:
+            self._fail(e, batch, barriers)
+
+    def _fail(
+        self,
+        error: BaseException,
+        batch: list[tuple[EvidenceRow, Future[int]]],
+        barriers: list[_Barrier],
+    ) -> None:
+        """Closes the writer and hands `error` to every row and flush still waiting."""
+        with self._lock:
+            self._closed = True
+            self._error = error
+        items: list[tuple[EvidenceRow, Future[int]] | _Barrier] = [*batch, *barriers]
+        while True:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        for item in items:
+            if isinstance(item, _Barrier):
+                item.error = error
+                item.done.set()
+            elif not item[1].done():
+                item[1].set_exception(error)
+
+    def _commit(
+        self, con: sqlite3.Connection, batch: list[tuple[EvidenceRow, Future[int]]]
+    ) -> None:
+        if not batch:
+            return
+        ids: list[int] = []
+        try:
+            with con:
+                for row, _ in batch:
+                    ids.append(con.execute(_INSERT_SQL, row).lastrowid or 0)
+        except Exception as e:
+            for _, fut in batch:
+                fut.set_exception(e)
+            return
+        for (_, fut), row_id in zip(batch, ids, strict=True):
+            fut.set_result(row_id)
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import io
+import sqlite3
+import zipfile
+from collections.abc import Callable, Iterable, Iterator
+from typing import Any
+
+from app.infra.serialization import dumps_bytes, loads
+
+# Table -> (ndjson entry name, JSON-encoded text columns to inline as objects)
+_EXPORT_TABLES: list[tuple[str, str, tuple[str, ...]]] = [
+    ("actions", "actions.ndjson", ("payload", "diff")),
+    ("profile_versions", "profile_history.ndjson", ("diff", "snapshot")),
+    ("evidence", "evidence.ndjson", ("payload", "result")),
+    ("receipt_parses", "receipt_parses.ndjson", ("parsed_data",)),
+    ("evidence_files", "attachments.ndjson", ()),
+    ("entity_memory", "entity_memory.ndjson", ("data",)),
+]
+_READ_CHUNK = 1024 * 1024
+
+
+class _ChunkSink(io.RawIOBase):
+    """Unseekable write target for ZipFile that hands written bytes back to a generator."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._pending = 0
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b: Any) -> int:
+        data = bytes(b)
+        self._chunks.append(data)
+        self._pending += len(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def drain(self) -> bytes:
+        out = b"".join(self._chunks)
+        self._chunks, self._pending = [], 0
+        return out
+
+
+def _loads_or_raw(value: Any) -> Any:
+    if not isinstance(value, str):
+        return value
+    try:
+        return loads(value)
+    except ValueError:
+        return value
+
+
+def stream_user_export(
+    connect: Callable[[], sqlite3.Connection],
+    user_id: str,
+    profile: dict[str, Any],
+    decode: Callable[[str, str, Any], Any] = lambda table, column, value: value,
+    archived: Iterable[dict[str, Any]] = (),
+    chunk_size: int = 64 * 1024,
+) -> Iterator[bytes]:
+    """
+    Yields a ZIP archive of everything stored for `user_id`, chunk by chunk:
+    profile.json, one NDJSON file per table, archived.ndjson for records moved to
+    the cold archive, and the raw attachment files under attachments/. Rows are
+    read from open cursors, so memory stays flat however many records or files the
+    user has. `decode` maps stored column values back to their plain form.
+    """
+    sink = _ChunkSink()
+    con = connect()
+    con.row_factory = sqlite3.Row
+    try:
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("profile.json", dumps_bytes(profile, indent=True))
+            yield sink.drain()
+
+            attachments: list[tuple[int, str, str]] = []
+            for table, entry, json_columns in _EXPORT_TABLES:
+                with zf.open(entry, "w", force_zip64=True) as f:
+                    for row in con.execute(f"SELECT * FROM {table} WHERE user_id = ?", (user_id,)):
+                        record = {k: decode(table, k, row[k]) for k in row.keys()}
+                        for col in json_columns:
+                            record[col] = _loads_or_raw(record.get(col))
+                        if table == "evidence_files":
+                            attachments.append((row["id"], row["filename"], row["path"]))
+                        f.write(dumps_bytes(record) + b"\n")
+                        if sink.pending >= chunk_size:
+                            yield sink.drain()
+                yield sink.drain()
+
+            with zf.open("archived.ndjson", "w", force_zip64=True) as f:
+                for record in archived:
+                    f.write(dumps_bytes(record) + b"\n")
+                    if sink.pending >= chunk_size:
+                        yield sink.drain()
+            yield sink.drain()
+
+            for attachment_id, filename, path in attachments:
+                try:
+                    src = open(path, "rb")
+                except OSError:
+                    continue  # already removed by retention; still listed in attachments.ndjson
+                with src, zf.open(f"attachments/{attachment_id}_{filename}", "w") as f:
+                    while block := src.read(_READ_CHUNK):
+                        f.write(block)
+                        if sink.pending >= chunk_size:
+                            yield sink.drain()
+                yield sink.drain()
+        # Closing the archive writes the central directory
+        yield sink.drain()
+    finally:
+        con.close()
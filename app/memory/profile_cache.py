@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any
+
+
+def _json_copy(obj: Any) -> Any:
+    """Copies JSON-shaped data (dicts, lists, scalars); much cheaper than deepcopy."""
+    if isinstance(obj, dict):
+        return {k: _json_copy(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_json_copy(v) for v in obj]
+    return obj
+
+
+class ProfileCache:
+    """
+    Size-bounded LRU of parsed profiles keyed by user_id.
+
+    Entries are private copies; callers always receive a fresh copy they may mutate.
+    Each user has a generation counter bumped on invalidation, so a reader that
+    loaded a profile before a concurrent write cannot re-insert the stale data.
+    """
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[int, dict]] = OrderedDict()
+        self._generations: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def generation(self, user_id: str) -> int:
+        with self._lock:
+            return self._generations.get(user_id, 0)
+
+    def get(self, user_id: str) -> tuple[int, dict] | None:
+        """Returns (version, data copy) or None."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+        return entry[0], _json_copy(entry[1])
+
+    def put(self, user_id: str, version: int, data: dict, generation: int) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if self._generations.get(user_id, 0) != generation:
+                return  # a write happened while this value was being loaded
+            self._entries[user_id] = (version, _json_copy(data))
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: str) -> None:
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            if self._entries.pop(user_id, None) is not None:
+                self.invalidations += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
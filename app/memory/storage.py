@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Any, Protocol, TypeVar
+
+from app.memory.store import ProfileSnapshot
+
+if TYPE_CHECKING:
+    from app.infra.config import AppSettings
+    from app.memory.store import ProfileStore
+
+T = TypeVar("T")
+
+
+class ProfileStorage(Protocol):
+    """
+    The storage interface the orchestrator, UI and maintenance jobs rely on.
+    Implemented by ProfileStore (one SQLite file), InMemoryProfileStore and
+    ShardedProfileStore (see app.memory.backends).
+    """
+
+    def map_shards(self, fn: Callable[[ProfileStore], T]) -> list[T]: ...
+
+    def flush(self, timeout: float | None = None) -> None: ...
+
+    def close(self) -> None: ...
+
+    def cache_stats(self) -> dict[str, Any]: ...
+
+    # --- Profiles & actions ---
+    def get_profile(self, user_id: str) -> ProfileSnapshot: ...
+
+    def apply_patch(self, user_id: str, patch: dict) -> tuple[ProfileSnapshot, list[dict]]: ...
+
+    def get_profile_at(self, user_id: str, version: int) -> ProfileSnapshot: ...
+
+    def list_profile_versions(self, user_id: str, limit: int = 100) -> list[dict]: ...
+
+    def commit_action(
+        self,
+        user_id: str,
+        action_id: str,
+        kind: str,
+        payload: dict,
+        payload_hash: str,
+        diff: list,
+        committed: bool,
+        undo_of: str | None = None,
+    ) -> None: ...
+
+    def undo_action(self, user_id: str, new_action_id: str, steps: int = 1) -> ProfileSnapshot: ...
+
+    def redo_action(self, user_id: str, new_action_id: str, steps: int = 1) -> ProfileSnapshot: ...
+
+    def revert_to_version(
+        self, user_id: str, version: int, new_action_id: str
+    ) -> ProfileSnapshot: ...
+
+    def list_actions(self, user_id: str, limit: int = 100) -> list[dict]: ...
+
+    # --- Attachments & receipts ---
+    def add_attachment(
+        self,
+        user_id: str,
+        filename: str,
+        content_type: str | None,
+        data: bytes,
+        category: str | None,
+        turn_id: str,
+    ) -> dict: ...
+
+    def get_attachment(self, attachment_id: int) -> dict | None: ...
+
+    def list_attachments(self, user_id: str, limit: int = 100) -> list[dict]: ...
+
+    def save_receipt_parse(
+        self, user_id: str, attachment_id: int, text: str, parsed_data: Any, engine: str
+    ) -> int: ...
+
+    def get_receipt_parse_by_attachment(self, attachment_id: int) -> dict | None: ...
+
+    # --- Evidence ---
+    def log_evidence(
+        self, user_id: str, turn_id: str | None, kind: str, payload: dict, result: dict
+    ) -> int: ...
+
+    def log_evidence_deferred(
+        self, user_id: str, turn_id: str | None, kind: str, payload: dict, result: dict
+    ) -> Future[int]: ...
+
+    def get_all_evidence_for_scan(self, user_id: str) -> list[dict]: ...
+
+    def list_evidence(self, user_id: str, limit: int = 100) -> list[dict]: ...
+
+    # --- Entity memory ---
+    def remember_entity(
+        self,
+        user_id: str,
+        kind: str,
+        data: Any,
+        keep: int = 20,
+        created_at: int | None = None,
+    ) -> None: ...
+
+    def list_entities(self, user_id: str, per_kind: int = 20) -> list[dict]: ...
+
+    def list_entities_older_than(self, user_id: str, cutoff_ms: int) -> list[dict]: ...
+
+    def delete_entities_older_than(self, user_id: str, cutoff_ms: int) -> int: ...
+
+    # --- Retention ---
+    def get_all_user_ids(self) -> list[str]: ...
+
+    def list_attachments_older_than(self, user_id: str, cutoff_ms: int) -> list[dict]: ...
+
+    def delete_attachments_older_than(self, user_id: str, cutoff_ms: int) -> int: ...
+
+    def list_evidence_older_than(self, user_id: str, cutoff_ms: int) -> list[dict]: ...
+
+    def delete_evidence_older_than(self, user_id: str, cutoff_ms: int) -> int: ...
+
+    # --- Archive ---
+    def list_receipt_parses_older_than(self, user_id: str, cutoff_ms: int) -> list[dict]: ...
+
+    def archive_older_than(
+        self, user_id: str, cutoff_ms: int, batch_size: int = 1000
+    ) -> dict[str, int]: ...
+
+    def get_archived_record(self, kind: str, record_id: int) -> dict | None: ...
+
+    def list_archived(
+        self, user_id: str, kind: str | None = None, limit: int = 100
+    ) -> list[dict]: ...
+
+    def iter_archived_records(self, user_id: str, kind: str | None = None) -> Iterator[dict]: ...
+
+    # --- Compression ---
+    def compression_stats(self) -> dict[str, dict[str, Any]]: ...
+
+    def recompress_all(self, batch_size: int = 500, vacuum: bool = True) -> dict[str, int]: ...
+
+    # --- Export ---
+    def export_user_data(self, user_id: str, chunk_size: int = 64 * 1024) -> Iterator[bytes]: ...
+
+
+def open_profile_store(cfg: AppSettings, write_behind: bool = False) -> ProfileStorage:
+    """Builds the configured backend: one SQLite file, or N files when profile_shards > 1."""
+    from app.memory.backends import ShardedProfileStore
+    from app.memory.store import ProfileStore
+
+    if cfg.profile_shards > 1:
+        return ShardedProfileStore(
+            root_dir=cfg.profile_shards_dir,
+            num_shards=cfg.profile_shards,
+            write_behind=write_behind,
+            profile_cache_size=cfg.profile_cache_size,
+            verify_cached_version=cfg.profile_cache_verify_version,
+        )
+    return ProfileStore(
+        sqlite_path=cfg.sqlite_path,
+        write_behind=write_behind,
+        profile_cache_size=cfg.profile_cache_size,
+        verify_cached_version=cfg.profile_cache_verify_version,
+    )
+
+
+_store: ProfileStorage | None = None
+_store_lock = threading.Lock()
+
+
+def get_profile_store(cfg: AppSettings | None = None) -> ProfileStorage:
+    """
+    The one store of the process, opened from the settings on first use with
+    evidence written behind. The UI panels (app.ui.resources.get_store) and turns
+    run without a store both use it, so every write invalidates the single
+    profile cache that later reads go through.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            from app.infra.config import AppSettings
+
+            _store = open_profile_store(cfg or AppSettings(), write_behind=True)
+        return _store
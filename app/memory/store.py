@@ -1,25 +1,43 @@
 from __future__ import annotations
 
 import hashlib
-import json
 import os
 import sqlite3
 import time
+import weakref
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future
+from contextlib import contextmanager
 from dataclasses import asdict
-from decimal import Decimal
 from pathlib import Path
-from typing import Any
+from typing import Any, TypeVar
 
+import structlog
 from pydantic import BaseModel, Field
 
+from app.infra.serialization import canonical_dumps, clone, dumps, loads
+from app.memory.archive import ArchiveWriter
+from app.memory.codec import COMPRESSED_COLUMNS, decode_column, decode_text, encode_text
+from app.memory.evidence_writer import EvidenceRow, EvidenceWriter
+from app.memory.gdpr_export import stream_user_export
+from app.memory.profile_cache import ProfileCache
 from app.safety.files import sanitize_filename, sha256_hex, validate_file
 
+log = structlog.get_logger(__name__)
 
-class DecimalEncoder(json.JSONEncoder):
-    def default(self, o: Any) -> Any:
-        if isinstance(o, Decimal):
-            return str(o)
-        return super().default(o)
+T = TypeVar("T")
+
+# Archive record kind -> hot table it is moved out of
+ARCHIVE_TABLES: dict[str, str] = {
+    "evidence": "evidence",
+    "receipt_parse": "receipt_parses",
+    "entity": "entity_memory",
+}
+
+# Full profile snapshots are kept every N versions; the rest store only their diff
+SNAPSHOT_EVERY = 16
+# Longest a read waits for buffered evidence rows before reading what is committed
+EVIDENCE_READ_WAIT_S = 5.0
 
 
 class ProfileSnapshot(BaseModel):
@@ -38,6 +56,11 @@ def _connect(sqlite_path: str) -> sqlite3.Connection:
     return con
 
 
+def _decoded(row: sqlite3.Row, table: str) -> dict:
+    """Turns a row into a dict, decompressing the table's compressed columns."""
+    return {k: decode_column(table, k, row[k]) for k in row.keys()}
+
+
 def _deep_merge(source: dict, destination: dict) -> dict:
     for key, value in source.items():
         if isinstance(value, dict):
@@ -52,7 +75,7 @@ def _flatten(d: dict, prefix: str = "") -> dict:
     flat: dict[str, Any] = {}
     for k, v in d.items():
         path = f"{prefix}.{k}" if prefix else k
-        if isinstance(v, dict):
+        if isinstance(v, dict) and v:
             flat.update(_flatten(v, path))
         else:
             flat[path] = v
@@ -60,30 +83,76 @@ def _flatten(d: dict, prefix: str = "") -> dict:
 
 
 def _compute_diff(old: dict, new: dict) -> list:
+    """
+    One entry per changed leaf path. `op` tells a path that appears ("add") or
+    disappears ("remove") apart from one set to None, so replays are exact.
+    """
     flat_old, flat_new = _flatten(old), _flatten(new)
-    paths = set(flat_old.keys()) | set(flat_new.keys())
-    return [
-        {"path": p, "old": flat_old.get(p), "new": flat_new.get(p)}
-        for p in sorted(paths)
-        if flat_old.get(p) != flat_new.get(p)
-    ]
+    diff = []
+    for p in sorted(flat_old.keys() | flat_new.keys()):
+        if p not in flat_new:
+            op = "remove"
+        elif p not in flat_old:
+            op = "add"
+        elif flat_old[p] != flat_new[p]:
+            op = "change"
+        else:
+            continue
+        diff.append({"path": p, "old": flat_old.get(p), "new": flat_new.get(p), "op": op})
+    return diff
 
 
-def _apply_diff_reverse(data: dict, diffs: list) -> dict:
-    out = json.loads(json.dumps(data))
+def _set_path(data: dict, path: list[str], value: Any) -> None:
+    cur = data
+    for key in path[:-1]:
+        if not isinstance(cur.get(key), dict):
+            # The parent used to be a leaf (or was missing): it becomes a dict
+            cur[key] = {}
+        cur = cur[key]
+    cur[path[-1]] = value
+
+
+def _delete_path(data: dict, path: list[str]) -> None:
+    """Deletes a leaf and the dicts it leaves empty; missing paths are ignored."""
+    parents, cur = [], data
+    for key in path[:-1]:
+        if not isinstance(cur.get(key), dict):
+            return
+        parents.append((cur, key))
+        cur = cur[key]
+    cur.pop(path[-1], None)
+    for parent, key in reversed(parents):
+        if parent[key]:
+            break
+        del parent[key]
+
+
+def _apply_diff(data: dict, diffs: list, reverse: bool) -> dict:
+    # Deletions first: a leaf replacing a dict (or the reverse) shows up as one
+    # "remove" and one "add" entry, and the new value must survive the removal.
+    out = clone(data)
+    removed_op, side = ("add", "old") if reverse else ("remove", "new")
+    sets = []
     for item in diffs:
-        path, cur = item["path"].split("."), out
-        for key in path[:-1]:
-            cur = cur.setdefault(key, {})
-        last = path[-1]
-        if item["old"] is None:
-            if last in cur:
-                del cur[last]
+        op = item.get("op")
+        # Diffs written before `op` existed recorded a missing path as None
+        if (op == removed_op) if op else item[side] is None:
+            _delete_path(out, item["path"].split("."))
         else:
-            cur[last] = item["old"]
+            sets.append(item)
+    for item in sets:
+        _set_path(out, item["path"].split("."), item[side])
     return out
 
 
+def _apply_diff_reverse(data: dict, diffs: list) -> dict:
+    return _apply_diff(data, diffs, reverse=True)
+
+
+def _apply_diff_forward(data: dict, diffs: list) -> dict:
+    return _apply_diff(data, diffs, reverse=False)
+
+
 # def sanitize_filename(name: str) -> str:
 #     # Remove potentially dangerous characters for all OSes
 #     name = re.sub(r"[^A-Za-z0-9_.-]", "_", name)
@@ -98,13 +167,75 @@ def _apply_diff_reverse(data: dict, diffs: list) -> dict:
 
 
 class ProfileStore:
-    def __init__(self, sqlite_path: str = ".data/profile.db", upload_dir: str = ".data/uploads"):
+    def __init__(
+        self,
+        sqlite_path: str = ".data/profile.db",
+        upload_dir: str = ".data/uploads",
+        write_behind: bool = False,
+        profile_cache_size: int = 256,
+        verify_cached_version: bool = False,
+        archive_dir: str | None = None,
+    ):
         self.sqlite_path = sqlite_path
         self.upload_dir = upload_dir
+        # Cold tier for aged rows, one directory per database file by default
+        db_path = Path(sqlite_path)
+        self.archive = ArchiveWriter(archive_dir or db_path.parent / "archive" / db_path.stem)
+        # Read-through cache of parsed profiles; verify_cached_version adds a cheap
+        # `SELECT version` per read for setups where other processes write too
+        self._profile_cache = ProfileCache(profile_cache_size)
+        self._verify_cached_version = verify_cached_version
         Path(sqlite_path).parent.mkdir(parents=True, exist_ok=True)
         Path(upload_dir).mkdir(parents=True, exist_ok=True)
-        with _connect(self.sqlite_path) as con:
+        with self._open() as con:
             self._ensure_schema(con)
+        # Optional group-commit writer for evidence rows (see EvidenceWriter)
+        self._evidence_writer: EvidenceWriter | None = None
+        if write_behind:
+            self._evidence_writer = EvidenceWriter(self._open)
+            # Drains the writer when the store is collected or at exit, whichever
+            # comes first; close() runs it early
+            self._writer_finalizer = weakref.finalize(self, self._evidence_writer.shutdown)
+
+    def _open(self) -> sqlite3.Connection:
+        """Opens a connection to this store's database; backends override this."""
+        return _connect(self.sqlite_path)
+
+    @contextmanager
+    def _profile_write(self, user_id: str) -> Iterator[sqlite3.Connection]:
+        """Transaction for a profile write; drops the cached profile once committed."""
+        try:
+            with self._open() as con:
+                yield con
+        finally:
+            self._profile_cache.invalidate(user_id)
+
+    def cache_stats(self) -> dict[str, Any]:
+        return self._profile_cache.stats()
+
+    def map_shards(self, fn: Callable[[ProfileStore], T]) -> list[T]:
+        """Runs `fn` once per underlying database; a single-file store has one."""
+        return [fn(self)]
+
+    def flush(self, timeout: float | None = None) -> None:
+        """Waits until all buffered evidence rows are committed."""
+        if self._evidence_writer:
+            self._evidence_writer.flush(timeout)
+
+    def _await_evidence(self) -> None:
+        """Bounded flush before evidence reads; a stuck or failed writer only logs."""
+        if not self._evidence_writer:
+            return
+        try:
+            if not self._evidence_writer.flush(EVIDENCE_READ_WAIT_S):
+                log.warning("evidence_flush_timeout", timeout_s=EVIDENCE_READ_WAIT_S)
+        except RuntimeError as e:
+            log.error("evidence_writer_failed", error=repr(e.__cause__ or e))
+
+    def close(self) -> None:
+        """Drains and stops the background evidence writer, if any."""
+        if self._evidence_writer:
+            self._writer_finalizer()
 
     def _ensure_schema(self, con: sqlite3.Connection) -> None:
         con.executescript(
@@ -133,17 +264,49 @@ class ProfileStore:
                 category TEXT, turn_id TEXT, created_at INTEGER NOT NULL,
                 path TEXT NOT NULL
             );
+            CREATE TABLE IF NOT EXISTS profile_versions (
+                user_id TEXT NOT NULL, version INTEGER NOT NULL,
+                diff TEXT NOT NULL, snapshot TEXT, created_at INTEGER NOT NULL,
+                PRIMARY KEY (user_id, version)
+            );
+            CREATE TABLE IF NOT EXISTS archive_index (
+                kind TEXT NOT NULL, record_id INTEGER NOT NULL, user_id TEXT NOT NULL,
+                file TEXT NOT NULL, member_offset INTEGER NOT NULL,
+                member_length INTEGER NOT NULL, member_sha256 TEXT NOT NULL,
+                archived_at INTEGER NOT NULL,
+                PRIMARY KEY (kind, record_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_archive_index_user ON archive_index (user_id, kind);
             CREATE TABLE IF NOT EXISTS receipt_parses (
                 id INTEGER PRIMARY KEY AUTOINCREMENT, attachment_id INTEGER NOT NULL,
                 user_id TEXT NOT NULL, text TEXT, parsed_data TEXT, engine TEXT,
                 created_at INTEGER NOT NULL,
                 FOREIGN KEY(attachment_id) REFERENCES evidence_files(id)
             );
+            CREATE TABLE IF NOT EXISTS entity_memory (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT NOT NULL,
+                kind TEXT NOT NULL, data TEXT NOT NULL, created_at INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_entity_memory_user
+                ON entity_memory (user_id, kind, id);
             """
         )
 
     def get_profile(self, user_id: str) -> ProfileSnapshot:
-        with _connect(self.sqlite_path) as con:
+        cached = self._profile_cache.get(user_id)
+        if cached and self._verify_cached_version:
+            with self._open() as con:
+                row = con.execute(
+                    "SELECT version FROM profiles WHERE user_id = ?", (user_id,)
+                ).fetchone()
+            if not row or row[0] != cached[0]:
+                self._profile_cache.invalidate(user_id)
+                cached = None
+        if cached:
+            return ProfileSnapshot(version=cached[0], data=cached[1])
+
+        generation = self._profile_cache.generation(user_id)
+        with self._open() as con:
             row = con.execute(
                 "SELECT version, data FROM profiles WHERE user_id = ?", (user_id,)
             ).fetchone()
@@ -151,23 +314,94 @@ class ProfileStore:
                 empty = ProfileSnapshot(version=0, data={"preferences": {"language": "auto"}})
                 con.execute(
                     "INSERT INTO profiles VALUES (?, ?, ?, ?)",
-                    (user_id, empty.version, json.dumps(empty.data), _utc_ms()),
+                    (user_id, empty.version, dumps(empty.data), _utc_ms()),
                 )
+                self._record_version(con, user_id, empty.version, empty.data, [])
                 return empty
-            return ProfileSnapshot(version=row[0], data=json.loads(row[1]))
+            snapshot = ProfileSnapshot(version=row[0], data=loads(row[1]))
+        self._profile_cache.put(user_id, snapshot.version, snapshot.data, generation)
+        return snapshot
+
+    def _record_version(
+        self, con: sqlite3.Connection, user_id: str, version: int, data: dict, diff: list
+    ) -> None:
+        """Appends a history row; every SNAPSHOT_EVERY versions also stores the full data."""
+        snapshot = dumps(data) if version % SNAPSHOT_EVERY == 0 else None
+        con.execute(
+            "INSERT OR REPLACE INTO profile_versions VALUES (?, ?, ?, ?, ?)",
+            (user_id, version, dumps(diff), snapshot, _utc_ms()),
+        )
+
+    def _save_profile(
+        self, con: sqlite3.Connection, user_id: str, current: ProfileSnapshot, new_data: dict
+    ) -> tuple[ProfileSnapshot, list[dict]]:
+        """Writes a new profile version and its history row in the caller's transaction."""
+        has_history = con.execute(
+            "SELECT 1 FROM profile_versions WHERE user_id=? LIMIT 1", (user_id,)
+        ).fetchone()
+        if not has_history:
+            # Profiles created before history existed: anchor it at the current version
+            con.execute(
+                "INSERT INTO profile_versions VALUES (?, ?, ?, ?, ?)",
+                (user_id, current.version, "[]", dumps(current.data), _utc_ms()),
+            )
+        new_version = current.version + 1
+        diff = _compute_diff(current.data, new_data)
+        con.execute(
+            "UPDATE profiles SET version=?, data=?, updated_at=? WHERE user_id=?",
+            (new_version, dumps(new_data), _utc_ms(), user_id),
+        )
+        self._record_version(con, user_id, new_version, new_data, diff)
+        return ProfileSnapshot(version=new_version, data=new_data), diff
 
     def apply_patch(self, user_id: str, patch: dict) -> tuple[ProfileSnapshot, list[dict]]:
-        with _connect(self.sqlite_path) as con:
+        with self._profile_write(user_id) as con:
             current = self.get_profile(user_id)
-            old_data, new_data = current.data, current.data.copy()
+            new_data = clone(current.data)
             _deep_merge(patch, new_data)
-            new_version = current.version + 1
-            diff = _compute_diff(old_data, new_data)
-            con.execute(
-                "UPDATE profiles SET version=?, data=?, updated_at=? WHERE user_id=?",
-                (new_version, json.dumps(new_data), _utc_ms(), user_id),
-            )
-            return ProfileSnapshot(version=new_version, data=new_data), diff
+            return self._save_profile(con, user_id, current, new_data)
+
+    def get_profile_at(self, user_id: str, version: int) -> ProfileSnapshot:
+        """
+        Reconstructs the profile as it was at `version`: the nearest snapshot at or
+        below it plus at most SNAPSHOT_EVERY - 1 forward diffs.
+        """
+        with self._open() as con:
+            base = con.execute(
+                "SELECT version, snapshot FROM profile_versions WHERE user_id=? AND version<=? "
+                "AND snapshot IS NOT NULL ORDER BY version DESC LIMIT 1",
+                (user_id, version),
+            ).fetchone()
+            if not base:
+                raise ValueError(f"No history for version {version} of user {user_id}.")
+            rows = con.execute(
+                "SELECT version, diff FROM profile_versions WHERE user_id=? AND version>? "
+                "AND version<=? ORDER BY version",
+                (user_id, base[0], version),
+            ).fetchall()
+        if [r[0] for r in rows] != list(range(base[0] + 1, version + 1)):
+            raise ValueError(f"No history for version {version} of user {user_id}.")
+        data = loads(base[1])
+        for _, diff in rows:
+            data = _apply_diff_forward(data, loads(diff))
+        return ProfileSnapshot(version=version, data=data)
+
+    def list_profile_versions(self, user_id: str, limit: int = 100) -> list[dict]:
+        with self._open() as con:
+            rows = con.execute(
+                "SELECT version, diff, snapshot IS NOT NULL, created_at FROM profile_versions "
+                "WHERE user_id=? ORDER BY version DESC LIMIT ?",
+                (user_id, limit),
+            ).fetchall()
+            return [
+                {
+                    "version": r[0],
+                    "diff": loads(r[1]),
+                    "is_snapshot": bool(r[2]),
+                    "created_at": r[3],
+                }
+                for r in rows
+            ]
 
     def commit_action(
         self,
@@ -180,7 +414,7 @@ class ProfileStore:
         committed: bool,
         undo_of: str | None = None,
     ) -> None:
-        with _connect(self.sqlite_path) as con:
+        with self._open() as con:
             v_after = self.get_profile(user_id).version if committed else None
             con.execute(
                 "INSERT INTO actions VALUES (?,?,?,?,?,?,?,?,?,?)",
@@ -188,49 +422,111 @@ class ProfileStore:
                     action_id,
                     user_id,
                     kind,
-                    json.dumps(payload),
+                    dumps(payload),
                     payload_hash,
                     1 if committed else 0,
                     v_after,
-                    json.dumps(diff),
+                    encode_text(dumps(diff)),
                     _utc_ms(),
                     undo_of,
                 ),
             )
 
     def _get_last_committed_action(self, user_id: str) -> dict | None:
-        with _connect(self.sqlite_path) as con:
+        with self._open() as con:
             sql = (
                 "SELECT id, diff FROM actions WHERE user_id=? AND committed=1 "
                 "AND diff IS NOT NULL ORDER BY created_at DESC LIMIT 1"
             )
             row = con.execute(sql, (user_id,)).fetchone()
-            return {"id": row[0], "diff": json.loads(row[1])} if row else None
+            return {"id": row[0], "diff": loads(decode_text(row[1]))} if row else None
+
+    def _undo_state(self, user_id: str) -> tuple[list[dict], list[dict]]:
+        """
+        Replays the committed actions and returns (edits still in effect, redo stack).
+        Both lists are oldest first; a new edit clears the redo stack.
+        """
+        with self._open() as con:
+            rows = con.execute(
+                "SELECT id, kind, payload, version_after FROM actions WHERE user_id=? "
+                "AND committed=1 AND version_after IS NOT NULL ORDER BY created_at, rowid",
+                (user_id,),
+            ).fetchall()
+        edits: list[dict] = []
+        redo_stack: list[dict] = []
+        for action_id, kind, payload_str, version_after in rows:
+            payload = loads(payload_str)
+            if kind == "undo":
+                refs = payload.get("ref_action_ids") or [payload.get("ref_action_id")]
+                redo_stack.append(
+                    {
+                        "id": action_id,
+                        "edits": [e for e in edits if e["id"] in refs],
+                        "from_version": payload.get("from_version"),
+                    }
+                )
+                edits = [e for e in edits if e["id"] not in refs]
+            elif kind == "redo":
+                for _ in payload.get("ref_undo_ids", []):
+                    if redo_stack:
+                        edits.extend(redo_stack.pop()["edits"])
+            else:
+                edits.append({"id": action_id, "version_after": version_after})
+                redo_stack.clear()
+        return edits, redo_stack
 
-    def undo_action(self, user_id: str, new_action_id: str) -> ProfileSnapshot:
-        last_action = self._get_last_committed_action(user_id)
-        if not last_action:
+    def _write_history_step(
+        self, user_id: str, target: ProfileSnapshot, new_action_id: str, kind: str, payload: dict
+    ) -> ProfileSnapshot:
+        with self._profile_write(user_id) as con:
+            current = self.get_profile(user_id)
+            new_snapshot, diff = self._save_profile(con, user_id, current, target.data)
+        payload = {**payload, "from_version": current.version, "target_version": target.version}
+        undo_of = payload.get("ref_action_id") if kind == "undo" else None
+        self.commit_action(user_id, new_action_id, kind, payload, "", diff, True, undo_of)
+        return new_snapshot
+
+    def undo_action(self, user_id: str, new_action_id: str, steps: int = 1) -> ProfileSnapshot:
+        """Rolls back the last `steps` edits still in effect (undone edits are skipped)."""
+        edits, _ = self._undo_state(user_id)
+        if not edits or steps < 1:
             raise ValueError("No undoable action found.")
-        current_profile = self.get_profile(user_id)
-        reverted_data = _apply_diff_reverse(current_profile.data, last_action["diff"])
-        with _connect(self.sqlite_path) as con:
-            new_version = current_profile.version + 1
-            con.execute(
-                "UPDATE profiles SET version=?, data=?, updated_at=? WHERE user_id=?",
-                (new_version, json.dumps(reverted_data), _utc_ms(), user_id),
+        undone = sorted(edits, key=lambda e: e["version_after"], reverse=True)[:steps]
+        target_version = min(e["version_after"] for e in undone) - 1
+        try:
+            target = self.get_profile_at(user_id, target_version)
+        except ValueError:
+            if len(undone) > 1:
+                raise
+            # Edit predates version history: fall back to reversing its stored diff
+            last_action = self._get_last_committed_action(user_id)
+            if not last_action or last_action["id"] != undone[0]["id"]:
+                raise
+            current = self.get_profile(user_id)
+            target = ProfileSnapshot(
+                version=target_version,
+                data=_apply_diff_reverse(current.data, last_action["diff"]),
             )
-            new_snapshot = ProfileSnapshot(version=new_version, data=reverted_data)
-        self.commit_action(
-            user_id,
-            new_action_id,
-            "undo",
-            {"ref_action_id": last_action["id"]},
-            "",
-            last_action["diff"],
-            True,
-            undo_of=last_action["id"],
-        )
-        return new_snapshot
+        payload = {"ref_action_id": undone[0]["id"], "ref_action_ids": [e["id"] for e in undone]}
+        return self._write_history_step(user_id, target, new_action_id, "undo", payload)
+
+    def redo_action(self, user_id: str, new_action_id: str, steps: int = 1) -> ProfileSnapshot:
+        """Re-applies the last `steps` undos, provided no new edit happened since."""
+        _, redo_stack = self._undo_state(user_id)
+        if steps < 1 or len(redo_stack) < steps:
+            raise ValueError("No redoable action found.")
+        redone = redo_stack[::-1][:steps]
+        target_version = redone[-1]["from_version"]
+        if target_version is None:
+            raise ValueError("No redoable action found.")
+        target = self.get_profile_at(user_id, target_version)
+        payload = {"ref_undo_ids": [u["id"] for u in redone]}
+        return self._write_history_step(user_id, target, new_action_id, "redo", payload)
+
+    def revert_to_version(self, user_id: str, version: int, new_action_id: str) -> ProfileSnapshot:
+        """Writes a new version whose data equals a past one (itself undoable)."""
+        target = self.get_profile_at(user_id, version)
+        return self._write_history_step(user_id, target, new_action_id, "revert", {})
 
     def add_attachment(
         self,
@@ -260,7 +556,7 @@ class ProfileStore:
             "created_at": _utc_ms(),
             "path": str(dest_path),
         }
-        with _connect(self.sqlite_path) as con:
+        with self._open() as con:
             cur = con.execute(
                 (
                     "INSERT INTO evidence_files (user_id, filename, content_type, size_bytes, "
@@ -283,7 +579,7 @@ class ProfileStore:
         return meta
 
     def get_attachment(self, attachment_id: int) -> dict | None:
-        with _connect(self.sqlite_path) as con:
+        with self._open() as con:
             con.row_factory = sqlite3.Row
             row = con.execute(
                 "SELECT * FROM evidence_files WHERE id=?", (attachment_id,)
@@ -291,7 +587,7 @@ class ProfileStore:
             return dict(row) if row else None
 
     def list_attachments(self, user_id: str, limit: int = 100) -> list[dict]:
-        with _connect(self.sqlite_path) as con:
+        with self._open() as con:
             con.row_factory = sqlite3.Row
             rows = con.execute(
                 "SELECT * FROM evidence_files WHERE user_id=? ORDER BY created_at DESC LIMIT ?",
@@ -308,7 +604,7 @@ class ProfileStore:
             serializable_data = asdict(parsed_data)
         else:
             serializable_data = parsed_data
-        with _connect(self.sqlite_path) as con:
+        with self._open() as con:
             cur = con.execute(
                 (
                     "INSERT INTO receipt_parses (attachment_id, user_id, text, "
@@ -317,8 +613,8 @@ class ProfileStore:
                 (
                     attachment_id,
                     user_id,
-                    text,
-                    json.dumps(serializable_data, cls=DecimalEncoder),
+                    encode_text(text),
+                    dumps(serializable_data),
                     engine,
                     _utc_ms(),
                 ),
@@ -327,7 +623,7 @@ class ProfileStore:
 
     def get_receipt_parse_by_attachment(self, attachment_id: int) -> dict | None:
         """Retrieves the most recent parse for a given attachment ID."""
-        with _connect(self.sqlite_path) as con:
+        with self._open() as con:
             con.row_factory = sqlite3.Row
             # Reformat the long SQL string to be multi-line
             row = con.execute(
@@ -338,62 +634,91 @@ class ProfileStore:
             if not row:
                 return None
 
-            parse = dict(row)
-            parse["parsed_data"] = json.loads(parse["parsed_data"])
+            parse = _decoded(row, "receipt_parses")
+            parse["parsed_data"] = loads(parse["parsed_data"])
             return parse
 
     def list_actions(self, user_id: str, limit: int = 100) -> list[dict]:
-        with _connect(self.sqlite_path) as con:
+        with self._open() as con:
             con.row_factory = sqlite3.Row
             rows = con.execute(
                 "SELECT * FROM actions WHERE user_id = ? ORDER BY created_at DESC LIMIT ?",
                 (user_id, limit),
             ).fetchall()
-            return [dict(row) for row in rows]
+            return [_decoded(row, "actions") for row in rows]
+
+    def _evidence_row(
+        self, user_id: str, turn_id: str | None, kind: str, payload: dict, result: dict
+    ) -> EvidenceRow:
+        payload_str = canonical_dumps(payload)
+        payload_hash = hashlib.sha256(payload_str.encode()).hexdigest()
+        return (
+            user_id,
+            turn_id,
+            kind,
+            encode_text(payload_str),
+            payload_hash,
+            encode_text(dumps(result)),
+            _utc_ms(),
+        )
 
     def log_evidence(
         self, user_id: str, turn_id: str | None, kind: str, payload: dict, result: dict
     ) -> int:
         """Logs a read-only event, now including a hash of the payload for integrity."""
-        with _connect(self.sqlite_path) as con:
-            payload_str = json.dumps(payload, sort_keys=True)
-            payload_hash = hashlib.sha256(payload_str.encode()).hexdigest()
+        return self.log_evidence_deferred(user_id, turn_id, kind, payload, result).result()
+
+    def log_evidence_deferred(
+        self, user_id: str, turn_id: str | None, kind: str, payload: dict, result: dict
+    ) -> Future[int]:
+        """
+        Like log_evidence, but returns a Future for the row id instead of waiting.
+        With write_behind enabled the row is committed by the background writer.
+        """
+        row = self._evidence_row(user_id, turn_id, kind, payload, result)
+        if self._evidence_writer:
+            return self._evidence_writer.submit(row)
+        fut: Future[int] = Future()
+        with self._open() as con:
             cur = con.execute(
                 (
                     "INSERT INTO evidence (user_id, turn_id, kind, payload, "
                     "payload_hash, result, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)"
                 ),
-                (user_id, turn_id, kind, payload_str, payload_hash, json.dumps(result), _utc_ms()),
+                row,
             )
-            return cur.lastrowid or 0
+            fut.set_result(cur.lastrowid or 0)
+        return fut
 
     def get_all_evidence_for_scan(self, user_id: str) -> list[dict]:
         """Fetches all evidence records for a user for an integrity scan."""
-        with _connect(self.sqlite_path) as con:
+        self._await_evidence()
+        with self._open() as con:
             con.row_factory = sqlite3.Row
             rows = con.execute(
                 "SELECT id, kind, payload, payload_hash FROM evidence WHERE user_id = ?", (user_id,)
             ).fetchall()
-            return [dict(row) for row in rows]
+            return [_decoded(row, "evidence") for row in rows]
 
     def list_evidence(self, user_id: str, limit: int = 100) -> list[dict]:
-        with _connect(self.sqlite_path) as con:
+        self._await_evidence()
+        with self._open() as con:
             con.row_factory = sqlite3.Row
             rows = con.execute(
                 "SELECT * FROM evidence WHERE user_id = ? ORDER BY created_at DESC LIMIT ?",
                 (user_id, limit),
             ).fetchall()
-            return [dict(row) for row in rows]
+            return [_decoded(row, "evidence") for row in rows]
 
     def get_all_user_ids(self) -> list[str]:
         """Retrieves a list of all user_ids in the profiles table."""
-        with _connect(self.sqlite_path) as con:
+        with self._open() as con:
             rows = con.execute("SELECT user_id FROM profiles").fetchall()
             return [row[0] for row in rows]
 
     def list_attachments_older_than(self, user_id: str, cutoff_ms: int) -> list[dict]:
         """Lists attachment records older than a given timestamp for a dry run."""
-        with _connect(self.sqlite_path) as con:
+        with self._open() as con:
             con.row_factory = sqlite3.Row
             rows = con.execute(
                 "SELECT * FROM evidence_files WHERE user_id = ? AND created_at < ?",
@@ -403,7 +728,7 @@ class ProfileStore:
 
     def delete_attachments_older_than(self, user_id: str, cutoff_ms: int) -> int:
         """Finds and deletes old attachment files and their database records."""
-        with _connect(self.sqlite_path) as con:
+        with self._open() as con:
             rows = con.execute(
                 "SELECT path FROM evidence_files WHERE user_id = ? AND created_at < ?",
                 (user_id, cutoff_ms),
@@ -422,18 +747,280 @@ class ProfileStore:
 
     def list_evidence_older_than(self, user_id: str, cutoff_ms: int) -> list[dict]:
         """Lists evidence records older than a given timestamp for a dry run."""
-        with _connect(self.sqlite_path) as con:
+        self._await_evidence()
+        with self._open() as con:
             con.row_factory = sqlite3.Row
             rows = con.execute(
                 "SELECT * FROM evidence WHERE user_id = ? AND created_at < ?", (user_id, cutoff_ms)
             ).fetchall()
-            return [dict(row) for row in rows]
+            return [_decoded(row, "evidence") for row in rows]
 
     def delete_evidence_older_than(self, user_id: str, cutoff_ms: int) -> int:
         """Deletes old evidence records from the database."""
-        with _connect(self.sqlite_path) as con:
+        self._await_evidence()
+        with self._open() as con:
             cur = con.execute(
                 "DELETE FROM evidence WHERE user_id = ? AND created_at < ?",
                 (user_id, cutoff_ms),
             )
             return cur.rowcount or 0
+
+    # --- Entity memory ---
+    def remember_entity(
+        self,
+        user_id: str,
+        kind: str,
+        data: Any,
+        keep: int = 20,
+        created_at: int | None = None,
+    ) -> None:
+        """Appends one entity and drops all but the `keep` most recent of its kind."""
+        with self._open() as con:
+            con.execute(
+                "INSERT INTO entity_memory (user_id, kind, data, created_at) VALUES (?, ?, ?, ?)",
+                (user_id, kind, dumps(data), created_at or _utc_ms()),
+            )
+            con.execute(
+                "DELETE FROM entity_memory WHERE user_id = ? AND kind = ? AND id <= ("
+                "SELECT id FROM entity_memory WHERE user_id = ? AND kind = ? "
+                "ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                (user_id, kind, user_id, kind, keep),
+            )
+
+    def list_entities(self, user_id: str, per_kind: int = 20) -> list[dict]:
+        """The `per_kind` most recent entities of each kind, oldest first."""
+        with self._open() as con:
+            rows = con.execute(
+                "SELECT kind, data, created_at FROM ("
+                "SELECT *, ROW_NUMBER() OVER (PARTITION BY kind ORDER BY id DESC) AS rn "
+                "FROM entity_memory WHERE user_id = ?) WHERE rn <= ? ORDER BY id",
+                (user_id, per_kind),
+            ).fetchall()
+        return [{"kind": kind, "data": loads(data), "ts": ts} for kind, data, ts in rows]
+
+    def list_entities_older_than(self, user_id: str, cutoff_ms: int) -> list[dict]:
+        """Lists remembered entities older than a given timestamp for a dry run."""
+        with self._open() as con:
+            con.row_factory = sqlite3.Row
+            rows = con.execute(
+                "SELECT * FROM entity_memory WHERE user_id = ? AND created_at < ?",
+                (user_id, cutoff_ms),
+            ).fetchall()
+            return [dict(row) for row in rows]
+
+    def delete_entities_older_than(self, user_id: str, cutoff_ms: int) -> int:
+        """Deletes remembered entities older than a given timestamp."""
+        with self._open() as con:
+            cur = con.execute(
+                "DELETE FROM entity_memory WHERE user_id = ? AND created_at < ?",
+                (user_id, cutoff_ms),
+            )
+            return cur.rowcount or 0
+
+    # --- Archive ---
+    def list_receipt_parses_older_than(self, user_id: str, cutoff_ms: int) -> list[dict]:
+        """Lists receipt parses older than a given timestamp for a dry run."""
+        with self._open() as con:
+            con.row_factory = sqlite3.Row
+            rows = con.execute(
+                "SELECT * FROM receipt_parses WHERE user_id = ? AND created_at < ?",
+                (user_id, cutoff_ms),
+            ).fetchall()
+            return [_decoded(row, "receipt_parses") for row in rows]
+
+    def archive_older_than(
+        self, user_id: str, cutoff_ms: int, batch_size: int = 1000
+    ) -> dict[str, int]:
+        """
+        Moves evidence, receipt parses and entity memory older than `cutoff_ms` out of
+        the hot tables into the monthly archive files. Each batch is written and fsynced before its
+        rows are deleted, in one transaction with the index update.
+        """
+        self._await_evidence()
+        counts: dict[str, int] = {}
+        for kind, table in ARCHIVE_TABLES.items():
+            counts[kind] = 0
+            while True:
+                with self._open() as con:
+                    con.row_factory = sqlite3.Row
+                    rows = [
+                        _decoded(row, table)
+                        for row in con.execute(
+                            f"SELECT * FROM {table} WHERE user_id = ? AND created_at < ? "
+                            "ORDER BY id LIMIT ?",
+                            (user_id, cutoff_ms, batch_size),
+                        )
+                    ]
+                    if not rows:
+                        break
+                    now = _utc_ms()
+                    con.executemany(
+                        "INSERT OR REPLACE INTO archive_index VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        [
+                            (
+                                e["kind"],
+                                e["record_id"],
+                                e["user_id"],
+                                e["file"],
+                                e["offset"],
+                                e["length"],
+                                e["sha256"],
+                                now,
+                            )
+                            for e in self.archive.append(kind, rows)
+                        ],
+                    )
+                    con.executemany(f"DELETE FROM {table} WHERE id = ?", [(r["id"],) for r in rows])
+                counts[kind] += len(rows)
+        return counts
+
+    def _archive_entries(self, con: sqlite3.Connection, where: str, args: tuple) -> list[dict]:
+        rows = con.execute(
+            "SELECT kind, record_id, user_id, file, member_offset, member_length, "
+            f"member_sha256, archived_at FROM archive_index WHERE {where}",
+            args,
+        ).fetchall()
+        return [
+            {
+                "kind": r[0],
+                "record_id": r[1],
+                "user_id": r[2],
+                "file": r[3],
+                "offset": r[4],
+                "length": r[5],
+                "sha256": r[6],
+                "archived_at": r[7],
+            }
+            for r in rows
+        ]
+
+    def get_archived_record(self, kind: str, record_id: int) -> dict | None:
+        """
+        Reads one archived row of `kind`, a key of ARCHIVE_TABLES: evidence ("evidence"),
+        receipt parse ("receipt_parse") or remembered entity ("entity").
+        """
+        with self._open() as con:
+            entries = self._archive_entries(con, "kind = ? AND record_id = ?", (kind, record_id))
+        return self.archive.read_record(entries[0]) if entries else None
+
+    def list_archived(self, user_id: str, kind: str | None = None, limit: int = 100) -> list[dict]:
+        """Index entries of a user's archived records, newest first."""
+        where: str = "user_id = ?"
+        args: tuple[Any, ...] = (user_id,)
+        if kind:
+            where, args = "user_id = ? AND kind = ?", (user_id, kind)
+        with self._open() as con:
+            return self._archive_entries(
+                con, f"{where} ORDER BY archived_at DESC, record_id DESC LIMIT ?", (*args, limit)
+            )
+
+    def iter_archived_records(self, user_id: str, kind: str | None = None) -> Iterator[dict]:
+        """
+        Yields a user's archived records, reading each archive member once. Records whose
+        member no longer matches its indexed sha256 are yielded as
+        {"archive_kind", "id", "member_ok": False} without content.
+        """
+        where: str = "user_id = ?"
+        args: tuple[Any, ...] = (user_id,)
+        if kind:
+            where, args = "user_id = ? AND kind = ?", (user_id, kind)
+        with self._open() as con:
+            entries = self._archive_entries(con, f"{where} ORDER BY file, member_offset", args)
+        members: dict[tuple[str, int], list[dict]] = {}
+        for entry in entries:
+            members.setdefault((entry["file"], entry["offset"]), []).append(entry)
+        for group in members.values():
+            wanted = {(e["kind"], e["record_id"]) for e in group}
+            try:
+                member, ok = self.archive.read_member(group[0])
+            except OSError:
+                member, ok = b"", False
+            if not ok:
+                for e in group:
+                    yield {"archive_kind": e["kind"], "id": e["record_id"], "member_ok": False}
+                continue
+            for rec in self.archive.parse_member(member):
+                if (rec["archive_kind"], rec["id"]) in wanted:
+                    yield {**rec, "member_ok": True}
+
+    # --- Export ---
+    def export_user_data(self, user_id: str, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """
+        Streams a ZIP of the user's profile, actions, profile history, evidence,
+        receipt parses and attachment files. Nothing is buffered beyond one chunk.
+        """
+        self._await_evidence()
+        profile = self.get_profile(user_id)
+        return stream_user_export(
+            self._open,
+            user_id,
+            {"user_id": user_id, "version": profile.version, "data": profile.data},
+            decode=decode_column,
+            archived=self.iter_archived_records(user_id),
+            chunk_size=chunk_size,
+        )
+
+    # --- Compression ---
+    def compression_stats(self) -> dict[str, dict[str, Any]]:
+        """Per compressed column: row counts, stored vs. uncompressed bytes and the ratio."""
+        self._await_evidence()
+        stats: dict[str, dict[str, Any]] = {}
+        with self._open() as con:
+            for table, column in COMPRESSED_COLUMNS:
+                rows = compressed = stored = raw = 0
+                for (value,) in con.execute(
+                    f"SELECT {column} FROM {table} WHERE {column} IS NOT NULL"
+                ):
+                    rows += 1
+                    if isinstance(value, bytes):
+                        compressed += 1
+                        stored += len(value)
+                        raw += len(decode_text(value).encode("utf-8"))
+                    else:
+                        size = len(value.encode("utf-8"))
+                        stored += size
+                        raw += size
+                stats[f"{table}.{column}"] = {
+                    "rows": rows,
+                    "compressed_rows": compressed,
+                    "stored_bytes": stored,
+                    "raw_bytes": raw,
+                    "ratio": round(stored / raw, 4) if raw else 1.0,
+                }
+        return stats
+
+    def recompress_all(self, batch_size: int = 500, vacuum: bool = True) -> dict[str, int]:
+        """
+        One-shot migration: compresses every plain-TEXT value in the compressed
+        columns, in batches of `batch_size` rows per transaction. Returns the number
+        of rows rewritten per column. `vacuum` reclaims the freed pages afterwards.
+        """
+        self._await_evidence()
+        rewritten: dict[str, int] = {}
+        for table, column in COMPRESSED_COLUMNS:
+            count, last_rowid = 0, 0
+            while True:
+                with self._open() as con:
+                    batch = con.execute(
+                        f"SELECT rowid, {column} FROM {table} WHERE rowid > ? "
+                        f"AND typeof({column}) = 'text' ORDER BY rowid LIMIT ?",
+                        (last_rowid, batch_size),
+                    ).fetchall()
+                    if not batch:
+                        break
+                    updates = [
+                        (encoded, rowid)
+                        for rowid, value in batch
+                        if isinstance(encoded := encode_text(value), bytes)
+                    ]
+                    con.executemany(f"UPDATE {table} SET {column} = ? WHERE rowid = ?", updates)
+                count += len(updates)
+                last_rowid = batch[-1][0]
+            rewritten[f"{table}.{column}"] = count
+        if vacuum and any(rewritten.values()):
+            con = self._open()
+            try:
+                con.execute("VACUUM")
+            finally:
+                con.close()
+        return rewritten
@@ -1,32 +1,96 @@
 from __future__ import annotations
 
 import time
-from typing import Any
+from collections import deque
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from app.memory.storage import ProfileStorage
+
+# Most recent entities kept per kind, in memory and in the store
+MAX_ENTITIES_PER_KIND = 20
+_PRONOUNS = (" it", " them", " another one", "the same", "dasselbe")
 
 
 class EntityMemory:
-    """A simple, recency-based memory for entities mentioned in a conversation."""
+    """
+    A recency-based memory for entities mentioned in a conversation: one bounded
+    deque per kind, most recent first, so the latest entity of a kind is an O(1)
+    lookup. Bound to a store (see `for_user`), it loads the user's entities on first
+    use and saves each remembered entity as one row of the store's entity_memory
+    table, so it survives across sessions without touching the profile.
+    """
 
-    def __init__(self, entities: list[dict[str, Any]] | None = None) -> None:
-        # Sort entities by timestamp on load, most recent first
-        self.entities = sorted(entities or [], key=lambda x: x.get("ts", 0), reverse=True)
-        self.now_ms = int(time.time() * 1000)
+    def __init__(
+        self,
+        entities: list[dict[str, Any]] | None = None,
+        max_per_kind: int = MAX_ENTITIES_PER_KIND,
+        store: ProfileStorage | None = None,
+        user_id: str | None = None,
+    ) -> None:
+        self.max_per_kind = max_per_kind
+        self.store = store
+        self.user_id = user_id
+        self._kinds: dict[str, deque[dict[str, Any]]] | None = None
+        self._initial = entities or []
 
     @staticmethod
     def from_profile(data: dict) -> EntityMemory:
-        """Loads the memory from a user profile dictionary."""
+        """Loads the memory from a user profile dictionary (the legacy location)."""
         return EntityMemory((data or {}).get("nlu_memory", {}).get("entities", []))
 
+    @staticmethod
+    def for_user(
+        store: ProfileStorage, user_id: str, max_per_kind: int = MAX_ENTITIES_PER_KIND
+    ) -> EntityMemory:
+        """The persistent memory of `user_id`; nothing is read until it is used."""
+        return EntityMemory(max_per_kind=max_per_kind, store=store, user_id=user_id)
+
+    def _by_kind(self) -> dict[str, deque[dict[str, Any]]]:
+        if self._kinds is None:
+            entities = list(self._initial)
+            if self.store is not None and self.user_id is not None:
+                entities += self.store.list_entities(self.user_id, self.max_per_kind)
+            self._kinds = {}
+            # Oldest first, so every appendleft leaves the most recent at the front
+            for entity in sorted(entities, key=lambda x: x.get("ts", 0)):
+                self._deque(entity.get("kind", "")).appendleft(entity)
+        return self._kinds
+
+    def _deque(self, kind: str) -> deque[dict[str, Any]]:
+        assert self._kinds is not None
+        if kind not in self._kinds:
+            self._kinds[kind] = deque(maxlen=self.max_per_kind)
+        return self._kinds[kind]
+
+    @property
+    def entities(self) -> list[dict[str, Any]]:
+        """All remembered entities, most recent first."""
+        merged = [e for d in self._by_kind().values() for e in d]
+        return sorted(merged, key=lambda x: x.get("ts", 0), reverse=True)
+
     def to_dict(self) -> dict:
-        """Serializes the memory to a dictionary for saving to the profile."""
-        return {"entities": self.entities[:20]}  # Persist the 20 most recent entities
+        """Serializes the memory to a dictionary."""
+        return {"entities": self.entities}
 
     def remember(self, entity: dict[str, Any]) -> None:
-        """Adds a new entity to the top of the memory stack."""
-        entity["ts"] = self.now_ms
-        self.entities.insert(0, entity)
-        # Prune the memory to keep it from growing indefinitely
-        self.entities = self.entities[:20]
+        """Adds a new entity in front of its kind, dropping the oldest one when full."""
+        entity["ts"] = int(time.time() * 1000)
+        self._by_kind()
+        self._deque(entity.get("kind", "")).appendleft(entity)
+        if self.store is not None and self.user_id is not None:
+            self.store.remember_entity(
+                self.user_id,
+                entity.get("kind", ""),
+                entity.get("data"),
+                keep=self.max_per_kind,
+                created_at=entity["ts"],
+            )
+
+    def latest(self, kind: str) -> dict[str, Any] | None:
+        """The most recent entity of `kind`."""
+        entities = self._by_kind().get(kind)
+        return entities[0] if entities else None
 
     def resolve(self, text: str, kind_hint: str) -> dict[str, Any] | None:
         """
@@ -34,9 +98,6 @@ class EntityMemory:
         entity of a compatible kind.
         """
         text_lower = text.lower()
-        # Check for common pronouns and references
-        if any(p in text_lower for p in [" it", " them", " another one", "the same", "dasselbe"]):
-            for entity in self.entities:
-                if entity.get("kind") == kind_hint:
-                    return entity
+        if any(p in text_lower for p in _PRONOUNS):
+            return self.latest(kind_hint)
         return None
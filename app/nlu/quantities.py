@@ -1,68 +1,162 @@
 from __future__ import annotations
 
+import heapq
 import re
+from collections.abc import Iterator
+from decimal import InvalidOperation
+from typing import NamedTuple
 
 from tools.money import D
 
-# Pattern 1: Specifically for items with an explicit quantity (e.g., "2x Monitor 220.50€")
-# This pattern is now more strict about the description.
-_QTY_PATTERN = re.compile(
-    r"(?P<qty>\d+)\s*x\s*(?P<desc>[\w\s.-]+?)\s+" r"(?P<price>\d[\d.,]*)\s*(?:€|eur)",
-    re.IGNORECASE,
-)
+# Every alternative is a single character class, so tokenizing never backtracks
+_TOKEN = re.compile(r"(\d[\d.,]*)|([^\W\d_]+)|(\s+)|(.)", re.DOTALL)
+_NUM, _WORD, _SPACE, _OTHER = range(4)
 
-# Pattern 2: Specifically for single items using keywords like "for" or "at"
-_SINGLE_PATTERN = re.compile(
-    r"\b(?P<desc>[a-zA-Z\s]{3,})\s+(?:for|at|à)\s+(?P<price>\d[\d.,]*)\s*(?:€|eur)",
-    re.IGNORECASE,
-)
+_QTY_MARKS = {"x", "×"}
+_PRICE_KEYWORDS = {"for", "at", "à"}
+_CURRENCIES = {"€", "eur", "euro", "euros"}
+# Besides words, numbers and spaces, a quantity item's description may contain these
+_DESC_PUNCT = {".", "-", "_"}
+# Common false positives
+_NOT_ITEMS = {"and a", "a", "bought"}
 
-# A list of all patterns to try, in order of specificity
-PATTERNS = [_QTY_PATTERN, _SINGLE_PATTERN]
 
+class _Token(NamedTuple):
+    kind: int
+    text: str
+    start: int
+    end: int
 
-def parse_line_items(text: str) -> list[dict]:
+
+class _Match(NamedTuple):
+    start: int
+    end: int
+    qty: int
+    desc: str
+    price: str
+
+
+def _tokenize(text: str) -> list[_Token]:
+    return [
+        _Token(m.lastindex - 1, m.group(), m.start(), m.end())  # type: ignore[operator]
+        for m in _TOKEN.finditer(text)
+    ]
+
+
+def _price_end(tokens: list[_Token], i: int) -> int | None:
+    """Index of the currency token when tokens[i] starts `NUM [space] currency`, else None."""
+    j = i + 1
+    if j < len(tokens) and tokens[j].kind == _SPACE:
+        j += 1
+    if j < len(tokens) and tokens[j].text.lower() in _CURRENCIES:
+        return j
+    return None
+
+
+def _quantity_items(text: str, tokens: list[_Token]) -> Iterator[_Match]:
     """
-    Extracts structured line items by trying multiple specific patterns and ensuring
-    that parts of the string are not matched more than once.
+    "2x Monitor 220,50€": a count, an x, a description and the first price that
+    follows it. The description may hold words, numbers, spaces and _DESC_PUNCT;
+    any other character drops the item.
     """
-    all_matches = []
-    # Find all possible matches from all patterns
-    for pat in PATTERNS:
-        for m in pat.finditer(text):
-            all_matches.append(m)
+    i, n = 0, len(tokens)
+    qty_at = desc_at = -1  # the open item's count and first description token
+    has_desc = False
+    while i < n:
+        tok = tokens[i]
+        if qty_at < 0:
+            if tok.kind == _NUM and tok.text.isdigit():
+                j = i + 1 + (i + 1 < n and tokens[i + 1].kind == _SPACE)
+                if j < n and tokens[j].text.lower() in _QTY_MARKS:
+                    qty_at, desc_at, has_desc = i, j + 1, False
+                    i = j
+            i += 1
+            continue
+        if (
+            tok.kind == _NUM
+            and tokens[i - 1].kind == _SPACE
+            and has_desc
+            and (end := _price_end(tokens, i)) is not None
+        ):
+            yield _Match(
+                tokens[qty_at].start,
+                tokens[end].end,
+                int(tokens[qty_at].text),
+                text[tokens[desc_at].start : tokens[i - 1].start],
+                tok.text,
+            )
+            qty_at = -1
+            i = end
+        elif tok.kind == _OTHER and tok.text not in _DESC_PUNCT:
+            qty_at = -1
+        elif tok.kind != _SPACE:
+            has_desc = True
+        i += 1
 
-    # Sort matches by their start position to process the string from left to right
-    all_matches.sort(key=lambda m: m.start())
 
+def _keyword_items(text: str, tokens: list[_Token]) -> Iterator[_Match]:
+    """
+    "a Keyboard for 75.00 EUR": a run of words, "for"/"at"/"à" and a price. The
+    description is the whole run up to the last keyword, at least three characters.
+    """
+    run_at = -1  # first word of the current run of words and spaces
+    for i, tok in enumerate(tokens):
+        if tok.kind == _WORD:
+            # A word glued to a number ("5kg") cannot start a description
+            if run_at < 0 and (i == 0 or tokens[i - 1].kind != _NUM):
+                run_at = i
+            continue
+        if tok.kind == _SPACE:
+            continue
+        if (
+            tok.kind == _NUM
+            and run_at >= 0
+            and i - 3 > run_at
+            and tokens[i - 1].kind == _SPACE
+            and tokens[i - 2].text.lower() in _PRICE_KEYWORDS
+            and tokens[i - 3].kind == _SPACE
+            and tokens[i - 3].start - tokens[run_at].start >= 3
+            and (end := _price_end(tokens, i)) is not None
+        ):
+            yield _Match(
+                tokens[run_at].start,
+                tokens[end].end,
+                1,
+                text[tokens[run_at].start : tokens[i - 3].start],
+                tok.text,
+            )
+        run_at = -1
+
+
+def parse_line_items(text: str) -> list[dict]:
+    """
+    Extracts structured line items ("2x Monitor 220,50€", "a Keyboard for 75 EUR")
+    from free text in one tokenizing pass plus one scan per item form, so the time
+    is linear in the input length. Where items of both forms overlap, the one that
+    starts first wins.
+    """
+    tokens = _tokenize(text)
     items: list[dict] = []
     last_match_end = -1
-    for match in all_matches:
-        # This check is crucial: it prevents us from processing a sub-match
-        # that is already part of a larger, previously processed match.
-        if match.start() < last_match_end:
+    for match in heapq.merge(
+        _quantity_items(text, tokens), _keyword_items(text, tokens), key=lambda m: m.start
+    ):
+        if match.start < last_match_end:
+            continue
+        description = match.desc.strip()
+        if description.lower() in _NOT_ITEMS:
             continue
-
         try:
-            quantity = int(match.groupdict().get("qty") or 1)
-            description = match.group("desc").strip()
-            price_str = match.group("price").replace(",", ".")
-            unit_price = D(price_str)
-            total_price = quantity * unit_price
-
-            # Filter out common false positives
-            if description.lower() in ("and a", "a", "bought"):
-                continue
-
-            items.append(
-                {
-                    "description": description,
-                    "quantity": quantity,
-                    "unit_price_eur": str(unit_price),
-                    "total_eur": str(total_price),
-                }
-            )
-            last_match_end = match.end()
-        except (ValueError, TypeError, AttributeError):
+            unit_price = D(match.price.replace(",", "."))
+        except InvalidOperation:
             continue
+        items.append(
+            {
+                "description": description,
+                "quantity": match.qty,
+                "unit_price_eur": str(unit_price),
+                "total_eur": str(match.qty * unit_price),
+            }
+        )
+        last_match_end = match.end
     return items
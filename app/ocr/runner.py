@@ -1,12 +1,12 @@
 from __future__ import annotations
 
-from app.memory.store import ProfileStore
+from app.memory.storage import ProfileStorage
 from app.receipts.parser import parse_receipt_text
 
 from .adapter import MockOCRAdapter, OCRAdapter, TesseractAdapter
 
 
-def run_ocr_on_attachment(store: ProfileStore, attachment_id: int) -> dict | None:
+def run_ocr_on_attachment(store: ProfileStorage, attachment_id: int) -> dict | None:
     attachment = store.get_attachment(attachment_id)
     if not attachment:
         raise ValueError("Attachment not found")
@@ -14,7 +14,7 @@ def run_ocr_on_attachment(store: ProfileStore, attachment_id: int) -> dict | Non
     # Add consent check before processing
     profile = store.get_profile(attachment["user_id"])
     if not profile.data.get("preferences", {}).get("consent", {}).get("ocr", False):
-        store.log_evidence(
+        store.log_evidence_deferred(
             attachment["user_id"],
             attachment["turn_id"],
             "ocr_blocked",
@@ -39,8 +39,8 @@ def run_ocr_on_attachment(store: ProfileStore, attachment_id: int) -> dict | Non
         attachment["user_id"], attachment_id, ocr_result.text, parsed_receipt, ocr_result.engine
     )
 
-    # Log an evidence event for the OCR run
-    store.log_evidence(
+    # Log an evidence event for the OCR run (committed in the background if enabled)
+    store.log_evidence_deferred(
         user_id=attachment["user_id"],
         turn_id=attachment["turn_id"],
         kind="ocr_run",
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import json
 import re
 import uuid
 from collections.abc import Callable
@@ -11,9 +10,13 @@ from venv import logger
 
 from app.i18n.microcopy import CopyKey, resolve_language, t
 from app.infra.config import AppSettings
+from app.infra.serialization import canonical_dumps, clone
+from app.knowledge.dense import dense_dir_for
+from app.knowledge.retrieval_cache import CachedRetriever, get_cached_retriever
 from app.knowledge.retriever import InMemoryRetriever
 from app.llm.groq_adapter import GroqAdapter
-from app.memory.store import ProfileStore, _deep_merge
+from app.memory.storage import ProfileStorage, get_profile_store
+from app.memory.store import _deep_merge
 from app.nlu.context import EntityMemory
 from app.nlu.quantities import parse_line_items
 from app.orchestrator.prompts import REASONER_PROMPT, ROUTER_PROMPT
@@ -40,7 +43,7 @@ from .models import (
 
 def _hash_payload(obj: dict) -> str:
     """Creates a deterministic hash for a payload dictionary."""
-    return sha256(json.dumps(obj, sort_keys=True).encode()).hexdigest()
+    return sha256(canonical_dumps(obj).encode()).hexdigest()
 
 
 # --- Agent Nodes ---
@@ -189,7 +192,9 @@ def node_extractor(state: TurnState, policy: SafetyPolicy, nlu_memory: EntityMem
     return state
 
 
-def node_knowledge_agent(state: TurnState, retriever: InMemoryRetriever) -> TurnState:
+def node_knowledge_agent(
+    state: TurnState, retriever: InMemoryRetriever | CachedRetriever
+) -> TurnState:
     state.trace.nodes_run.append("knowledge_agent")
     filing_year = state.filing_year_override or state.profile.data.get("filing", {}).get(
         "filing_year", 2025
@@ -205,7 +210,7 @@ def node_question_generator(state: TurnState, policy: SafetyPolicy) -> TurnState
     if not state.rule_hits:
         return state
 
-    temp_profile_data = json.loads(json.dumps(state.profile.data))
+    temp_profile_data = clone(state.profile.data)
     if state.patch_proposal:
         _deep_merge(state.patch_proposal.patch, temp_profile_data)
 
@@ -257,7 +262,7 @@ def node_question_generator(state: TurnState, policy: SafetyPolicy) -> TurnState
 
 def node_calculators(state: TurnState, policy: SafetyPolicy) -> TurnState:
     state.trace.nodes_run.append("calculators")
-    temp_profile_data = json.loads(json.dumps(state.profile.data))
+    temp_profile_data = clone(state.profile.data)
     if state.patch_proposal:
         _deep_merge(state.patch_proposal.patch, temp_profile_data)
 
@@ -521,7 +526,7 @@ def node_trace_emitter(state: TurnState) -> TurnState:
 
 
 def apply_ui_action(
-    user_id: str, ui_action: UIAction, last_state: TurnState, store: ProfileStore
+    user_id: str, ui_action: UIAction, last_state: TurnState, store: ProfileStorage
 ) -> TurnState:
     """Applies a UI-triggered action, handles database writes, and returns an updated state."""
     policy = load_policy()
@@ -545,12 +550,16 @@ def apply_ui_action(
         )
         state.proposed_actions = []
 
-    elif ui_action.kind == "undo":
+    elif ui_action.kind in ("undo", "redo"):
+        steps = int((ui_action.payload or {}).get("steps", 1))
         try:
-            new_snapshot = store.undo_action(user_id, f"undo:{uuid.uuid4().hex[:8]}")
+            if ui_action.kind == "undo":
+                new_snapshot = store.undo_action(user_id, f"undo:{uuid.uuid4().hex[:8]}", steps)
+            else:
+                new_snapshot = store.redo_action(user_id, f"redo:{uuid.uuid4().hex[:8]}", steps)
             state.profile = new_snapshot
         except ValueError as e:
-            state.errors.append(ErrorItem(code="undo_failed", message=str(e)))
+            state.errors.append(ErrorItem(code=f"{ui_action.kind}_failed", message=str(e)))
 
     elif ui_action.kind == "set_preferences":
         current_prefs = last_state.profile.data.get("preferences", {})
@@ -608,7 +617,7 @@ def apply_ui_action(
 def run_turn(
     user_id: str,
     user_text: str,
-    store: ProfileStore | None = None,
+    store: ProfileStorage | None = None,
     filing_year_override: int | None = None,
 ) -> TurnState:
     """Non-streaming version for tests."""
@@ -623,20 +632,24 @@ def run_turn_streaming(
     user_id: str,
     user_text: str,
     on_token: Callable[[str], None],
-    store: ProfileStore | None = None,
+    store: ProfileStorage | None = None,
     filing_year_override: int | None = None,
 ) -> TurnState:
     """
     Runs the full agent graph, handling questions and streaming the final response.
     """
     cfg = AppSettings()
-    store = store or ProfileStore(sqlite_path=cfg.sqlite_path)
+    store = store or get_profile_store(cfg)
     policy = load_policy()
     groq = GroqAdapter(api_key=cfg.groq_api_key)
-    retriever = InMemoryRetriever()
+    retriever = get_cached_retriever(
+        scorer=cfg.retrieval_scorer,
+        max_entries=cfg.retrieval_cache_size,
+        dense_dir=dense_dir_for(cfg.chroma_path),
+    )
 
     profile = store.get_profile(user_id)
-    nlu_memory = EntityMemory.from_profile(profile.data)
+    nlu_memory = EntityMemory.for_user(store, user_id)
     if filing_year_override:
         profile.data["filing"] = {"filing_year": filing_year_override}
 
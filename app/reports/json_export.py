@@ -1,11 +1,11 @@
 from __future__ import annotations
 
-import json
 from collections.abc import Iterable
 from decimal import Decimal
 from typing import Any
 
-from app.memory.store import ProfileStore
+from app.infra.serialization import dumps_bytes
+from app.memory.storage import ProfileStorage
 from app.orchestrator.models import TurnState
 from app.reports.elster_map import get_field_code
 from app.reports.summary import ReportSummary, build_summary
@@ -45,13 +45,13 @@ def build_elster_payload(
 def export_json_and_log(
     user_id: str,
     state: TurnState,
-    store: ProfileStore,
+    store: ProfileStorage,
     include_categories: Iterable[str] | None = None,
 ) -> tuple[bytes, int]:
     """Generates the JSON file and logs an evidence event."""
     summary = build_summary(state)
     payload = build_elster_payload(summary, include_categories=include_categories)
-    json_bytes = json.dumps(payload, indent=2).encode("utf-8")
+    json_bytes = dumps_bytes(payload, indent=True)
 
     # In a future PR, we would log this action to the evidence table.
     return json_bytes, 0
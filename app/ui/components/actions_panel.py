@@ -3,9 +3,9 @@ from datetime import datetime
 
 import streamlit as st
 
-from app.memory.store import ProfileStore
 from app.orchestrator.graph import apply_ui_action
 from app.orchestrator.models import TurnState, UIAction
+from app.ui.resources import get_store
 
 
 def render_actions_panel(state: TurnState | None) -> None:
@@ -84,7 +84,7 @@ def render_actions_panel(state: TurnState | None) -> None:
                 cols = st.columns(2)
                 if cols[0].button("✅ Confirm", key=f"confirm_{p.action_id}"):
                     action = UIAction(kind="confirm", ref_action=p.action_id)
-                    store = ProfileStore()
+                    store = get_store()
                     new_state = apply_ui_action(
                         state.user_id, action, st.session_state["last_result"], store
                     )
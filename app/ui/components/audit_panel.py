@@ -6,8 +6,8 @@ from datetime import datetime
 import pandas as pd
 import streamlit as st
 
-from app.memory.store import ProfileStore
 from app.orchestrator.models import TurnState
+from app.ui.resources import get_store
 
 # === Mappings for prettification ===
 FIELD_LABELS = {
@@ -27,6 +27,8 @@ ACTION_LABELS = {
     "import_parsed_items": "Imported item(s)",
     "set_preferences": "Settings changed",
     "undo": "Undo",
+    "redo": "Redo",
+    "revert": "Reverted to earlier version",
     # add others...
 }
 EVIDENCE_LABELS = {
@@ -93,7 +95,7 @@ def render_audit_panel(state: TurnState | None) -> None:
         st.info("Start a chat to view the audit trail.")
         return
 
-    store = ProfileStore()
+    store = get_store()
     user_id = state.user_id
 
     st.markdown("### 🔄 Recent State Changes (Profile Actions)")
@@ -3,6 +3,7 @@ from __future__ import annotations
 import streamlit as st
 
 from app.orchestrator.graph import run_turn_streaming
+from app.ui.resources import get_store
 
 
 def render_chat_panel() -> None:
@@ -42,6 +43,7 @@ def render_chat_panel() -> None:
                 user_id="demo",
                 user_text=user_text,
                 on_token=on_token,
+                store=get_store(),
                 filing_year_override=filing_year,
             )
 
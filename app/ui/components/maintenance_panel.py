@@ -2,8 +2,10 @@ from __future__ import annotations
 
 import streamlit as st
 
+from app.infra.config import AppSettings
 from app.maintenance.integrity_scan import run_integrity_scan  # Add import
-from app.memory.store import ProfileStore
+from app.maintenance.retention import run_retention_cleanup
+from app.ui.resources import get_store
 
 
 def render_maintenance_panel(state) -> None:
@@ -11,10 +13,31 @@ def render_maintenance_panel(state) -> None:
     if not state:
         st.info("Start a chat to use maintenance tools.")
         return
-    store = ProfileStore()
+    store = get_store()
 
     st.markdown("**Data Retention**")
-    # ... (retention UI is unchanged) ...
+    modes = ["delete", "archive"]
+    default_mode = AppSettings().retention_mode
+    mode = st.radio(
+        "Aged evidence",
+        options=modes,
+        index=modes.index(default_mode) if default_mode in modes else 0,
+        horizontal=True,
+    )
+    col_preview, col_apply = st.columns(2)
+    if col_preview.button("Preview Cleanup"):
+        st.json(run_retention_cleanup(store, apply=False, mode=mode))
+    if col_apply.button("Apply Cleanup"):
+        st.json(run_retention_cleanup(store, apply=True, mode=mode))
+
+    st.markdown("---")
+    st.markdown("**Storage**")
+    if st.button("Show Compression Stats"):
+        st.json(store.compression_stats())
+    if st.button("Compress Existing Rows"):
+        with st.spinner("Compressing stored text and payloads..."):
+            rewritten = store.recompress_all()
+        st.success(f"Compressed {sum(rewritten.values())} row value(s).")
 
     st.markdown("---")
     st.markdown("**Data Integrity**")
@@ -2,11 +2,11 @@ from datetime import datetime
 
 import streamlit as st
 
-from app.memory.store import ProfileStore
 from app.ocr.runner import run_ocr_on_attachment
 from app.orchestrator.graph import apply_ui_action
 from app.orchestrator.models import TurnState, UIAction
 from app.safety.files import sanitize_filename
+from app.ui.resources import get_store
 
 
 def render_receipts_panel(state: TurnState | None) -> None:
@@ -27,7 +27,7 @@ def render_receipts_panel(state: TurnState | None) -> None:
         st.info("Start a chat to upload and process receipts.")
         return
 
-    store = ProfileStore()
+    store = get_store()
     category = st.selectbox(
         "Assign Category for New Uploads",
         options=["equipment", "donations", "general", "other"],
@@ -71,7 +71,7 @@ def render_receipts_panel(state: TurnState | None) -> None:
                                 category,
                                 state.correlation_id,
                             )
-                            store.log_evidence(
+                            store.log_evidence_deferred(
                                 user_id=state.user_id,
                                 turn_id=state.correlation_id,
                                 kind="receipt_upload",
@@ -6,6 +6,28 @@ from app.i18n.microcopy import CopyKey, t
 from app.knowledge.rules_service import RulesService
 from app.orchestrator.models import TurnState
 
+PAGE_SIZE = 10
+_CATEGORIES = ["commuting", "home_office", "equipment", "donations"]
+
+
+@st.cache_resource
+def _rules_service() -> RulesService:
+    # One service per process, so its search index is built once, not per rerun
+    return RulesService()
+
+
+def _highlighted(text: str, spans: list[tuple[int, int]]) -> str:
+    """Markdown with the matched spans in bold; markdown characters are escaped."""
+
+    def esc(s: str) -> str:
+        return "".join("\\" + c if c in "\\`*_[]()#+-!~|<>" else c for c in s)
+
+    out, last = [], 0
+    for start, end in spans:
+        out.append(esc(text[last:start]) + "**" + esc(text[start:end]) + "**")
+        last = end
+    return "".join(out) + esc(text[last:])
+
 
 def render_rules_panel(state: TurnState | None) -> None:
     """Renders a UI for browsing and searching the knowledge base rules."""
@@ -14,15 +36,46 @@ def render_rules_panel(state: TurnState | None) -> None:
         lang = state.profile.data.get("preferences", {}).get("language", "en")
 
     st.subheader(t(lang, CopyKey.RULES_BROWSER_TITLE))
-    svc = RulesService()
+    svc = _rules_service()
 
     # FIX: Use the correct enum member 'CopyKey.SEARCH_RULES'
     query = st.text_input(t(lang, CopyKey.SEARCH_RULES))
-    year = st.selectbox(t(lang, CopyKey.YEAR_FILTER), options=[None, 2024, 2025], index=0)
+    col_year, col_cat = st.columns(2)
+    year = col_year.selectbox(t(lang, CopyKey.YEAR_FILTER), options=[None, 2024, 2025], index=0)
+    category = col_cat.selectbox(
+        t(lang, CopyKey.CATEGORY_FILTER), options=[None, *_CATEGORIES], index=0
+    )
 
-    rules = svc.search(query=query, year=year)
-    for rule in rules:
-        with st.expander(f"{rule.get('title', 'N/A')} ({rule.get('year')})"):
+    # Back to the first page whenever the search itself changes
+    filters = (query, year, category)
+    if st.session_state.get("rules_filters") != filters:
+        st.session_state["rules_filters"] = filters
+        st.session_state["rules_page"] = 1
+
+    result = svc.search_page(
+        query=query,
+        year=year,
+        category=category,
+        page=st.session_state["rules_page"],
+        page_size=PAGE_SIZE,
+    )
+    st.caption(
+        t(lang, CopyKey.RULES_RESULTS, total=result.total, page=result.page, pages=result.pages)
+        + "  ·  "
+        + ", ".join(f"{k}: {v}" for k, v in result.facets.get("category", {}).items())
+    )
+    for rule in result.items:
+        title = rule.get("title", "N/A")
+        with st.expander(f"{title} ({rule.get('year')})"):
             st.markdown(f"**ID:** `{rule.get('rule_id')}`")
             st.markdown(f"**Category:** `{rule.get('category')}`")
-            st.caption(rule.get("summary"))
+            st.markdown(_highlighted(title, rule["highlights"]["title"]))
+            st.caption(_highlighted(rule.get("summary", ""), rule["highlights"]["summary"]))
+
+    col_prev, col_next = st.columns(2)
+    if col_prev.button(t(lang, CopyKey.PREVIOUS_PAGE), disabled=result.page <= 1):
+        st.session_state["rules_page"] = result.page - 1
+        st.rerun()
+    if col_next.button(t(lang, CopyKey.NEXT_PAGE), disabled=result.page >= result.pages):
+        st.session_state["rules_page"] = result.page + 1
+        st.rerun()
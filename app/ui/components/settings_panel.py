@@ -1,18 +1,22 @@
 from __future__ import annotations
 
-import json
+import tempfile
 
 import streamlit as st
 
 from app.i18n.microcopy import CopyKey, t
-from app.memory.store import ProfileStore
 from app.orchestrator.graph import apply_ui_action
 from app.orchestrator.models import TurnState, UIAction
+from app.safety.files import sanitize_filename
+from app.ui.resources import get_store
+
+# Exports larger than this are spooled to disk instead of memory
+EXPORT_SPOOL_MAX_BYTES = 8 * 1024 * 1024
 
 
 def render_settings_panel(state: TurnState | None) -> None:
     """Renders the panel for managing persistent user preferences, available at startup."""
-    store = ProfileStore()
+    store = get_store()
     # Load the profile directly so the panel works even without a chat session
     # For this prototype, we'll use a fixed user_id "demo"
     user_id = "demo"
@@ -93,9 +97,15 @@ def render_settings_panel(state: TurnState | None) -> None:
             st.rerun()
 
     if st.button("Download my data (GDPR)"):
-        st.download_button(
-            label="Download my profile as JSON",
-            data=json.dumps(profile.data, indent=2),
-            file_name=f"profile_{user_id}.json",
-            mime="application/json",
-        )
+        # Spool the streamed ZIP to an anonymous temp file (in memory only while
+        # small); it is deleted as soon as the button has taken it
+        with tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_BYTES) as f:
+            for chunk in store.export_user_data(user_id):
+                f.write(chunk)
+            f.seek(0)
+            st.download_button(
+                label="Download my data as ZIP",
+                data=f,
+                file_name=sanitize_filename(f"data_export_{user_id}.zip"),
+                mime="application/zip",
+            )
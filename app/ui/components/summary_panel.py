@@ -4,11 +4,11 @@ from datetime import datetime
 
 import streamlit as st
 
-from app.memory.store import ProfileStore
 from app.orchestrator.models import TurnState
 from app.reports.json_export import export_json_and_log
 from app.reports.pdf import export_pdf_and_log
 from app.reports.summary import build_summary
+from app.ui.resources import get_store
 
 
 def render_summary_panel(state: TurnState | None) -> None:
@@ -29,7 +29,7 @@ def render_summary_panel(state: TurnState | None) -> None:
         return
 
     summary = build_summary(state)
-    store = ProfileStore()
+    store = get_store()
 
     st.markdown("### Export Options")
     all_categories = sorted([e.category for e in summary.itemization])
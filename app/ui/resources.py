@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+import streamlit as st
+
+from app.memory.storage import ProfileStorage, get_profile_store
+
+
+@st.cache_resource
+def get_store() -> ProfileStorage:
+    """The process-wide store, shared by all panels and chat turns."""
+    return get_profile_store()
@@ -3,8 +3,8 @@ from __future__ import annotations
 import streamlit as st
 
 # --- Core App Modules ---
+from app.infra.config import AppSettings
 from app.knowledge.ingest import build_index
-from app.memory.store import ProfileStore
 
 # --- UI Component Render Functions ---
 from app.ui.components.actions_panel import render_actions_panel
@@ -132,12 +132,7 @@ def _setup_sidebar():
 # --- Core App Logic (remains the same) ---
 @st.cache_resource
 def startup() -> None:
-    build_index()
-
-
-@st.cache_resource
-def get_store() -> ProfileStore:
-    return ProfileStore(sqlite_path=".data/profile.db")
+    build_index(chroma_path=AppSettings().chroma_path)
 
 
 def main() -> None:
@@ -0,0 +1,138 @@
+"""
+Worst-case inputs and fuzzing for parse_line_items, against the previous regex parser.
+
+    python -m benchmarks.bench_line_items [--max-chars 1000000] [--baseline-max 16000]
+        [--fuzz 2000] [--seed 3]
+
+For every adversarial input family the text is doubled in size until --max-chars and
+both parsers are timed; the regex parser only up to --baseline-max, as it is
+quadratic on these inputs. A linear parser keeps the per-character cost flat. The
+fuzz run parses random token soups and reports the slowest input per character.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import time
+from collections.abc import Callable
+
+from app.nlu.quantities import parse_line_items
+from tools.money import D
+
+# The pre-tokenizer parser, kept here as the baseline
+_QTY_PATTERN = re.compile(
+    r"(?P<qty>\d+)\s*x\s*(?P<desc>[\w\s.-]+?)\s+" r"(?P<price>\d[\d.,]*)\s*(?:€|eur)",
+    re.IGNORECASE,
+)
+_SINGLE_PATTERN = re.compile(
+    r"\b(?P<desc>[a-zA-Z\s]{3,})\s+(?:for|at|à)\s+(?P<price>\d[\d.,]*)\s*(?:€|eur)",
+    re.IGNORECASE,
+)
+
+
+def regex_parse_line_items(text: str) -> list[dict]:
+    matches = sorted(
+        (m for pat in (_QTY_PATTERN, _SINGLE_PATTERN) for m in pat.finditer(text)),
+        key=lambda m: m.start(),
+    )
+    items: list[dict] = []
+    last_match_end = -1
+    for match in matches:
+        if match.start() < last_match_end:
+            continue
+        quantity = int(match.groupdict().get("qty") or 1)
+        description = match.group("desc").strip()
+        if description.lower() in ("and a", "a", "bought"):
+            continue
+        unit_price = D(match.group("price").replace(",", "."))
+        items.append(
+            {
+                "description": description,
+                "quantity": quantity,
+                "unit_price_eur": str(unit_price),
+                "total_eur": str(quantity * unit_price),
+            }
+        )
+        last_match_end = match.end()
+    return items
+
+
+# Sentences both parsers must read the same way
+SAMPLES = [
+    "I bought 2x Monitor 220,50€ and a Keyboard for 75.00 EUR",
+    "3 x USB-C cable 9.99 eur",
+    "1x Desk 27 inch 199€, 2x Chair 89,90 €",
+    "Desk at home for 300€",
+    "a new office chair at 249 EUR and 2x monitor arm 35€",
+    "Habe 2024 einen Laptop gekauft.",
+    "4x ergo_mouse v2 19.5€",
+    "Headset for 59€ plus 2X Webcam 45 euro",
+    "nothing to see here",
+]
+
+# name -> unit repeated to build the input; each defeats one pattern of the regex parser
+ADVERSARIAL: dict[str, str] = {
+    "quantity_without_price": "1x a ",
+    "keyword_without_price": "ab for ",
+    "whitespace_runs": "a" + " " * 15,
+    "words_only": "word ",
+    "invoice_paste": "2x Item-4711 12,50 €\n",
+}
+
+_FUZZ_TOKENS = ["1", "2x", "x", " ", "  ", "\n", "for", "at", "à", "€", "eur", "12,50", "a", "-"]
+
+
+def _timed_ms(fn: Callable[[str], object], text: str) -> float:
+    start = time.perf_counter()
+    fn(text)
+    return (time.perf_counter() - start) * 1000
+
+
+def scaling(max_chars: int, baseline_max: int) -> None:
+    for name, unit in ADVERSARIAL.items():
+        size = 1000
+        while size <= max_chars:
+            text = (unit * (size // len(unit) + 1))[:size]
+            new_ms = _timed_ms(parse_line_items, text)
+            line = f"{name:<24} {size:>9} chars  tokenizer {new_ms:9.2f} ms"
+            line += f" ({new_ms * 1000 / size:6.3f} µs/char)"
+            if size <= baseline_max:
+                line += f"  regex {_timed_ms(regex_parse_line_items, text):9.2f} ms"
+            print(line)
+            size *= 2
+
+
+def fuzz(iterations: int, seed: int) -> None:
+    rng = random.Random(seed)
+    worst = (0.0, "")
+    mismatches = 0
+    for _ in range(iterations):
+        text = "".join(rng.choices(_FUZZ_TOKENS, k=rng.randint(1, 400)))
+        us_per_char = _timed_ms(parse_line_items, text) * 1000 / len(text)
+        worst = max(worst, (us_per_char, text))
+        try:
+            mismatches += parse_line_items(text) != regex_parse_line_items(text)
+        except ArithmeticError:  # the regex parser crashes on prices like "1.2.3"
+            mismatches += 1
+    print(f"fuzz: {iterations} inputs, slowest {worst[0]:.3f} µs/char ({len(worst[1])} chars)")
+    print(f"fuzz: {mismatches} inputs parsed differently from the regex parser")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--max-chars", type=int, default=1_000_000)
+    parser.add_argument("--baseline-max", type=int, default=16_000)
+    parser.add_argument("--fuzz", type=int, default=2000, help="Random inputs to parse")
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+    for sample in SAMPLES:
+        if parse_line_items(sample) != regex_parse_line_items(sample):
+            print(f"differs from the regex parser: {sample!r}")
+    scaling(args.max_chars, args.baseline_max)
+    fuzz(args.fuzz, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Retrieval quality and latency per retriever configuration, with regression thresholds.
+
+    python -m benchmarks.bench_retrieval_quality [--rules 2000] [--queries 300]
+        [--repeat 20] [--thresholds benchmarks/retrieval_thresholds.json] [--json PATH]
+
+Replays every golden turn that expects rule ids (tests/golden) against the real
+rulebook, plus a synthetic query set against a synthetic rulebook, through
+node_knowledge_agent exactly as a turn does. Reports recall@k, MRR and latency
+percentiles for each scorer, saves them as JSON and exits with status 1 when any
+metric is worse than its threshold in the thresholds file.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from app.infra.serialization import dumps_bytes, loads
+from app.knowledge.dense import dense_dir_for
+from app.knowledge.index_holder import IndexHolder
+from app.knowledge.ingest import binary_index_path, ingest_rules
+from app.knowledge.loader import atomic_write_bytes
+from app.knowledge.retriever import SCORERS, InMemoryRetriever
+from app.memory.store import ProfileSnapshot
+from app.orchestrator.graph import node_knowledge_agent
+from app.orchestrator.models import TurnState
+from benchmarks.golden import load_scenarios
+from benchmarks.rulegen import CATEGORY_KEYWORDS, synthetic_rules, write_rulebook
+
+THRESHOLDS_PATH = Path(__file__).with_name("retrieval_thresholds.json")
+
+
+@dataclass(frozen=True)
+class Case:
+    query: str
+    year: int
+    relevant: frozenset[str]
+
+
+def golden_cases(golden_dir: str | Path = "tests/golden") -> list[Case]:
+    """The golden turns that name the rule ids they expect."""
+    return [
+        Case(turn["user"], turn["filing_year"], frozenset(turn["expect"]["rule_ids_any"]))
+        for scenario in load_scenarios(golden_dir)
+        for turn in scenario["turns"]
+        if turn.get("expect", {}).get("rule_ids_any")
+    ]
+
+
+def synthetic_cases(rules: list[dict[str, Any]], n: int, seed: int = 11) -> list[Case]:
+    """
+    Queries of a category keyword plus a topic tag. The relevant rules are those of
+    the same year and category that carry the tag.
+    """
+    rng = random.Random(seed)
+    by_key: dict[tuple[int, str, str], set[str]] = {}
+    for rule in rules:
+        key = (rule["year"], rule["category"], rule["summary"].split()[-1])
+        by_key.setdefault(key, set()).add(rule["rule_id"])
+    cases = []
+    for rule in rng.sample(rules, min(n, len(rules))):
+        year, category, topic = rule["year"], rule["category"], rule["summary"].split()[-1]
+        keyword = rng.choice(CATEGORY_KEYWORDS[category])
+        cases.append(Case(f"{keyword} {topic}", year, frozenset(by_key[year, category, topic])))
+    return cases
+
+
+def _percentiles(samples: list[float]) -> dict[str, float]:
+    samples = sorted(samples)
+
+    def at(q: float) -> float:
+        return round(samples[min(len(samples) - 1, int(len(samples) * q))], 4)
+
+    return {"p50_ms": round(statistics.median(samples), 4), "p95_ms": at(0.95), "p99_ms": at(0.99)}
+
+
+def evaluate(retriever: InMemoryRetriever, cases: list[Case], repeat: int = 1) -> dict[str, float]:
+    """
+    Runs every case through node_knowledge_agent `repeat` times. recall_at_k is the
+    share of cases with a relevant rule among the hits, mrr the mean reciprocal
+    rank of the first relevant hit (0 when there is none).
+    """
+    for year in {c.year for c in cases}:
+        retriever.search("warm-up", year=year)  # first-use work (per-year BM25) is not a query
+    samples: list[float] = []
+    found = reciprocal = 0.0
+    k = 0
+    for case in cases:
+        for _ in range(repeat):
+            state = TurnState(
+                correlation_id="bench",
+                user_id="bench",
+                user_input=case.query,
+                profile=ProfileSnapshot(data={"filing": {"filing_year": case.year}}),
+                retrieval_query=case.query.lower(),  # what the offline router passes on
+            )
+            start = time.perf_counter()
+            state = node_knowledge_agent(state, retriever)
+            samples.append((time.perf_counter() - start) * 1000)
+        ids = [h.rule_id for h in state.rule_hits]
+        k = max(k, len(ids))
+        rank = next((i for i, rid in enumerate(ids, 1) if rid in case.relevant), None)
+        found += rank is not None
+        reciprocal += 1 / rank if rank else 0.0
+    return {
+        "queries": len(cases),
+        "k": k,
+        "recall_at_k": round(found / len(cases), 4),
+        "mrr": round(reciprocal / len(cases), 4),
+        **_percentiles(samples),
+    }
+
+
+def check(results: dict[str, Any], thresholds: dict[str, Any]) -> list[str]:
+    """
+    Threshold violations, as messages. Thresholds mirror the results layout
+    (corpus -> scorer -> metric); metrics ending in "_ms" are maxima, all others
+    minima. Metrics or configurations missing from the results are violations too.
+    """
+    failures = []
+    for corpus, scorers in thresholds.items():
+        for scorer, limits in scorers.items():
+            measured = results.get(corpus, {}).get(scorer)
+            if measured is None:
+                failures.append(f"{corpus}/{scorer}: not measured")
+                continue
+            for metric, limit in limits.items():
+                value = measured.get(metric)
+                if value is None:
+                    failures.append(f"{corpus}/{scorer}: {metric} not measured")
+                elif metric.endswith("_ms") and value > limit:
+                    failures.append(f"{corpus}/{scorer}: {metric} {value} > {limit}")
+                elif not metric.endswith("_ms") and value < limit:
+                    failures.append(f"{corpus}/{scorer}: {metric} {value} < {limit}")
+    return failures
+
+
+def _corpus(
+    rules_dir: Path, work: Path, cases: list[Case], repeat: int, scorers: Iterable[str]
+) -> dict[str, dict[str, float]]:
+    json_path = work / "rules_index.json"
+    ingest_rules(rules_dir, json_path, chroma_path=work / "chroma")
+    bin_path = binary_index_path(json_path)
+    holder = IndexHolder(bin_path)
+    return {
+        scorer: evaluate(
+            InMemoryRetriever(
+                bin_path, scorer=scorer, holder=holder, dense_dir=dense_dir_for(work / "chroma")
+            ),
+            cases,
+            repeat,
+        )
+        for scorer in scorers
+    }
+
+
+def run(
+    n_rules: int = 2000,
+    n_queries: int = 300,
+    repeat: int = 20,
+    rules_dir: str | Path = "knowledge/rules/de",
+    scorers: Iterable[str] = SCORERS,
+) -> dict[str, Any]:
+    """Metrics per corpus ("golden", "synthetic") and scorer."""
+    scorers = list(scorers)
+    with tempfile.TemporaryDirectory() as tmp:
+        golden, synthetic = Path(tmp) / "golden", Path(tmp) / "synthetic"
+        golden.mkdir()
+        write_rulebook(synthetic / "rules", n_rules)
+        return {
+            # Few golden turns: each is repeated so the percentiles mean something
+            "golden": _corpus(Path(rules_dir), golden, golden_cases(), repeat, scorers),
+            "synthetic": _corpus(
+                synthetic / "rules",
+                synthetic,
+                synthetic_cases(synthetic_rules(n_rules), n_queries),
+                1,
+                scorers,
+            ),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rules", type=int, default=2000, help="Synthetic rulebook size")
+    parser.add_argument("--queries", type=int, default=300, help="Synthetic queries")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per golden turn")
+    parser.add_argument("--thresholds", default=str(THRESHOLDS_PATH))
+    parser.add_argument(
+        "--json",
+        default=f".data/benchmarks/retrieval-{datetime.now(UTC):%Y%m%dT%H%M%SZ}.json",
+        help="Where to save the results",
+    )
+    args = parser.parse_args()
+
+    results = run(args.rules, args.queries, args.repeat)
+    for corpus, scorers in results.items():
+        for scorer, m in scorers.items():
+            print(
+                f"{corpus:<10} {scorer:<8} recall@{m['k']} {m['recall_at_k']:.3f}  "
+                f"MRR {m['mrr']:.3f}  p50/p95/p99 "
+                f"{m['p50_ms']:.3f}/{m['p95_ms']:.3f}/{m['p99_ms']:.3f} ms"
+            )
+    report = {
+        "benchmark": "retrieval_quality",
+        "created_at": datetime.now(UTC).isoformat(timespec="seconds"),
+        "synthetic_rules": args.rules,
+        "results": results,
+    }
+    atomic_write_bytes(args.json, dumps_bytes(report, indent=True))
+    print(f"Saved {args.json}")
+
+    failures = check(results, loads(Path(args.thresholds).read_bytes()))
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
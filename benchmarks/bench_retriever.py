@@ -0,0 +1,114 @@
+"""
+Load time and search latency of InMemoryRetriever on a synthetic rulebook, for
+both scorers, both index formats and batched search_many, compared with the
+previous linear scan (every rule scored, full sort).
+
+    python -m benchmarks.bench_retriever [--rules 10000] [--queries 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from rapidfuzz import fuzz
+
+from app.knowledge.binary_index import write_binary_index
+from app.knowledge.index_holder import IndexHolder
+from app.knowledge.retriever import InMemoryRetriever
+from app.knowledge.synonym_matcher import DEFAULT_MATCHER
+from benchmarks.rulegen import synthetic_rules
+
+QUERIES = [
+    "laptop for work",
+    "Pendlerpauschale 30 km",
+    "home office days",
+    "donation to charity",
+    "Arbeitsmittel Monitor",
+    "spenden verein quittung",
+]
+
+
+def linear_search(rules: list[dict[str, Any]], query: str, year: int, k: int) -> list[str]:
+    """The pre-index algorithm, kept here as the baseline."""
+    q_tokens = DEFAULT_MATCHER.expand(query)
+    candidates = []
+    for rule in rules:
+        if rule["year"] != year:
+            continue
+        overlap = len(q_tokens.intersection(rule["search_terms"]))
+        boost = fuzz.partial_ratio(query.lower(), " ".join(rule["search_terms"])) / 100.0
+        score = overlap + boost * 0.5
+        if score >= 1.0:
+            candidates.append((score, rule))
+    candidates.sort(key=lambda x: x[0], reverse=True)
+    return [rule["rule_id"] for _, rule in candidates[:k]]
+
+
+def _time_per_query(fn: Any, queries: list[str]) -> float:
+    start = time.perf_counter()
+    for q in queries:
+        fn(q)
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+
+def _time_batch_per_query(fn: Any, queries: list[str]) -> float:
+    """Times one call of `fn` with the whole batch, per query."""
+    start = time.perf_counter()
+    fn(queries)
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+
+def _time_load(path: Path, scorer: str = "overlap") -> tuple[InMemoryRetriever, float]:
+    start = time.perf_counter()
+    # A private holder, so every call really loads the file
+    retriever = InMemoryRetriever(path, scorer=scorer, holder=IndexHolder(path))
+    return retriever, (time.perf_counter() - start) * 1000
+
+
+def run(n_rules: int, n_queries: int) -> dict[str, float]:
+    rules = synthetic_rules(n_rules)
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / "rules_index.json"
+        bin_path = Path(tmp) / "rules_index.bin"
+        json_path.write_text(json.dumps(rules), encoding="utf-8")
+        write_binary_index(rules, bin_path)
+        _, json_load_ms = _time_load(json_path)
+        retriever, load_ms = _time_load(bin_path)
+        bm25, bm25_load_ms = _time_load(bin_path, scorer="bm25")
+        queries = [QUERIES[i % len(QUERIES)] for i in range(n_queries)]
+        for rule in rules:
+            rule["search_terms"] = DEFAULT_MATCHER.expand(f'{rule["title"]} {rule["summary"]}')
+        return {
+            "json_load_ms": json_load_ms,
+            "binary_load_ms": load_ms,
+            "bm25_load_ms": bm25_load_ms,
+            "indexed_ms_per_query": _time_per_query(
+                lambda q: retriever.search(q, year=2024, k=5), queries
+            ),
+            "batch_ms_per_query": _time_batch_per_query(
+                lambda qs: retriever.search_many(qs, year=2024, k=5), queries
+            ),
+            # The first query of a year also builds that year's BM25 matrix
+            "bm25_ms_per_query": _time_per_query(lambda q: bm25.search(q, year=2024, k=5), queries),
+            "linear_ms_per_query": _time_per_query(
+                lambda q: linear_search(rules, q, year=2024, k=5), queries
+            ),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rules", type=int, default=10_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    for name, value in run(args.rules, args.queries).items():
+        print(f"{name:<24} {value:10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Rulebook scaling benchmark: ingest, index size, load, query latency and memory per scale.
+
+    python -m benchmarks.bench_scaling [--scales 1000 10000 100000] [--queries 200]
+        [--jobs 0] [--json .data/benchmarks/scaling.json]
+
+Each scale gets a fresh synthetic rulebook (benchmarks.rulegen). Results are printed
+and saved as JSON, so runs on different machines or commits can be compared.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, TypeVar
+
+from app.infra.serialization import dumps_bytes
+from app.knowledge.dense import dense_dir_for
+from app.knowledge.index_holder import IndexHolder
+from app.knowledge.ingest import binary_index_path, ingest_rules
+from app.knowledge.loader import atomic_write_bytes
+from app.knowledge.retriever import InMemoryRetriever
+from app.knowledge.rules_service import RulesService
+from benchmarks.bench_retriever import QUERIES
+from benchmarks.rulegen import write_rulebook
+
+T = TypeVar("T")
+
+
+def _timed(fn: Callable[[], T]) -> tuple[T, float]:
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def _peak_mib(fn: Callable[[], Any]) -> float:
+    """
+    Peak Python heap (numpy included) during a call, in MiB. Memory-mapped pages are
+    not counted. Tracing slows the call down, so this is a separate run from the timed one.
+    """
+    tracemalloc.start()
+    try:
+        fn()
+        return round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+    finally:
+        tracemalloc.stop()
+
+
+def _latency(fn: Callable[[str], Any], n_queries: int) -> dict[str, float]:
+    fn(QUERIES[0])  # warm-up: first-use work (e.g. per-year BM25 build) is not a query
+    samples = []
+    for i in range(n_queries):
+        start = time.perf_counter()
+        fn(QUERIES[i % len(QUERIES)])
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "p50_ms": round(statistics.median(samples), 4),
+        "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))], 4),
+    }
+
+
+def _max_rss_mib() -> float | None:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+def run_scale(n_rules: int, n_queries: int, jobs: int) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        rules_dir = Path(tmp) / "rules"
+        files = write_rulebook(rules_dir, n_rules)
+        json_path = Path(tmp) / "rules_index.json"
+        bin_path = binary_index_path(json_path)
+
+        chroma = Path(tmp) / "chroma"
+        _, ingest_ms = _timed(lambda: ingest_rules(rules_dir, json_path, jobs=jobs))
+        _, dense_ms = _timed(lambda: ingest_rules(rules_dir, json_path, chroma_path=chroma))
+        _, noop_ingest_ms = _timed(lambda: ingest_rules(rules_dir, json_path, jobs=jobs))
+        _, json_load_ms = _timed(lambda: IndexHolder(json_path))
+        holder, bin_load_ms = _timed(lambda: IndexHolder(bin_path))
+
+        overlap = InMemoryRetriever(bin_path, holder=holder)
+        bm25 = InMemoryRetriever(bin_path, scorer="bm25", holder=holder)
+        hybrid = InMemoryRetriever(
+            bin_path, scorer="hybrid", holder=holder, dense_dir=dense_dir_for(chroma)
+        )
+        svc = RulesService(str(bin_path))
+        return {
+            "rules": n_rules,
+            "files": len(files),
+            "ingest_ms": round(ingest_ms, 1),
+            "dense_build_ms": round(dense_ms, 1),
+            "noop_ingest_ms": round(noop_ingest_ms, 1),
+            "json_index_bytes": json_path.stat().st_size,
+            "binary_index_bytes": bin_path.stat().st_size,
+            "dense_vectors_bytes": (dense_dir_for(chroma) / "vectors.npy").stat().st_size,
+            "json_load_ms": round(json_load_ms, 2),
+            "json_load_peak_mib": _peak_mib(lambda: IndexHolder(json_path)),
+            "binary_load_ms": round(bin_load_ms, 2),
+            "binary_load_peak_mib": _peak_mib(lambda: IndexHolder(bin_path)),
+            "overlap": _latency(lambda q: overlap.search(q, year=2024, k=5), n_queries),
+            "bm25": _latency(lambda q: bm25.search(q, year=2024, k=5), n_queries),
+            "hybrid": _latency(lambda q: hybrid.search(q, year=2024, k=5), n_queries),
+            "rules_service": _latency(lambda q: svc.search(q.split()[0], year=2024), n_queries),
+            "max_rss_mib": _max_rss_mib(),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--jobs", type=int, default=0, help="Ingest workers (0: one per CPU)")
+    parser.add_argument(
+        "--json",
+        default=f".data/benchmarks/scaling-{datetime.now(UTC):%Y%m%dT%H%M%SZ}.json",
+        help="Where to save the results",
+    )
+    args = parser.parse_args()
+
+    results = []
+    for n in args.scales:
+        result = run_scale(n, args.queries, args.jobs)
+        results.append(result)
+        overlap, bm25 = result["overlap"], result["bm25"]
+        print(
+            f"{n:>8} rules  ingest {result['ingest_ms']:>9.1f} ms  "
+            f"bin {result['binary_index_bytes'] / 2**20:>7.2f} MiB  "
+            f"load {result['binary_load_ms']:>7.2f} ms  "
+            f"p50/p99 overlap {overlap['p50_ms']:.3f}/{overlap['p99_ms']:.3f} ms  "
+            f"bm25 {bm25['p50_ms']:.3f}/{bm25['p99_ms']:.3f} ms"
+        )
+
+    report = {
+        "benchmark": "scaling",
+        "created_at": datetime.now(UTC).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "jobs": args.jobs,
+        "queries": args.queries,
+        "results": results,
+    }
+    atomic_write_bytes(args.json, dumps_bytes(report, indent=True))
+    print(f"Saved {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Compares app.infra.serialization against plain stdlib json on payloads shaped like
+the ones written per turn (profiles, diffs, evidence payloads).
+
+    python -m benchmarks.bench_serialization [--number 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import timeit
+from decimal import Decimal
+from typing import Any
+
+from app.infra import serialization
+
+
+def _sample_profile() -> dict[str, Any]:
+    return {
+        "filing": {"filing_year": 2024, "tax_class": 1},
+        "preferences": {"language": "de", "distance_unit": "km", "consent": {"ocr": True}},
+        "deductions": {
+            "home_office_days": 120,
+            "commute": {"distance_km": 23.5, "days": 180},
+            "equipment_items": [
+                {"name": f"Item {i}", "amount_eur": Decimal(f"{100 + i}.99"), "year": 2024}
+                for i in range(40)
+            ],
+        },
+    }
+
+
+def _stdlib_dumps(obj: Any) -> str:
+    return json.dumps(obj, default=str)
+
+
+def run(number: int) -> dict[str, float]:
+    profile = _sample_profile()
+    encoded = serialization.dumps(profile)
+    cases = {
+        "dumps/stdlib": lambda: _stdlib_dumps(profile),
+        "dumps/serialization": lambda: serialization.dumps(profile),
+        "loads/stdlib": lambda: json.loads(encoded),
+        "loads/serialization": lambda: serialization.loads(encoded),
+        "clone/stdlib": lambda: json.loads(_stdlib_dumps(profile)),
+        "clone/serialization": lambda: serialization.clone(profile),
+        "canonical_dumps": lambda: serialization.canonical_dumps(profile),
+    }
+    return {name: timeit.timeit(fn, number=number) / number * 1e6 for name, fn in cases.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+    backend = "orjson" if serialization.orjson is not None else "stdlib"
+    print(f"backend: {backend}")
+    for name, usec in run(args.number).items():
+        print(f"{name:<24} {usec:9.2f} µs/op")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Synonym expansion cost: the compiled SynonymMatcher vs. the previous per-entry
+substring loop, on the shipped table and on tables scaled up with synthetic groups.
+
+    python -m benchmarks.bench_synonyms [--scales 1 10 100] [--number 500]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import string
+import time
+from collections.abc import Callable
+from functools import partial
+
+from app.knowledge.synonym_matcher import SynonymMatcher
+from app.knowledge.synonyms import SYNONYMS
+
+TEXTS = [
+    "Habe 2024 einen Laptop und einen Monitor für das Arbeitszimmer gekauft.",
+    "I commute 30 km to work and worked from home 100 days in 2025.",
+    "Spende an einen gemeinnützigen Verein, Quittung liegt vor.",
+]
+
+
+def scaled_table(scale: int, seed: int = 3) -> dict[str, list[str]]:
+    """The shipped table plus (scale - 1) times as many synthetic groups."""
+    rng = random.Random(seed)
+    table = {k: list(v) for k, v in SYNONYMS.items()}
+    n_phrases = sum(len(v) for v in SYNONYMS.values())
+    for g in range(len(SYNONYMS) * (scale - 1)):
+        table[f"group_{g}"] = [
+            "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 12)))
+            for _ in range(n_phrases // len(SYNONYMS))
+        ]
+    return table
+
+
+def loop_expand(table: dict[str, list[str]], text: str) -> set[str]:
+    """The previous _expand_terms, kept as the baseline."""
+    lowered = text.lower()
+    tokens = set(lowered.split())
+    expanded = set(tokens)
+    for key, syns in table.items():
+        if key in tokens or any(s in lowered for s in syns):
+            expanded.update(syns)
+    return expanded
+
+
+def _usec_per_call(fn: Callable[[str], object], number: int) -> float:
+    start = time.perf_counter()
+    for i in range(number):
+        fn(TEXTS[i % len(TEXTS)])
+    return (time.perf_counter() - start) / number * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--number", type=int, default=500)
+    args = parser.parse_args()
+    print(f"{'phrases':>8} {'compile ms':>11} {'matcher µs':>11} {'loop µs':>10}")
+    for scale in args.scales:
+        table = scaled_table(scale)
+        start = time.perf_counter()
+        matcher = SynonymMatcher(table)
+        compile_ms = (time.perf_counter() - start) * 1000
+        matcher_us = _usec_per_call(matcher.expand, args.number)
+        loop_us = _usec_per_call(partial(loop_expand, table), args.number)
+        n_phrases = sum(len(v) for v in table.values())
+        print(f"{n_phrases:>8} {compile_ms:>11.1f} {matcher_us:>11.1f} {loop_us:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
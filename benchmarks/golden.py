@@ -0,0 +1,16 @@
+"""Golden scenario loading shared by the benchmarks and the test suite."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import yaml
+
+
+def load_scenarios(dir_path: str | Path) -> list[dict]:
+    """Loads all YAML scenario files from a directory."""
+    scenarios = []
+    for p in sorted(Path(dir_path).glob("*.yml")):
+        with open(p, encoding="utf-8") as f:
+            scenarios.append(yaml.safe_load(f))
+    return scenarios
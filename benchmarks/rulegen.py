@@ -0,0 +1,90 @@
+"""
+Synthetic rulebook generator: valid Rule YAML at any scale, across years and categories.
+
+    python -m benchmarks.rulegen --rules 10000 --out /tmp/rulebook [--per-file 100]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+CATEGORY_KEYWORDS: dict[str, list[str]] = {
+    "commuting": ["Pendlerpauschale", "commute", "Fahrtkosten", "distance"],
+    "home_office": ["Homeoffice", "home office", "remote", "Arbeitszimmer"],
+    "equipment": ["Arbeitsmittel", "laptop", "monitor", "Werkzeug"],
+    "donations": ["Spenden", "charity", "donation", "Verein"],
+}
+_BINDINGS = {
+    "commuting": "calc_commute",
+    "home_office": "calc_home_office",
+    "equipment": "calc_equipment_item",
+    "donations": "calc_donations",
+}
+_FILLER = "tax deduction employee receipt year limit proof allowance income costs".split()
+YEARS = (2024, 2025)
+
+
+def synthetic_rules(n: int, seed: int = 7) -> list[dict[str, Any]]:
+    """`n` rules that pass Rule validation, spread randomly over YEARS and categories."""
+    rng = random.Random(seed)
+    rules = []
+    for i in range(n):
+        category = rng.choice(list(CATEGORY_KEYWORDS))
+        binding, words = _BINDINGS[category], CATEGORY_KEYWORDS[category]
+        year = rng.choice(YEARS)
+        title = f"{rng.choice(words)} rule {i}"
+        summary = " ".join(rng.sample(_FILLER, 5) + [rng.choice(words), f"topic{i % 500}"])
+        rules.append(
+            {
+                "rule_id": f"de_{year}_synthetic_{i}",
+                "year": year,
+                "country": "DE",
+                "title": title,
+                "category": category,
+                "summary": summary,
+                "snippet": summary,
+                "required_data_points": [],
+                "calculator_binding": binding,
+            }
+        )
+    return rules
+
+
+def write_rulebook(root: str | Path, n: int, per_file: int = 100, seed: int = 7) -> list[Path]:
+    """
+    Writes `n` synthetic rules under root/{year}/{category}_{k}.yml, as list-of-rules
+    files of up to `per_file` rules each. Returns the files written.
+    """
+    root = Path(root)
+    grouped: dict[tuple[int, str], list[dict[str, Any]]] = {}
+    for rule in synthetic_rules(n, seed=seed):
+        grouped.setdefault((rule["year"], rule["category"]), []).append(rule)
+    written = []
+    for (year, category), rules in sorted(grouped.items()):
+        (root / str(year)).mkdir(parents=True, exist_ok=True)
+        for k in range(0, len(rules), per_file):
+            path = root / str(year) / f"{category}_{k // per_file:05d}.yml"
+            text = yaml.safe_dump(rules[k : k + per_file], allow_unicode=True, sort_keys=False)
+            path.write_text(text, encoding="utf-8")
+            written.append(path)
+    return written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rules", type=int, default=1000)
+    parser.add_argument("--out", required=True, help="Directory to write the rulebook to")
+    parser.add_argument("--per-file", type=int, default=100, help="Rules per YAML file")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    files = write_rulebook(args.out, args.rules, per_file=args.per_file, seed=args.seed)
+    print(f"Wrote {args.rules} rules in {len(files)} files under {args.out}")
+
+
+if __name__ == "__main__":
+    main()
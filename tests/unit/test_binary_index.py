@@ -0,0 +1,47 @@
+from pathlib import Path
+
+import pytest
+
+from app.infra.serialization import loads
+from app.knowledge.binary_index import MAGIC, BinaryRulesIndex
+from app.knowledge.ingest import binary_index_path, build_index
+from app.knowledge.retriever import InMemoryRetriever
+
+QUERIES = ["commute 30 km", "Arbeitsmittel Laptop", "donations to charity", "home office days"]
+
+
+def _build(tmp_path: Path) -> tuple[Path, Path]:
+    out = tmp_path / "rules_index.json"
+    build_index("knowledge/rules/de", str(out))
+    return out, binary_index_path(out)
+
+
+@pytest.mark.parametrize("scorer", ["overlap", "bm25"])
+def test_binary_index_matches_json_index(tmp_path: Path, scorer: str):
+    json_path, bin_path = _build(tmp_path)
+    assert bin_path.read_bytes().startswith(MAGIC)
+    from_json = InMemoryRetriever(json_path, scorer=scorer)
+    from_bin = InMemoryRetriever(bin_path, scorer=scorer)
+    for year in (2024, 2025):
+        for query in QUERIES:
+            assert from_bin.search(query, year, k=5) == from_json.search(query, year, k=5)
+
+
+def test_rule_bodies_are_decoded_only_for_hits(tmp_path: Path):
+    json_path, bin_path = _build(tmp_path)
+    retriever = InMemoryRetriever(bin_path)
+    assert retriever.index.n_rules == len(loads(json_path.read_bytes()))
+    assert retriever.index._bodies == {}
+    hits = retriever.search("Arbeitsmittel Laptop", year=2024, k=1)
+    assert len(retriever.index._bodies) == 1
+    assert retriever.index.rule(next(iter(retriever.index._bodies))).rule_id == hits[0].rule_id
+
+
+def test_rejects_foreign_or_newer_files(tmp_path: Path):
+    _, bin_path = _build(tmp_path)
+    data = bytearray(bin_path.read_bytes())
+    data[4:6] = (99).to_bytes(2, "little")
+    with pytest.raises(ValueError, match="version 99"):
+        BinaryRulesIndex(bytes(data))
+    with pytest.raises(ValueError, match="Not a binary"):
+        BinaryRulesIndex(b"{}" + bytes(64))
@@ -0,0 +1,26 @@
+from pathlib import Path
+
+import numpy as np
+
+from app.knowledge.bm25 import BM25Index
+from app.knowledge.ingest import build_index
+from app.knowledge.retriever import InMemoryRetriever
+from tests.util.golden import golden_recall
+
+
+def test_bm25_prefers_rarer_and_repeated_terms():
+    index = BM25Index([["laptop", "laptop", "work"], ["laptop", "commute"], ["commute", "km"]])
+    scores = index.scores(["laptop"])
+    assert scores[0] > scores[1] > 0 and scores[2] == 0
+    assert [d for d, _ in index.top_k(["km", "laptop"], k=2)] == [2, 0]
+    assert index.top_k(["unknown"], k=3) == []
+    assert np.all(index.scores(["work", "km"]) >= 0)
+
+
+def test_bm25_recall_matches_overlap_on_golden_scenarios(tmp_path: Path):
+    out = tmp_path / "rules_index.json"
+    build_index("knowledge/rules/de", str(out))
+    overlap = golden_recall(InMemoryRetriever(out, scorer="overlap"))
+    bm25 = golden_recall(InMemoryRetriever(out, scorer="bm25"))
+    assert bm25 == 1.0
+    assert bm25 >= overlap
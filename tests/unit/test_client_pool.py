@@ -0,0 +1,55 @@
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.llm.client_pool import ClientPool
+from app.llm.groq_adapter import GroqAdapter
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self) -> None:
+        body = b"{}"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def server_url() -> Iterator[str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_requests_reuse_one_keep_alive_connection(server_url: str):
+    pool = ClientPool(max_connections=2)
+    for _ in range(5):
+        assert pool.http_client.get(server_url).status_code == 200
+    stats = pool.stats()
+    assert stats["requests"] == 5
+    assert stats["connections_opened"] == 1
+    assert stats["connections_reused"] == 4 and stats["reuse_ratio"] == 0.8
+    pool.close()
+
+
+def test_adapters_share_the_pool_and_its_clients():
+    pool = ClientPool()
+    first = GroqAdapter(api_key="key", pool=pool)
+    second = GroqAdapter(api_key="key", pool=pool)
+    assert first.client is second.client
+    assert first.client._client is pool.http_client
+    assert GroqAdapter(api_key="other", pool=pool).client._client is pool.http_client
+    assert GroqAdapter(api_key=None).offline
+    pool.close()
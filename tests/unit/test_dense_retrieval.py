@@ -0,0 +1,54 @@
+from pathlib import Path
+
+import numpy as np
+
+from app.knowledge.dense import DenseIndex, dense_dir_for
+from app.knowledge.ingest import binary_index_path, ingest_rules
+from app.knowledge.retriever import InMemoryRetriever
+from tests.util.golden import golden_recall
+
+
+def _ingest(tmp_path: Path) -> tuple[Path, Path]:
+    out = tmp_path / "rules_index.json"
+    report = ingest_rules("knowledge/rules/de", out, chroma_path=tmp_path / "chroma")
+    assert report.dense_written
+    return binary_index_path(out), dense_dir_for(tmp_path / "chroma")
+
+
+def test_ngram_vectors_match_compound_parts():
+    rules = [
+        {"year": 2024, "title": "Entfernung", "summary": "Pauschale je km"},
+        {"year": 2024, "title": "Spenden", "summary": "Verein Quittung"},
+    ]
+    dense = DenseIndex.build(rules, dim=1024)
+    _, sims = dense.scores("Entfernungspauschale", 2024)
+    assert sims[0] > 3 * sims[1]
+    assert np.allclose(DenseIndex.build(rules, dim=1024).vectors, dense.vectors)
+
+
+def test_hybrid_finds_compounds_that_lexical_scoring_misses(tmp_path: Path):
+    bin_path, dense_dir = _ingest(tmp_path)
+    hybrid = InMemoryRetriever(bin_path, scorer="hybrid", dense_dir=dense_dir)
+    bm25 = InMemoryRetriever(bin_path, scorer="bm25")
+    assert bm25.search("Kilometerpauschale", year=2024) == []
+    hits = hybrid.search("Kilometerpauschale", year=2024, k=1)
+    assert hits[0].rule_id == "de_2024_commuting_allowance"
+    assert hybrid.search("zzzz qqqq", year=2024) == []
+    assert golden_recall(hybrid) == 1.0
+
+
+def test_dense_vectors_follow_the_index(tmp_path: Path):
+    bin_path, dense_dir = _ingest(tmp_path)
+    out = tmp_path / "rules_index.json"
+    again = ingest_rules("knowledge/rules/de", out, chroma_path=tmp_path / "chroma")
+    assert not again.written and not again.dense_written
+
+    # Vectors built for other index content are ignored: plain BM25 until re-ingest
+    other = DenseIndex.load(dense_dir)
+    assert other is not None
+    DenseIndex.build(
+        [{"year": 2024, "title": "x", "summary": "Kilometerpauschale"}], sources=["other"]
+    ).save(dense_dir)
+    hybrid = InMemoryRetriever(bin_path, scorer="hybrid", dense_dir=dense_dir)
+    assert hybrid.search("Kilometerpauschale", year=2024) == []
+    assert ingest_rules("knowledge/rules/de", out, chroma_path=tmp_path / "chroma").dense_written
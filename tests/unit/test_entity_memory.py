@@ -1,3 +1,6 @@
+from pathlib import Path
+
+from app.memory.backends import InMemoryProfileStore, ShardedProfileStore
 from app.nlu.context import EntityMemory
 
 
@@ -10,3 +13,57 @@ def test_memory_remembers_and_resolves():
     resolved = mem.resolve("get another one of those", kind_hint="equipment_item")
     assert resolved is not None
     assert resolved["data"]["description"] == "monitor"
+
+
+def test_latest_entity_per_kind_is_bounded():
+    mem = EntityMemory(max_per_kind=2)
+    for name in ["a", "b", "c"]:
+        mem.remember({"kind": "equipment_item", "data": {"description": name}})
+    mem.remember({"kind": "donation", "data": {"description": "d"}})
+    assert mem.latest("equipment_item")["data"]["description"] == "c"
+    assert [e["data"]["description"] for e in mem.entities if e["kind"] == "equipment_item"] == [
+        "c",
+        "b",
+    ]
+    assert mem.latest("commute") is None
+    assert mem.resolve("nothing to resolve", kind_hint="equipment_item") is None
+
+
+class _CountingStore(InMemoryProfileStore):
+    loads = 0
+
+    def list_entities(self, user_id: str, per_kind: int = 20) -> list[dict]:
+        self.loads += 1
+        return super().list_entities(user_id, per_kind)
+
+
+def test_store_backed_memory_is_lazy_and_survives_sessions():
+    store = _CountingStore()
+    first = EntityMemory.for_user(store, "u1")
+    assert store.loads == 0
+    for price in ["100", "200", "300"]:
+        first.remember({"kind": "equipment_item", "data": {"unit_price_eur": price}})
+    assert store.loads == 1
+
+    # A new session reads the rows back; other users and the profile are untouched
+    second = EntityMemory.for_user(store, "u1", max_per_kind=2)
+    resolved = second.resolve("I bought another one", kind_hint="equipment_item")
+    assert resolved is not None and resolved["data"] == {"unit_price_eur": "300"}
+    assert EntityMemory.for_user(store, "u2").latest("equipment_item") is None
+    assert "nlu_memory" not in store.get_profile("u1").data
+
+
+def test_store_keeps_only_the_most_recent_rows_per_kind(tmp_path: Path):
+    store = ShardedProfileStore(root_dir=str(tmp_path / "shards"), num_shards=2)
+    for i in range(5):
+        store.remember_entity("u1", "equipment_item", {"i": i}, keep=3)
+    store.remember_entity("u1", "donation", {"i": 9}, keep=3)
+    rows = store.list_entities("u1")
+    assert [(r["kind"], r["data"]["i"]) for r in rows] == [
+        ("equipment_item", 2),
+        ("equipment_item", 3),
+        ("equipment_item", 4),
+        ("donation", 9),
+    ]
+    assert [r["data"]["i"] for r in store.list_entities("u1", per_kind=1)] == [4, 9]
+    store.close()
@@ -0,0 +1,102 @@
+import json
+import time
+from pathlib import Path
+
+from app.maintenance.integrity_scan import run_integrity_scan
+from app.maintenance.retention import run_retention_cleanup
+from app.memory.store import ProfileStore
+
+DAY_MS = 86400 * 1000
+
+
+def _store(tmp_path: Path) -> ProfileStore:
+    return ProfileStore(sqlite_path=str(tmp_path / "t.db"), upload_dir=str(tmp_path / "up"))
+
+
+def test_archive_moves_rows_and_keeps_them_readable(tmp_path: Path):
+    store = _store(tmp_path)
+    ev_id = store.log_evidence("u", "t1", "rule", {"q": "laptop"}, {"ok": True})
+    meta = store.add_attachment("u", "r.pdf", "application/pdf", b"%PDF", None, "t1")
+    parse_id = store.save_receipt_parse("u", meta["id"], "Laptop 999,00", {"total": 999}, "x")
+
+    counts = store.archive_older_than("u", int(time.time() * 1000) + DAY_MS)
+    assert counts == {"evidence": 1, "receipt_parse": 1, "entity": 0}
+    assert store.list_evidence("u") == []
+    assert store.get_receipt_parse_by_attachment(meta["id"]) is None
+
+    record = store.get_archived_record("evidence", ev_id)
+    assert record is not None and record["payload"] == '{"q": "laptop"}'
+    assert store.get_archived_record("receipt_parse", parse_id)["text"] == "Laptop 999,00"
+    assert {e["kind"] for e in store.list_archived("u")} == {"evidence", "receipt_parse"}
+    assert len(list((tmp_path / "archive" / "t").glob("*.ndjson.gz"))) == 1
+    assert run_integrity_scan(store, "u")["issues"] == []
+
+
+def test_integrity_scan_detects_tampered_archive(tmp_path: Path):
+    store = _store(tmp_path)
+    store.log_evidence("u", "t1", "rule", {"q": "laptop"}, {})
+    store.archive_older_than("u", int(time.time() * 1000) + DAY_MS)
+
+    archive_file = next((tmp_path / "archive" / "t").glob("*.ndjson.gz"))
+    data = bytearray(archive_file.read_bytes())
+    data[-10] ^= 0xFF
+    archive_file.write_bytes(bytes(data))
+    issues = run_integrity_scan(store, "u")["issues"]
+    assert [i["type"] for i in issues] == ["archive_member_corrupt"]
+
+
+def test_integrity_scan_checks_every_archived_kind(tmp_path: Path):
+    store = _store(tmp_path)
+    meta = store.add_attachment("u", "r.pdf", "application/pdf", b"%PDF", None, "t1")
+    store.save_receipt_parse("u", meta["id"], "Laptop 999,00", {"total": 999}, "x")
+    store.remember_entity("u", "purchase", {"item": "laptop"})
+    store.archive_older_than("u", int(time.time() * 1000) + DAY_MS)
+    assert run_integrity_scan(store, "u")["issues"] == []
+
+    archive_file = next((tmp_path / "archive" / "t").glob("*.ndjson.gz"))
+    data = bytearray(archive_file.read_bytes())
+    data[-10] ^= 0xFF
+    archive_file.write_bytes(bytes(data))
+    # The last member written, the entity's, is the damaged one
+    issues = run_integrity_scan(store, "u")["issues"]
+    assert issues == [{"type": "archive_member_corrupt", "id": 1, "kind": "entity"}]
+
+
+def test_retention_archive_mode(tmp_path: Path):
+    store = _store(tmp_path)
+    store.apply_patch("u", {"preferences": {"retention": {"evidence_days": 1}}})
+    old_id = store.log_evidence("u", "t1", "rule", {"q": "old"}, {})
+    with store._open() as con:
+        con.execute("UPDATE evidence SET created_at = created_at - ?", (3 * DAY_MS,))
+    store.log_evidence("u", "t2", "rule", {"q": "new"}, {})
+
+    preview = run_retention_cleanup(store, apply=False, mode="archive")
+    assert preview["users"]["u"] == {"evidence_to_archive": 1}
+    summary = run_retention_cleanup(store, apply=True, mode="archive")
+    assert summary["users"]["u"] == {"archived_evidence": 1}
+    assert [e["payload"] for e in store.list_evidence("u")] != []
+    assert store.get_archived_record("evidence", old_id)["payload"] == '{"q": "old"}'
+
+
+def test_retention_covers_entity_memory(tmp_path: Path):
+    store = _store(tmp_path)
+    store.apply_patch("u", {"preferences": {"retention": {"evidence_days": 1}}})
+    now = int(time.time() * 1000)
+    for user_id in ("u", "v"):
+        store.remember_entity(
+            user_id, "purchase", {"item": "old laptop"}, created_at=now - 3 * DAY_MS
+        )
+        store.remember_entity(user_id, "purchase", {"item": "new monitor"}, created_at=now)
+
+    assert run_retention_cleanup(store)["users"]["u"] == {"entities_to_delete": 1}
+    summary = run_retention_cleanup(store, apply=True)
+    assert summary["users"]["u"] == {"deleted_entities": 1}
+    assert [e["data"]["item"] for e in store.list_entities("u")] == ["new monitor"]
+    assert len(store.list_entities("v")) == 2  # no retention preference
+
+    store.remember_entity("u", "purchase", {"item": "old desk"}, created_at=now - 3 * DAY_MS)
+    summary = run_retention_cleanup(store, apply=True, mode="archive")
+    assert summary["users"]["u"] == {"archived_entity": 1}
+    assert [e["data"]["item"] for e in store.list_entities("u")] == ["new monitor"]
+    archived = list(store.iter_archived_records("u", kind="entity"))
+    assert [json.loads(r["data"]) for r in archived] == [{"item": "old desk"}]
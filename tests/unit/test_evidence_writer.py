@@ -0,0 +1,89 @@
+import gc
+import sqlite3
+import threading
+import uuid
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from app.maintenance.integrity_scan import run_integrity_scan
+from app.memory.evidence_writer import EvidenceWriter
+from app.memory.store import ProfileStore
+
+
+def test_write_behind_returns_ids_and_flushes(tmp_path: Path):
+    store = ProfileStore(sqlite_path=str(tmp_path / "test.db"), write_behind=True)
+    user_id = f"user_{uuid.uuid4().hex}"
+
+    futures = [
+        store.log_evidence_deferred(user_id, "t1", "test_event", {"n": i}, {"ok": True})
+        for i in range(50)
+    ]
+    store.flush()
+    ids = [f.result(timeout=5) for f in futures]
+    assert len(set(ids)) == 50 and ids == sorted(ids)
+
+    # Synchronous callers still get their row id
+    row_id = store.log_evidence(user_id, "t2", "test_event", {"n": 50}, {"ok": True})
+    assert row_id > ids[-1]
+
+    assert len(store.list_evidence(user_id, limit=100)) == 51
+    assert not run_integrity_scan(store, user_id)["issues"]
+    store.close()
+
+
+def test_shutdown_drains_queue(tmp_path: Path):
+    db = str(tmp_path / "test.db")
+    store = ProfileStore(sqlite_path=db, write_behind=True)
+    for i in range(20):
+        store.log_evidence_deferred("u", None, "test_event", {"n": i}, {})
+    store.close()
+
+    assert len(ProfileStore(sqlite_path=db).list_evidence("u")) == 20
+
+
+def test_failed_writer_fails_pending_rows_instead_of_hanging(tmp_path: Path):
+    release = threading.Event()
+
+    def broken_connect() -> sqlite3.Connection:
+        release.wait(5)
+        raise sqlite3.OperationalError("unable to open database file")
+
+    writer = EvidenceWriter(broken_connect, max_queue=2)
+    row = ("u", None, "test_event", "{}", "", "{}", 0)
+    pending = [writer.submit(row), writer.submit(row)]
+    # The queue is full: this submit waits until the writer fails, then raises
+    with ThreadPoolExecutor(1) as pool:
+        blocked = pool.submit(writer.submit, row)
+        release.set()
+
+    for fut in pending:
+        with pytest.raises(sqlite3.OperationalError):
+            fut.result(timeout=5)
+    with pytest.raises(RuntimeError):
+        blocked.result(timeout=5)
+    with pytest.raises(RuntimeError):
+        writer.flush(timeout=5)
+    writer.shutdown(timeout=5)
+
+    # Store reads wait a bounded time and return what is committed
+    store = ProfileStore(sqlite_path=str(tmp_path / "test.db"))
+    store._evidence_writer = writer
+    assert store.list_evidence("u") == []
+
+
+def test_write_behind_stores_are_not_kept_alive(tmp_path: Path):
+    store = ProfileStore(sqlite_path=str(tmp_path / "test.db"), write_behind=True)
+    store.log_evidence("u", None, "test_event", {}, {})
+    writer, ref = store._evidence_writer, weakref.ref(store)
+    del store
+    gc.collect()
+    assert ref() is None
+    writer._thread.join(5)
+    assert not writer._thread.is_alive()
+
+    closed = ProfileStore(sqlite_path=str(tmp_path / "test.db"), write_behind=True)
+    closed.close()
+    assert not closed._writer_finalizer.alive
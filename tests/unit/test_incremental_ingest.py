@@ -0,0 +1,50 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from app.knowledge.ingest import ingest_rules, manifest_path
+
+
+@pytest.fixture
+def rules_dir(tmp_path: Path) -> Path:
+    return Path(shutil.copytree("knowledge/rules/de", tmp_path / "rules"))
+
+
+def test_second_run_reuses_everything_and_does_not_rewrite(rules_dir: Path, tmp_path: Path):
+    out = tmp_path / "rules_index.json"
+    first = ingest_rules(rules_dir, out)
+    assert first.written and len(first.parsed) == 8 and manifest_path(out).exists()
+    mtime = out.stat().st_mtime_ns
+
+    second = ingest_rules(rules_dir, out)
+    assert not second.written and not second.changed and len(second.reused) == 8
+    assert out.stat().st_mtime_ns == mtime
+    assert second.rules == 8
+
+
+def test_changed_and_removed_files_are_detected(rules_dir: Path, tmp_path: Path):
+    out = tmp_path / "rules_index.json"
+    ingest_rules(rules_dir, out)
+    equipment = rules_dir / "2024" / "equipment.yml"
+    equipment.write_text(
+        equipment.read_text(encoding="utf-8").replace("title:", "title: Updated", 1),
+        encoding="utf-8",
+    )
+    (rules_dir / "2025" / "donations.yml").unlink()
+
+    assert ingest_rules(rules_dir, out, check=True).changed
+    report = ingest_rules(rules_dir, out)
+    assert report.parsed == ["2024/equipment.yml"]
+    assert report.removed == ["2025/donations.yml"]
+    assert report.written and report.rules == 7
+    assert "Updated" in out.read_text(encoding="utf-8")
+    assert not ingest_rules(rules_dir, out, check=True).changed
+
+
+def test_tampered_index_forces_full_rebuild(rules_dir: Path, tmp_path: Path):
+    out = tmp_path / "rules_index.json"
+    ingest_rules(rules_dir, out)
+    out.write_text("[]", encoding="utf-8")
+    report = ingest_rules(rules_dir, out)
+    assert len(report.parsed) == 8 and report.written
@@ -0,0 +1,82 @@
+import os
+import threading
+from pathlib import Path
+
+from app.knowledge.index_holder import get_index_holder
+from app.knowledge.ingest import binary_index_path, build_index, ingest_rules
+from app.knowledge.retriever import InMemoryRetriever
+from app.knowledge.rules_service import RulesService
+
+
+def _build(tmp_path: Path) -> tuple[Path, Path]:
+    rules_dir = tmp_path / "rules"
+    for src in Path("knowledge/rules/de").rglob("*.yml"):
+        dst = rules_dir / src.relative_to("knowledge/rules/de")
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        dst.write_bytes(src.read_bytes())
+    out = tmp_path / "rules_index.json"
+    build_index(str(rules_dir), str(out))
+    return rules_dir, binary_index_path(out)
+
+
+def test_retriever_and_rules_service_share_one_holder(tmp_path: Path):
+    _, bin_path = _build(tmp_path)
+    svc = RulesService(str(bin_path))
+    r = InMemoryRetriever(bin_path)
+    assert svc.holder is r.holder is get_index_holder(bin_path)
+    assert InMemoryRetriever(bin_path, scorer="bm25").index is r.index
+    assert {rule["year"] for rule in svc.search(year=2025)} == {2025}
+    assert any("commut" in rule["title"].lower() for rule in svc.search("commut"))
+
+
+def test_rewritten_index_is_swapped_in_without_disturbing_old_snapshots(tmp_path: Path):
+    rules_dir, bin_path = _build(tmp_path)
+    r = InMemoryRetriever(bin_path)
+    svc = RulesService(str(bin_path))
+    old = r.holder.snapshot()
+    assert any(h.category == "commuting" for h in r.search("commute", year=2024))
+
+    for path in rules_dir.rglob("*.yml"):
+        if "commut" in path.read_text(encoding="utf-8").lower():
+            path.unlink()
+    build_index(str(rules_dir), str(tmp_path / "rules_index.json"))
+
+    assert all(h.category != "commuting" for h in r.search("commute", year=2024))
+    assert all(rule["category"] != "commuting" for rule in svc.search())
+    assert r.holder.current.version == old.version + 1 and r.holder.reloads == 1
+    # A search that started on the old snapshot still sees the old rules
+    assert any(h.category == "commuting" for h in r.search("commute", 2024, snapshot=old))
+
+
+def test_unchanged_or_broken_file_keeps_current_index(tmp_path: Path):
+    json_path = tmp_path / "rules_index.json"
+    build_index("knowledge/rules/de", str(json_path))
+    holder = get_index_holder(json_path)
+    first = holder.snapshot()
+
+    os.utime(json_path, ns=(0, 0))  # touched, same content
+    assert holder.snapshot().index is first.index
+    json_path.write_text("{not json", encoding="utf-8")
+    assert holder.snapshot().index is first.index and holder.reloads == 0
+    assert InMemoryRetriever(json_path).search("commute", year=2024)
+
+
+def test_concurrent_searches_during_reloads(tmp_path: Path):
+    rules_dir, bin_path = _build(tmp_path)
+    r = InMemoryRetriever(bin_path)
+    errors: list[Exception] = []
+
+    def worker() -> None:
+        try:
+            for _ in range(50):
+                r.search("Arbeitsmittel Laptop", year=2024)
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    ingest_rules(rules_dir, tmp_path / "rules_index.json", force=True)
+    for t in threads:
+        t.join()
+    assert errors == []
@@ -0,0 +1,139 @@
+import time
+from types import SimpleNamespace
+
+import groq
+import httpx
+import pytest
+from structlog.testing import capture_logs
+
+from app.llm.client_pool import ClientPool
+from app.llm.groq_adapter import GroqAdapter, is_retryable
+from app.llm.resilience import CircuitBreaker, CircuitOpenError, Resilience
+from app.orchestrator.prompts import ROUTER_PROMPT
+
+
+def _connection_error() -> groq.APIConnectionError:
+    return groq.APIConnectionError(request=httpx.Request("POST", "https://api.groq.test"))
+
+
+class _Clock:
+    now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_breaker_opens_half_opens_and_closes():
+    clock = _Clock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout_s=10, clock=clock)
+    with capture_logs() as logs:
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == "open" and not breaker.allow()
+
+        clock.now = 10
+        assert breaker.allow()  # the single half-open trial
+        assert not breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == "open"
+
+        clock.now = 20
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == "closed" and breaker.allow()
+    states = [e["state"] for e in logs if e["event"] == "llm_breaker_state"]
+    assert states == ["open", "half_open", "open", "half_open", "closed"]
+    assert breaker.rejected == 2
+
+
+def test_retries_use_capped_jittered_backoff():
+    delays: list[float] = []
+    policy = Resilience(
+        is_retryable, max_retries=3, base_delay_s=1.0, max_delay_s=3.0, sleep=delays.append
+    )
+    outcomes = [_connection_error(), _connection_error(), _connection_error(), "ok"]
+
+    def flaky() -> str:
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert policy.call(flaky) == "ok"
+    assert len(delays) == 3 and policy.retries == 3
+    assert all(0 <= d <= cap for d, cap in zip(delays, [1.0, 2.0, 3.0], strict=True))
+
+    def bad_request() -> str:
+        raise ValueError("not retryable")
+
+    with pytest.raises(ValueError):
+        policy.call(bad_request)
+    assert policy.retries == 3 and policy.breaker.state == "closed"
+
+
+def test_slow_attempts_are_hedged_after_the_p95_latency():
+    policy = Resilience(is_retryable, hedge=True)
+    for _ in range(20):
+        policy.call(lambda: None, key="json:m")
+    calls: list[int] = []
+
+    def slow_then_fast() -> str:
+        calls.append(1)
+        if len(calls) == 1:
+            time.sleep(0.5)
+            return "slow"
+        return "fast"
+
+    assert policy.call(slow_then_fast, key="json:m") == "fast"
+    assert policy.stats()["hedges"] == 1 and policy.stats()["hedge_wins"] == 1
+
+
+def test_adapter_falls_back_offline_while_the_provider_is_down():
+    policy = Resilience(
+        is_retryable,
+        max_retries=1,
+        sleep=lambda _: None,
+        breaker=CircuitBreaker(failure_threshold=2),
+    )
+    adapter = GroqAdapter(api_key="key", pool=ClientPool(), resilience=policy)
+    attempts: list[dict] = []
+
+    def create(**kwargs: object) -> None:
+        attempts.append(kwargs)
+        raise _connection_error()
+
+    adapter.client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+    messages = [{"role": "user", "content": "Laptop"}]
+
+    assert adapter.json("m", messages)["intent"] == "deduction"
+    tokens: list[str] = []
+    adapter.stream("m", messages, tokens.append)
+    assert "".join(tokens) == adapter._offline_chat(messages)
+    assert len(attempts) == 4 and policy.breaker.state == "open"
+
+    # Open breaker: straight to the offline path, no request at all
+    assert adapter.chat("m", messages) == adapter._offline_chat(messages)
+    assert len(attempts) == 4
+    with pytest.raises(CircuitOpenError):
+        policy.call(lambda: None)
+
+
+def test_offline_router_routes_on_the_user_message(capsys: pytest.CaptureFixture[str]):
+    adapter = GroqAdapter(api_key=None)
+
+    def route(text: str) -> dict:
+        prompt = ROUTER_PROMPT.format(user_input=text)
+        return adapter._offline_json([{"role": "user", "content": prompt}])
+
+    assert route("Ich bin Pendler")["category_hint"] == "commuting"
+    assert route("My home office costs")["category_hint"] == "home_office"
+    assert route("Laptop gekauft") == {
+        "intent": "deduction",
+        "category_hint": "equipment",
+        "retrieval_query": "laptop gekauft",
+    }
+    assert route("hello")["category_hint"] is None
+    assert capsys.readouterr().out == ""
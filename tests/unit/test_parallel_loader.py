@@ -0,0 +1,44 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from app.knowledge.ingest import ingest_rules
+from app.knowledge.loader import RuleLoadError, load_rules_from_dir
+
+
+@pytest.fixture
+def rules_dir(tmp_path: Path) -> Path:
+    return Path(shutil.copytree("knowledge/rules/de", tmp_path / "rules"))
+
+
+def test_parallel_load_matches_serial(rules_dir: Path):
+    serial = load_rules_from_dir(rules_dir)
+    assert load_rules_from_dir(rules_dir, jobs=2) == serial
+    assert len(serial) == 8
+
+
+def test_list_files_and_aggregated_errors(rules_dir: Path, tmp_path: Path):
+    equipment = (rules_dir / "2024" / "equipment.yml").read_text(encoding="utf-8")
+    extra = equipment.replace("de_2024_work_equipment", "de_2024_extra_a")
+    extra_b = equipment.replace("de_2024_work_equipment", "de_2024_extra_b")
+    as_list = "\n".join("- " + text.replace("\n", "\n  ").rstrip() for text in (extra, extra_b))
+    (rules_dir / "2024" / "extras.yml").write_text(as_list, encoding="utf-8")
+    rules = load_rules_from_dir(rules_dir, jobs=2)
+    assert {"de_2024_extra_a", "de_2024_extra_b"} <= {r.rule_id for r in rules}
+
+    (rules_dir / "2025" / "broken.yml").write_text("rule_id: [unclosed", encoding="utf-8")
+    (rules_dir / "2025" / "bad_year.yml").write_text(
+        equipment.replace("year: 2024", "year: 2031"), encoding="utf-8"
+    )
+    with pytest.raises(RuleLoadError) as exc:
+        ingest_rules(rules_dir, tmp_path / "rules_index.json", jobs=2)
+    assert len(exc.value.errors) == 2
+    assert "broken.yml" in exc.value.errors[1] and "bad_year.yml: year" in exc.value.errors[0]
+
+
+def test_duplicate_ids_across_files_are_reported(rules_dir: Path):
+    src = rules_dir / "2024" / "equipment.yml"
+    shutil.copy(src, rules_dir / "2024" / "equipment_copy.yml")
+    with pytest.raises(ValueError, match="Duplicate rule_id detected: de_2024_work_equipment"):
+        load_rules_from_dir(rules_dir, jobs=2)
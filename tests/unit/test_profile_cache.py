@@ -0,0 +1,33 @@
+from pathlib import Path
+
+from app.memory.store import ProfileStore
+
+
+def test_cache_hits_and_returns_private_copies(tmp_path: Path):
+    store = ProfileStore(sqlite_path=str(tmp_path / "test.db"))
+    store.apply_patch("u", {"deductions": {"home_office_days": 10}})
+
+    first = store.get_profile("u")
+    first.data["deductions"]["home_office_days"] = 999  # callers may mutate freely
+    second = store.get_profile("u")
+    assert second.data["deductions"]["home_office_days"] == 10
+    assert store.cache_stats()["hits"] >= 1
+
+
+def test_writes_invalidate_cached_profile(tmp_path: Path):
+    store = ProfileStore(sqlite_path=str(tmp_path / "test.db"))
+    store.get_profile("u")
+    store.get_profile("u")
+    snap, _ = store.apply_patch("u", {"filing": {"filing_year": 2024}})
+    assert store.get_profile("u") == snap
+
+
+def test_version_check_sees_writes_from_other_processes(tmp_path: Path):
+    db = str(tmp_path / "test.db")
+    reader = ProfileStore(sqlite_path=db, verify_cached_version=True)
+    writer = ProfileStore(sqlite_path=db)
+    reader.get_profile("u")
+    reader.get_profile("u")
+
+    writer.apply_patch("u", {"filing": {"filing_year": 2025}})
+    assert reader.get_profile("u").data["filing"]["filing_year"] == 2025
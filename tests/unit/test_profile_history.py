@@ -0,0 +1,74 @@
+import uuid
+from pathlib import Path
+
+import pytest
+
+from app.memory.store import SNAPSHOT_EVERY, ProfileStore
+
+
+def _commit(store: ProfileStore, user_id: str, patch: dict) -> None:
+    _, diff = store.apply_patch(user_id, patch)
+    store.commit_action(user_id, f"a_{uuid.uuid4().hex}", "edit", patch, "", diff, True)
+
+
+def test_get_profile_at_reconstructs_every_version(tmp_path: Path):
+    store = ProfileStore(sqlite_path=str(tmp_path / "test.db"))
+    user_id = "history_user"
+    seen = {0: store.get_profile(user_id).data}
+    for i in range(1, 2 * SNAPSHOT_EVERY + 3):
+        snap, _ = store.apply_patch(user_id, {"deductions": {f"k{i % 5}": i}, "empty": {}})
+        seen[snap.version] = snap.data
+
+    for version, data in seen.items():
+        assert store.get_profile_at(user_id, version).data == data
+    assert sum(v["is_snapshot"] for v in store.list_profile_versions(user_id)) == 3
+
+
+def test_multi_step_undo_and_redo(tmp_path: Path):
+    store = ProfileStore(sqlite_path=str(tmp_path / "test.db"))
+    user_id = "undo_user"
+    store.get_profile(user_id)
+    for days in (10, 20, 30):
+        _commit(store, user_id, {"deductions": {"home_office_days": days}})
+
+    snap = store.undo_action(user_id, "undo:1", steps=2)
+    assert snap.data["deductions"]["home_office_days"] == 10
+    snap = store.undo_action(user_id, "undo:2")
+    assert "home_office_days" not in snap.data.get("deductions", {})
+
+    snap = store.redo_action(user_id, "redo:1")
+    assert snap.data["deductions"]["home_office_days"] == 10
+    snap = store.redo_action(user_id, "redo:2")
+    assert snap.data["deductions"]["home_office_days"] == 30
+
+    # A new edit clears the redo stack
+    store.undo_action(user_id, "undo:3")
+    _commit(store, user_id, {"deductions": {"home_office_days": 99}})
+    with pytest.raises(ValueError):
+        store.redo_action(user_id, "redo:3")
+
+
+def test_revert_to_version(tmp_path: Path):
+    store = ProfileStore(sqlite_path=str(tmp_path / "test.db"))
+    user_id = "revert_user"
+    _commit(store, user_id, {"filing": {"filing_year": 2024}})
+    _commit(store, user_id, {"filing": {"filing_year": 2025}})
+    snap = store.revert_to_version(user_id, 1, "revert:1")
+    assert snap.version == 3 and snap.data["filing"]["filing_year"] == 2024
+
+
+def test_history_replays_type_changes_and_none_values(tmp_path: Path):
+    store = ProfileStore(sqlite_path=str(tmp_path / "test.db"))
+    user_id = "replay_user"
+    seen = {}
+    for patch in ({"c": {"d": 1}, "a": {"b": 1}}, {"c": 5, "a": {"b": None}}):
+        snap, _ = store.apply_patch(user_id, patch)
+        seen[snap.version] = snap.data
+    assert seen[2]["c"] == 5 and seen[2]["a"] == {"b": None}
+
+    for version, data in seen.items():
+        assert store.get_profile_at(user_id, version).data == data
+    snap = store.revert_to_version(user_id, 2, "revert:1")
+    assert snap.data == seen[2] and store.get_profile_at(user_id, snap.version).data == seen[2]
+    snap = store.revert_to_version(user_id, 1, "revert:2")
+    assert store.get_profile_at(user_id, snap.version).data == seen[1]
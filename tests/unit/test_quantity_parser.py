@@ -1,4 +1,7 @@
+import time
+
 from app.nlu.quantities import parse_line_items
+from benchmarks.bench_line_items import ADVERSARIAL, SAMPLES, regex_parse_line_items
 
 
 def test_parse_line_items():
@@ -14,3 +17,24 @@ def test_parse_line_items():
 
     assert keyboard_item["quantity"] == 1
     assert keyboard_item["unit_price_eur"] == "75.00"
+
+
+def test_matches_the_regex_parser_on_sample_sentences():
+    for sample in SAMPLES:
+        assert parse_line_items(sample) == regex_parse_line_items(sample), sample
+
+
+def test_unicode_descriptions_and_bad_prices():
+    assert parse_line_items("Bürostuhl für mich at 120 €")[0]["description"] == (
+        "Bürostuhl für mich"
+    )
+    assert parse_line_items("2x Lamp 1.2.3€") == []
+    assert parse_line_items("") == []
+
+
+def test_pathological_pastes_parse_in_linear_time():
+    # The regex parser needs minutes for each of these; a linear one well under a second
+    start = time.perf_counter()
+    for unit in ADVERSARIAL.values():
+        parse_line_items((unit * (100_000 // len(unit)))[:100_000])
+    assert time.perf_counter() - start < 5
@@ -0,0 +1,51 @@
+import json
+import os
+from pathlib import Path
+
+from app.knowledge.ingest import build_index
+from app.knowledge.retrieval_cache import CachedRetriever, get_cached_retriever, normalize_query
+
+
+def test_normalize_query():
+    assert normalize_query("  Laptop   für\tArbeit ") == "laptop für arbeit"
+
+
+def test_cache_hits_on_equivalent_queries(tmp_path: Path):
+    out = tmp_path / "rules_index.json"
+    build_index("knowledge/rules/de", str(out))
+    r = CachedRetriever(out)
+
+    first = r.search("Arbeitsmittel Laptop", year=2024, k=1)
+    first[0].score = -1.0  # callers get copies
+    second = r.search("  arbeitsmittel   LAPTOP", year=2024, k=1)
+    assert second[0].rule_id == "de_2024_work_equipment" and second[0].score > 0
+    r.search("Arbeitsmittel Laptop", year=2025, k=1)  # different year: miss
+    stats = r.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 2, 0.3333)
+
+
+def test_cache_invalidated_when_index_content_changes(tmp_path: Path):
+    out = tmp_path / "rules_index.json"
+    build_index("knowledge/rules/de", str(out))
+    r = CachedRetriever(out)
+    assert r.search("commute", year=2024)
+
+    os.utime(out, ns=(0, 0))  # touched but same content: cache kept
+    r.search("commute", year=2024)
+    assert r.stats()["hits"] == 1 and r.stats()["reloads"] == 0
+
+    rules = [x for x in json.loads(out.read_text()) if x["category"] != "commuting"]
+    out.write_text(json.dumps(rules))
+    hits = r.search("commute", year=2024)
+    assert all(h.category != "commuting" for h in hits)
+    assert r.stats()["reloads"] == 1
+
+
+def test_shared_retrievers_are_keyed_on_every_argument(tmp_path: Path):
+    out = tmp_path / "rules_index.json"
+    build_index("knowledge/rules/de", str(out))
+    first = get_cached_retriever(out, max_entries=8)
+    assert get_cached_retriever(out, max_entries=8) is first
+    other = get_cached_retriever(out, max_entries=16)
+    assert other is not first and other.max_entries == 16
+    assert get_cached_retriever(out, max_entries=8, dense_dir=tmp_path / "dense") is not first
@@ -0,0 +1,47 @@
+from app.infra.serialization import loads
+from benchmarks.bench_retrieval_quality import (
+    THRESHOLDS_PATH,
+    check,
+    golden_cases,
+    run,
+    synthetic_cases,
+)
+from benchmarks.rulegen import synthetic_rules
+
+
+def test_golden_quality_meets_the_stored_thresholds():
+    results = run(n_rules=200, n_queries=20, repeat=1)
+    assert set(results["synthetic"]) == {"overlap", "bm25", "hybrid"}
+    thresholds = loads(THRESHOLDS_PATH.read_bytes())
+    # Latency limits depend on the machine; only quality is gated here
+    quality = {
+        scorer: {m: v for m, v in limits.items() if not m.endswith("_ms")}
+        for scorer, limits in thresholds["golden"].items()
+    }
+    assert check(results, {"golden": quality}) == []
+
+
+def test_check_reports_quality_and_latency_regressions():
+    results = {"golden": {"bm25": {"recall_at_k": 0.5, "mrr": 0.5, "p95_ms": 9.0}}}
+    thresholds = {
+        "golden": {
+            "bm25": {"recall_at_k": 1.0, "mrr": 0.5, "p95_ms": 5.0},
+            "hybrid": {"mrr": 0.5},
+        }
+    }
+    assert check(results, thresholds) == [
+        "golden/bm25: recall_at_k 0.5 < 1.0",
+        "golden/bm25: p95_ms 9.0 > 5.0",
+        "golden/hybrid: not measured",
+    ]
+
+
+def test_query_sets():
+    assert len(golden_cases()) == 2
+    rules = synthetic_rules(100)
+    cases = synthetic_cases(rules, 30)
+    by_id = {r["rule_id"]: r for r in rules}
+    for case in cases:
+        assert case.relevant
+        assert all(by_id[rid]["year"] == case.year for rid in case.relevant)
+    assert synthetic_cases(rules, 30) == cases
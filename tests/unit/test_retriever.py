@@ -27,3 +27,13 @@ def test_retriever_bilingual(tmp_path: Path):
     # German query for 2024
     hits_de = r.search("Arbeitsmittel Laptop", year=2024, k=1)
     assert hits_de and hits_de[0].rule_id == "de_2024_work_equipment"
+
+
+def test_retriever_ranks_only_matching_rules(tmp_path: Path):
+    r = make_retriever(tmp_path)
+    hits = r.search("laptop monitor commute donation", year=2024, k=10)
+    scores = [h.score for h in hits]
+    assert scores == sorted(scores, reverse=True)
+    assert all(h.year == 2024 and h.score >= 1.0 for h in hits)
+    assert r.search("zzzz qqqq", year=2024, k=3) == []
+    assert r.search("laptop", year=2030, k=3) == []
@@ -0,0 +1,12 @@
+from pathlib import Path
+
+from app.knowledge.loader import load_rules_from_dir
+from benchmarks.rulegen import write_rulebook
+
+
+def test_generated_rulebook_is_valid(tmp_path: Path):
+    files = write_rulebook(tmp_path, 250, per_file=10)
+    rules = load_rules_from_dir(tmp_path)
+    assert len(rules) == 250 and len(files) >= 25
+    assert {r.year for r in rules} == {2024, 2025}
+    assert {r.category for r in rules} == {"commuting", "home_office", "equipment", "donations"}
@@ -0,0 +1,55 @@
+from pathlib import Path
+
+from app.knowledge.binary_index import write_binary_index
+from app.knowledge.ingest import binary_index_path, build_index
+from app.knowledge.rules_service import RulesService, highlight_spans
+from benchmarks.rulegen import synthetic_rules
+
+
+def test_facets_pagination_and_highlights(tmp_path: Path):
+    out = tmp_path / "rules_index.json"
+    build_index("knowledge/rules/de", str(out))
+    svc = RulesService(str(binary_index_path(out)))
+
+    result = svc.search_page("pauschale", page_size=1)
+    assert result.total == 4 and result.pages == 4
+    assert result.facets["category"] == {"commuting": 2, "home_office": 2}
+    # Title matches rank first; spans point at the match in the original text
+    first = result.items[0]
+    (start, end), *_ = first["highlights"]["title"]
+    assert first["title"][start:end].lower() == "pauschale"
+
+    page = svc.search_page("pauschale", year=2025, category="home_office", page=1)
+    assert [r["rule_id"] for r in page.items] == ["de_2025_home_office_pauschale"]
+    assert page.facets["year"] == {2024: 2, 2025: 2}  # counts ignore the facet filters
+    last = svc.search_page("pauschale", page=9, page_size=3)
+    assert (last.page, last.pages, len(last.items)) == (2, 2, 1)
+    assert len(svc.search(year=2024)) == 4
+
+
+def test_trigram_lookup_matches_a_full_scan(tmp_path: Path):
+    rules = synthetic_rules(600)
+    path = tmp_path / "rules_index.bin"
+    write_binary_index(rules, path)
+    svc = RulesService(str(path))
+    for query in ["lap", "Rule 12", "topic4", "home office", "x", "costs year", "nothing-here"]:
+        q = query.lower()
+        expected = {
+            r["rule_id"] for r in rules if q in r["title"].lower() or q in r["summary"].lower()
+        }
+        assert {r["rule_id"] for r in svc.search(query)} == expected, query
+
+
+def test_search_page_decodes_only_the_served_page(tmp_path: Path):
+    path = tmp_path / "rules_index.bin"
+    write_binary_index(synthetic_rules(600), path)
+    svc = RulesService(str(path))
+    result = svc.search_page("rule", page=2, page_size=10)
+    assert result.total == 600 and len(result.items) == 10
+    assert len(svc.holder.snapshot().index._bodies) == 10
+
+
+def test_highlight_spans_are_case_insensitive():
+    assert highlight_spans("Homeoffice home HOME", "home") == [(0, 4), (11, 15), (16, 20)]
+    assert highlight_spans("a+b", "+") == [(1, 2)]
+    assert highlight_spans("text", "") == []
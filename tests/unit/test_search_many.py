@@ -0,0 +1,42 @@
+from pathlib import Path
+
+import pytest
+
+from app.knowledge.binary_index import write_binary_index
+from app.knowledge.retriever import InMemoryRetriever
+from benchmarks.rulegen import synthetic_rules
+
+QUERIES = [
+    "home office",
+    "Home Office",
+    "commute km",
+    "laptop",
+    "home office",
+    "donation receipt",
+    "nothing matches this",
+]
+
+
+@pytest.fixture(scope="module")
+def index_path(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    path = tmp_path_factory.mktemp("rules") / "rules_index.bin"
+    write_binary_index(synthetic_rules(800), path)
+    return path
+
+
+@pytest.mark.parametrize("scorer", ["overlap", "bm25", "hybrid"])
+def test_search_many_matches_single_searches(index_path: Path, scorer: str):
+    retriever = InMemoryRetriever(index_path, scorer=scorer)
+    expected = [retriever.search(q, year=2024, k=5) for q in QUERIES]
+    assert retriever.search_many(QUERIES, year=2024, k=5) == expected
+    assert retriever.search_many(QUERIES, year=2024, k=5, workers=1) == expected
+
+
+def test_search_many_edge_cases(index_path: Path):
+    retriever = InMemoryRetriever(index_path)
+    assert retriever.search_many([], year=2024) == []
+    assert retriever.search_many(["home office", "laptop"], year=1999) == [[], []]
+    assert retriever.search_many(["home office"], year=2024, k=0) == [[]]
+    # Cut-off fuzzy scores count as 0: rules still ranked by shared terms
+    hits = retriever.search_many(["homeoffice laptopz"], year=2024, k=3, fuzzy_cutoff=100)[0]
+    assert hits and all(h.score == int(h.score) for h in hits)
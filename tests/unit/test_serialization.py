@@ -0,0 +1,27 @@
+import json
+from decimal import Decimal
+
+import pytest
+
+from app.infra import serialization
+
+PAYLOAD = {"b": [1, 2.5, None], "a": {"z": "Ärztin", "y": True}, "amount": Decimal("12.30")}
+
+
+def test_canonical_output_matches_stdlib_sort_keys():
+    plain = {"b": [1, 2.5, None], "a": {"z": "Ärztin", "y": True}}
+    assert serialization.canonical_dumps(plain) == json.dumps(plain, sort_keys=True)
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_round_trip_with_decimals(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(serialization, "orjson", None)
+    elif serialization.orjson is None:
+        pytest.skip("orjson not installed")
+    data = serialization.loads(serialization.dumps(PAYLOAD))
+    assert data["amount"] == "12.30"  # Decimals keep their exact text
+    assert data["a"]["z"] == "Ärztin"
+    assert serialization.loads(serialization.dumps_bytes(PAYLOAD, indent=True)) == data
+    clone = serialization.clone({"x": {"y": [1]}})
+    assert clone == {"x": {"y": [1]}}
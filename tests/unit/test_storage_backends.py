@@ -0,0 +1,90 @@
+import base64
+from pathlib import Path
+
+import pytest
+
+from app.infra.config import AppSettings
+from app.maintenance.integrity_scan import run_integrity_scan_all
+from app.maintenance.retention import run_retention_cleanup
+from app.memory import storage
+from app.memory.backends import InMemoryProfileStore, ShardedProfileStore
+from app.memory.storage import ProfileStorage
+from app.orchestrator.graph import run_turn
+
+TINY_PNG_BYTES = base64.b64decode(
+    b"iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII="
+)
+
+
+def _exercise(store: ProfileStorage, user_id: str) -> None:
+    snap, diff = store.apply_patch(user_id, {"filing": {"filing_year": 2025}})
+    store.commit_action(user_id, f"a:{user_id}", "edit", {}, "", diff, True)
+    assert store.get_profile(user_id).data["filing"]["filing_year"] == 2025
+    assert "filing" not in store.undo_action(user_id, f"u:{user_id}").data
+
+    meta = store.add_attachment(user_id, "r.png", "image/png", TINY_PNG_BYTES, "general", "t")
+    assert store.get_attachment(meta["id"])["user_id"] == user_id
+    store.save_receipt_parse(user_id, meta["id"], "text", {"items": []}, "mock")
+    assert store.get_receipt_parse_by_attachment(meta["id"])["attachment_id"] == meta["id"]
+
+    ev_id = store.log_evidence(user_id, "t", "test_event", {"u": user_id}, {})
+    assert [e["id"] for e in store.list_evidence(user_id)] == [ev_id]
+
+
+def test_in_memory_backend(tmp_path: Path):
+    store = InMemoryProfileStore(upload_dir=str(tmp_path / "uploads"))
+    _exercise(store, "mem_user")
+    assert store.get_all_user_ids() == ["mem_user"]
+    assert not run_integrity_scan_all(store)["mem_user"]["issues"]
+    # Separate instances never share data
+    assert InMemoryProfileStore().get_all_user_ids() == []
+
+
+def test_sharded_backend_routes_and_fans_out(tmp_path: Path):
+    store = ShardedProfileStore(
+        root_dir=str(tmp_path / "shards"), num_shards=3, upload_dir=str(tmp_path / "uploads")
+    )
+    users = [f"user_{i}" for i in range(12)]
+    for uid in users:
+        _exercise(store, uid)
+
+    assert sorted(store.get_all_user_ids()) == sorted(users)
+    assert sum(1 for s in store.shards if s.get_all_user_ids()) > 1
+    # Row ids stay unique across shards
+    ids = [a["id"] for uid in users for a in store.list_attachments(uid)]
+    assert len(set(ids)) == len(ids)
+
+    reports = run_integrity_scan_all(store)
+    assert set(reports) == set(users) and not any(r["issues"] for r in reports.values())
+    assert run_retention_cleanup(store, apply=False)["users"] == {}
+    store.close()
+
+
+def test_turns_without_a_store_share_one_backend(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(storage, "_store", None)
+    cfg = AppSettings(profile_shards=2, profile_shards_dir=str(tmp_path / "shards"))
+    store = storage.get_profile_store(cfg)
+    assert isinstance(store, ShardedProfileStore)
+    assert storage.get_profile_store() is store
+    store.close()
+
+
+def test_panel_writes_are_seen_by_turns_run_without_a_store(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(storage, "_store", None)
+    ui_store = storage.get_profile_store(AppSettings(sqlite_path=str(tmp_path / "p.db")))
+    ui_store.get_profile("demo")
+    run_turn(user_id="demo", user_text="hello")  # caches the profile
+    snap, _ = ui_store.apply_patch("demo", {"filing": {"filing_year": 2024}})
+
+    state = run_turn(user_id="demo", user_text="hello")
+    assert state.profile.version == snap.version
+    assert state.profile.data["filing"]["filing_year"] == 2024
+    ui_store.close()
+
+
+def test_ui_panels_use_the_process_wide_store(tmp_path: Path, monkeypatch):
+    resources = pytest.importorskip("app.ui.resources")
+    monkeypatch.setattr(storage, "_store", None)
+    store = storage.get_profile_store(AppSettings(sqlite_path=str(tmp_path / "p.db")))
+    assert resources.get_store() is store
+    store.close()
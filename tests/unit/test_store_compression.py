@@ -0,0 +1,49 @@
+import sqlite3
+from pathlib import Path
+
+from app.maintenance.integrity_scan import run_integrity_scan
+from app.memory.codec import decode_text, encode_text
+from app.memory.store import ProfileStore
+
+OCR_TEXT = "Laptop Dell XPS 13   1 x 999,00 EUR\n" * 40
+
+
+def test_codec_round_trip_and_passthrough():
+    encoded = encode_text(OCR_TEXT)
+    assert isinstance(encoded, bytes) and len(encoded) < len(OCR_TEXT)
+    assert decode_text(encoded) == OCR_TEXT
+    assert encode_text("short") == "short"
+    assert decode_text("legacy text") == "legacy text"
+    assert decode_text(None) is None
+
+
+def test_store_compresses_and_reads_back(tmp_path: Path):
+    store = ProfileStore(sqlite_path=str(tmp_path / "t.db"), upload_dir=str(tmp_path / "up"))
+    meta = store.add_attachment("u", "r.pdf", "application/pdf", b"%PDF", None, "t")
+    store.save_receipt_parse("u", meta["id"], OCR_TEXT, {"items": []}, "test")
+    store.log_evidence("u", "t", "rule", {"rules": ["de_2024_x"] * 50}, {"ok": True})
+
+    assert store.get_receipt_parse_by_attachment(meta["id"])["text"] == OCR_TEXT
+    assert store.list_evidence("u")[0]["payload"].startswith('{"rules"')
+    assert run_integrity_scan(store, "u")["issues"] == []
+    stats = store.compression_stats()
+    assert stats["receipt_parses.text"]["compressed_rows"] == 1
+    assert stats["receipt_parses.text"]["ratio"] < 0.5
+
+
+def test_recompress_migrates_legacy_rows(tmp_path: Path):
+    db = tmp_path / "t.db"
+    store = ProfileStore(sqlite_path=str(db), upload_dir=str(tmp_path / "up"))
+    meta = store.add_attachment("u", "r.pdf", "application/pdf", b"%PDF", None, "t")
+    with sqlite3.connect(db) as con:  # a row written before compression existed
+        con.execute(
+            "INSERT INTO receipt_parses (attachment_id, user_id, text, parsed_data, engine, "
+            "created_at) VALUES (?, 'u', ?, '{}', 'old', 0)",
+            (meta["id"], OCR_TEXT),
+        )
+    assert store.get_receipt_parse_by_attachment(meta["id"])["text"] == OCR_TEXT
+
+    assert store.recompress_all()["receipt_parses.text"] == 1
+    assert store.compression_stats()["receipt_parses.text"]["compressed_rows"] == 1
+    assert store.get_receipt_parse_by_attachment(meta["id"])["text"] == OCR_TEXT
+    assert store.recompress_all()["receipt_parses.text"] == 0
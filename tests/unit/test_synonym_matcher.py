@@ -0,0 +1,37 @@
+from app.knowledge.synonym_matcher import SynonymMatcher
+from app.knowledge.synonyms import SYNONYMS
+
+TABLE = {
+    "home_office": ["home office", "homeoffice", "homeoffice pauschale"],
+    "office": ["office"],
+    "work": ["arbeit", "arbeitszimmer"],
+    "room": ["arbeitszimmer"],
+    "commute": ["km", "pendler"],
+}
+
+
+def test_finds_overlapping_and_prefix_phrases():
+    m = SynonymMatcher(TABLE)
+    assert m.match_groups("my home office") == {"home_office", "office"}
+    # "arbeitszimmer" is captured; "arbeit" (another group) is a prefix of it
+    assert m.match_groups("ein arbeitszimmer") == {"work", "room"}
+    assert m.match_groups("pendlerpauschale für 30 km") == {"commute"}
+
+
+def test_phrases_match_inside_compounds_and_after_digits():
+    m = SynonymMatcher(TABLE)
+    assert m.match_groups("backoffice") == {"office"}
+    assert m.match_groups("offices") == {"office"}
+    assert m.match_groups("ich pendle 25km zur arbeit") == {"commute", "work"}
+    assert m.match_groups("tagespendler kosten") == {"commute"}
+
+
+def test_expand_with_real_table():
+    m = SynonymMatcher(SYNONYMS)
+    terms = m.expand("Habe 2024 einen Laptop gekauft.")
+    assert {"laptop", "arbeitsmittel", "habe"} <= terms
+    assert "pendlerpauschale" in m.expand("I commute 30 km")
+    assert m.expand("nothing relevant") == {"nothing", "relevant"}
+    for text in ("Ich pendle 25km zur Arbeit", "Tagespendler Kosten", "Ich bin Wochenendpendler"):
+        assert "entfernungspauschale" in m.expand(text)
+    assert "arbeitsmittel" in m.expand("neuer Bürodrucker")
@@ -0,0 +1,43 @@
+import io
+import json
+import zipfile
+from pathlib import Path
+
+from app.memory.store import ProfileStore
+
+
+def _export(store: ProfileStore, user_id: str, chunk_size: int = 64 * 1024) -> zipfile.ZipFile:
+    chunks = list(store.export_user_data(user_id, chunk_size=chunk_size))
+    return zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+
+
+def test_export_contains_all_user_records(tmp_path: Path):
+    store = ProfileStore(sqlite_path=str(tmp_path / "test.db"), upload_dir=str(tmp_path / "up"))
+    store.apply_patch("u", {"deductions": {"home_office_days": 10}})
+    store.commit_action("u", "a1", "apply_patch", {"x": 1}, "h", [], True)
+    meta = store.add_attachment("u", "r.pdf", "application/pdf", b"%PDF-1.4 data", "equipment", "t")
+    store.save_receipt_parse("u", meta["id"], "Laptop 999,00", {"total": 999.0}, "test")
+    store.log_evidence("u", "t", "rule", {"q": "laptop"}, {"ok": True})
+    store.log_evidence("other", "t", "rule", {"q": "secret"}, {})
+
+    zf = _export(store, "u")
+    profile = json.loads(zf.read("profile.json"))
+    assert profile["data"]["deductions"]["home_office_days"] == 10
+    evidence = [json.loads(line) for line in zf.read("evidence.ndjson").splitlines()]
+    assert [e["payload"] for e in evidence] == [{"q": "laptop"}]
+    parses = [json.loads(line) for line in zf.read("receipt_parses.ndjson").splitlines()]
+    assert parses[0]["parsed_data"] == {"total": 999.0}
+    assert zf.read(f"attachments/{meta['id']}_{meta['filename']}") == b"%PDF-1.4 data"
+    assert len(zf.read("actions.ndjson").splitlines()) == 1
+
+
+def test_export_is_streamed_in_chunks(tmp_path: Path):
+    store = ProfileStore(sqlite_path=str(tmp_path / "test.db"), upload_dir=str(tmp_path / "up"))
+    for i in range(200):
+        store.log_evidence("u", f"t{i}", "rule", {"i": i, "pad": "x" * 200}, {})
+
+    chunks = list(store.export_user_data("u", chunk_size=4096))
+    assert len(chunks) > 5
+    zf = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+    assert zf.testzip() is None
+    assert len(zf.read("evidence.ndjson").splitlines()) == 200
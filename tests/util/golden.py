@@ -1,19 +1,24 @@
 from __future__ import annotations
 
-from pathlib import Path
-
-import yaml
-
+from app.knowledge.retriever import InMemoryRetriever
 from app.orchestrator.models import TurnState
-
-
-def load_scenarios(dir_path: str | Path) -> list[dict]:
-    """Loads all YAML scenario files from a directory."""
-    scenarios = []
-    for p in sorted(Path(dir_path).glob("*.yml")):
-        with open(p, encoding="utf-8") as f:
-            scenarios.append(yaml.safe_load(f))
-    return scenarios
+from benchmarks.golden import load_scenarios
+
+__all__ = ["assert_expectations", "golden_recall", "load_scenarios"]
+
+
+def golden_recall(retriever: InMemoryRetriever, k: int = 3) -> float:
+    """Share of golden turns with expected rule ids that get one of them in the top k."""
+    found = total = 0
+    for scenario in load_scenarios("tests/golden"):
+        for turn in scenario["turns"]:
+            expected = turn.get("expect", {}).get("rule_ids_any")
+            if not expected:
+                continue
+            hits = retriever.search(turn["user"], year=turn["filing_year"], k=k)
+            found += any(h.rule_id in expected for h in hits)
+            total += 1
+    return found / total
 
 
 def assert_expectations(result: TurnState, expect: dict):